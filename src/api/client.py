@@ -1,41 +1,236 @@
+import asyncio
 import logging
+import random
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
 import aiohttp
 
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    import json
+    json_loads = json.loads
+
+from config import (
+    API_POOL_SIZE, API_POOL_SIZE_PER_HOST, API_KEEPALIVE_TIMEOUT, API_DNS_CACHE_TTL, API_UNIX_SOCKET,
+    API_CACHE_SIZE, API_CACHE_TTLS, API_CACHE_DEFAULT_TTL,
+    API_CONNECT_TIMEOUT, API_READ_TIMEOUT, API_TOTAL_TIMEOUT,
+    API_MAX_RETRIES, API_RETRY_BACKOFF,
+    API_BREAKER_FAILURE_THRESHOLD, API_BREAKER_RESET_TIMEOUT
+)
+from data.cache import LRUCache
+
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker
+    
+    After failure_threshold consecutive failures the circuit opens and requests
+    fail fast. Once reset_timeout has passed a single probe request is let through;
+    its outcome closes the circuit again or re-opens it. A probe abandoned without an
+    outcome (e.g. cancelled) hands the probe over to the next request.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = API_BREAKER_FAILURE_THRESHOLD, reset_timeout: float = API_BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+    
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent upstream"""
+        if self.state == self.CLOSED:
+            return True
+        
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            # Let one probe through to check whether the upstream has recovered
+            self.state = self.HALF_OPEN
+            return True
+        
+        return False
+    
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("Circuit closed, upstream recovered")
+        self.state = self.CLOSED
+        self.failures = 0
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    def release_probe(self) -> None:
+        """Give up a half-open probe that ended without an outcome, so the next request probes instead"""
+        if self.state == self.HALF_OPEN:
+            # opened_at is kept, so the reset timeout has already passed for the next request
+            self.state = self.OPEN
+
 class APIClient:
     """Client for making API requests to the token analyzer API server"""
     
-    def __init__(self):
+    def __init__(self, breaker_failure_threshold: int = API_BREAKER_FAILURE_THRESHOLD,
+                 breaker_reset_timeout: float = API_BREAKER_RESET_TIMEOUT):
         self._session = None
+        self._cache = LRUCache(maxsize=API_CACHE_SIZE)
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breaker_failure_threshold = breaker_failure_threshold
+        self._breaker_reset_timeout = breaker_reset_timeout
     
     async def _get_session(self):
         """Get or create HTTP session"""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            timeout = aiohttp.ClientTimeout(
+                total=API_TOTAL_TIMEOUT,
+                connect=API_CONNECT_TIMEOUT,
+                sock_read=API_READ_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(timeout=timeout, connector=self._create_connector())
         return self._session
     
+    @staticmethod
+    def _create_connector() -> aiohttp.BaseConnector:
+        """Create the connection pool, over a unix socket when the analyzer runs on the same host"""
+        if API_UNIX_SOCKET:
+            return aiohttp.UnixConnector(
+                path=API_UNIX_SOCKET,
+                limit=API_POOL_SIZE,
+                keepalive_timeout=API_KEEPALIVE_TIMEOUT
+            )
+        
+        return aiohttp.TCPConnector(
+            limit=API_POOL_SIZE,
+            limit_per_host=API_POOL_SIZE_PER_HOST,
+            keepalive_timeout=API_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=API_DNS_CACHE_TTL
+        )
+    
     async def close(self):
         """Close HTTP session"""
         if self._session and not self._session.closed:
             await self._session.close()
             self._session = None
     
+    @staticmethod
+    def _endpoint_family(url: str) -> str:
+        """Get the endpoint family from a URL, e.g. 'ath_mcap' for /api/v1/ath_mcap/eth/0x..."""
+        parts = urlparse(url).path.strip("/").split("/")
+        return parts[2] if len(parts) > 2 and parts[0] == "api" else parts[-1]
+    
+    @staticmethod
+    def _cache_key(url: str, params: Optional[Dict[str, Any]]) -> Tuple:
+        return (url, tuple(sorted((params or {}).items())))
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Get response cache counters"""
+        return {**self._stats, "size": len(self._cache), "inflight": len(self._inflight)}
+    
+    def get_circuit_states(self) -> Dict[str, str]:
+        """Get the circuit breaker state for each endpoint family"""
+        return {family: breaker.state for family, breaker in self._breakers.items()}
+    
+    def clear_cache(self) -> None:
+        """Drop all cached responses"""
+        self._cache.clear()
+    
     async def get(self, url, params=None):
-        """Make a GET request to the API server"""
-        session = await self._get_session()
+        """
+        Make a GET request to the API server
+        
+        Successful responses are cached with a TTL chosen by endpoint family, and
+        concurrent identical requests share a single upstream call.
+        """
+        key = self._cache_key(url, params)
+        
+        cached = self._cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            self._stats["hits"] += 1
+            return cached
+        
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            task = asyncio.create_task(self._fetch(key, url, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shield so one caller being cancelled doesn't cancel the shared request
+        return await asyncio.shield(task)
+    
+    async def _fetch(self, key: Tuple, url, params=None):
+        """Perform the upstream request with retries and cache successful responses"""
+        family = self._endpoint_family(url)
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            breaker = self._breakers[family] = CircuitBreaker(self._breaker_failure_threshold, self._breaker_reset_timeout)
+        
+        if not breaker.allow_request():
+            logger.warning(f"Circuit open for {family}, failing fast")
+            return {"error": "API temporarily unavailable", "detail": f"Circuit open for {family}"}
         
         try:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
+            return await self._fetch_with_retries(breaker, family, key, url, params)
+        except BaseException:
+            # Cancelled before an outcome was recorded; a half-open breaker must not wait on it forever
+            breaker.release_probe()
+            raise
+    
+    async def _fetch_with_retries(self, breaker: CircuitBreaker, family: str, key: Tuple, url, params=None):
+        """Send the request, retrying transient failures, and record the outcome on the breaker"""
+        session = await self._get_session()
+        error = None
+        
+        for attempt in range(API_MAX_RETRIES + 1):
+            if attempt:
+                # Exponential backoff with jitter between attempts
+                await asyncio.sleep(API_RETRY_BACKOFF * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+            
+            try:
+                async with session.get(url, params=params) as response:
+                    if response.status == 200:
+                        data = await response.json(loads=json_loads)
+                        breaker.record_success()
+                        ttl = API_CACHE_TTLS.get(family, API_CACHE_DEFAULT_TTL)
+                        if ttl > 0:
+                            self._cache.set(key, data, ttl=ttl)
+                        return data
+                    
                     error_text = await response.text()
                     logger.error(f"API error: {response.status} - {error_text}")
-                    return {"error": f"API error: {response.status}", "detail": error_text}
-        except Exception as e:
-            logger.error(f"Request error: {str(e)}")
-            return {"error": f"Request failed: {str(e)}"}
+                    error = {"error": f"API error: {response.status}", "detail": error_text}
+                    
+                    # Client errors won't succeed on retry and say nothing about upstream health
+                    if response.status < 500 and response.status != 429:
+                        breaker.record_success()
+                        return error
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Request error (attempt {attempt + 1}/{API_MAX_RETRIES + 1}): {str(e) or type(e).__name__}")
+                error = {"error": f"Request failed: {str(e) or type(e).__name__}"}
+            except Exception as e:
+                logger.error(f"Request error: {str(e)}")
+                breaker.record_failure()
+                return {"error": f"Request failed: {str(e)}"}
+        
+        breaker.record_failure()
+        return error
 
 # Create a singleton instance
 api_client = APIClient()
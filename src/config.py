@@ -6,10 +6,53 @@ load_dotenv(override=True)
 
 API_BASE_URL = os.getenv("API_SERVER_URL", "http://localhost:8000")
 
+# Analyzer API connection pool (API_UNIX_SOCKET routes requests over a local socket)
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "100"))
+API_POOL_SIZE_PER_HOST = int(os.getenv("API_POOL_SIZE_PER_HOST", "50"))
+API_KEEPALIVE_TIMEOUT = float(os.getenv("API_KEEPALIVE_TIMEOUT", "30"))
+API_DNS_CACHE_TTL = int(os.getenv("API_DNS_CACHE_TTL", "300"))
+API_UNIX_SOCKET = os.getenv("API_UNIX_SOCKET")
+
+# Analyzer API timeouts (seconds), retries and circuit breaker
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "5"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "30"))
+API_TOTAL_TIMEOUT = float(os.getenv("API_TOTAL_TIMEOUT", "45"))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "2"))
+API_RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", "0.5"))
+API_BREAKER_FAILURE_THRESHOLD = int(os.getenv("API_BREAKER_FAILURE_THRESHOLD", "5"))
+API_BREAKER_RESET_TIMEOUT = float(os.getenv("API_BREAKER_RESET_TIMEOUT", "30"))
+
+# Analyzer API response cache (TTLs in seconds per endpoint family, 0 disables caching)
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", "5000"))
+API_CACHE_DEFAULT_TTL = int(os.getenv("API_CACHE_DEFAULT_TTL", "60"))
+API_CACHE_TTLS = {
+    "token_meta": 86400,
+    "token_security": 3600,
+    "token_deployer_projects": 600,
+    "first_buyers": 600,
+    "token_profitable_wallets": 300,
+    "top_holders": 120,
+    "ath_mcap": 30,
+    "kol_wallets": 300,
+    "wallet_stat": 300,
+    "wallet_holding_time": 600,
+    "wallet_deployed_tokens": 600,
+    "high_activity_wallets": 300,
+    "high_transaction_wallets": 300,
+    "profitable_deployers": 300,
+    "profitable_defi_wallets": 300
+}
+
 # Bot configuration
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 ADMIN_USER_IDS = list(map(int, os.getenv("ADMIN_USER_IDS", "").split(",")))
 
+# Telegram send limits (messages per second)
+TELEGRAM_GLOBAL_RATE_LIMIT = float(os.getenv("TELEGRAM_GLOBAL_RATE_LIMIT", "30"))
+TELEGRAM_PER_CHAT_RATE_LIMIT = float(os.getenv("TELEGRAM_PER_CHAT_RATE_LIMIT", "1"))
+# Chats a broadcast may have queued on the notification dispatcher before it waits for them to drain
+BROADCAST_MAX_PENDING = int(os.getenv("BROADCAST_MAX_PENDING", "1000"))
+
 # Blockchain configuration
 WEB3_PROVIDER_URI_KEY = os.getenv("WEB3_PROVIDER_URI_KEY")
 ETHERSCAN_API_KEY = os.getenv("ETHERSCAN_API_KEY")
@@ -17,9 +60,120 @@ BSCSCAN_API_KEY = os.getenv("BSCSCAN_API_KEY")
 CHAINLINK_ETH_USD_PRICE_FEED_ADDRESS = os.getenv("CHAINLINK_ETH_USD_PRICE_FEED_ADDRESS")
 SUBSCRIPTION_WALLET_ADDRESS=os.getenv("SUBSCRIPTION_WALLET_ADDRESS")
 
+# Maximum number of calls sent in one JSON-RPC batch request
+RPC_BATCH_SIZE = int(os.getenv("RPC_BATCH_SIZE", "100"))
+
+# JSON-RPC endpoint pools (comma-separated URLs per chain)
+RPC_ENDPOINTS = {
+    "eth": [url.strip() for url in os.getenv("ETH_RPC_URLS", WEB3_PROVIDER_URI_KEY or "https://ethereum-rpc.publicnode.com").split(",") if url.strip()],
+    "base": [url.strip() for url in os.getenv("BASE_RPC_URLS", "https://mainnet.base.org").split(",") if url.strip()],
+    "bsc": [url.strip() for url in os.getenv("BSC_RPC_URLS", "https://bsc-dataseed.binance.org/").split(",") if url.strip()]
+}
+# Health probing interval and request timeout (seconds), consecutive failures before an
+# endpoint is taken out of rotation, and per-endpoint request budget (requests/second, 0 = unlimited)
+RPC_HEALTH_CHECK_INTERVAL = float(os.getenv("RPC_HEALTH_CHECK_INTERVAL", "30"))
+RPC_REQUEST_TIMEOUT = float(os.getenv("RPC_REQUEST_TIMEOUT", "10"))
+RPC_MAX_FAILURES = int(os.getenv("RPC_MAX_FAILURES", "3"))
+RPC_ENDPOINT_BUDGET = float(os.getenv("RPC_ENDPOINT_BUDGET", "0"))
+# Hedged reads: resend a slow user-facing call to a second endpoint after the pool's p95
+# latency; hedges are capped at RPC_HEDGE_MAX_RATIO of requests (at most 1, i.e. double load)
+RPC_HEDGE_ENABLED = os.getenv("RPC_HEDGE_ENABLED", "true").lower() == "true"
+RPC_HEDGE_MAX_RATIO = min(1.0, float(os.getenv("RPC_HEDGE_MAX_RATIO", "0.1")))
+RPC_HEDGE_MIN_DELAY = float(os.getenv("RPC_HEDGE_MIN_DELAY", "0.05"))
+RPC_LATENCY_WINDOW = int(os.getenv("RPC_LATENCY_WINDOW", "500"))
+
+# Block-driven blockchain monitor (poll intervals in seconds, roughly one block time per chain)
+MONITOR_CHAINS = [chain.strip() for chain in os.getenv("MONITOR_CHAINS", "eth,base,bsc").split(",") if chain.strip()]
+MONITOR_POLL_INTERVALS = {
+    "eth": float(os.getenv("ETH_MONITOR_POLL_INTERVAL", "12")),
+    "base": float(os.getenv("BASE_MONITOR_POLL_INTERVAL", "2")),
+    "bsc": float(os.getenv("BSC_MONITOR_POLL_INTERVAL", "3"))
+}
+MONITOR_MAX_BLOCK_RANGE = int(os.getenv("MONITOR_MAX_BLOCK_RANGE", "20"))
+# eth_getLogs ranges the provider refuses are split in half down to single blocks; a single
+# block is tried this many times (MONITOR_LOG_RETRY_DELAY seconds apart) before it is skipped
+MONITOR_LOG_BLOCK_ATTEMPTS = int(os.getenv("MONITOR_LOG_BLOCK_ATTEMPTS", "3"))
+MONITOR_LOG_RETRY_DELAY = float(os.getenv("MONITOR_LOG_RETRY_DELAY", "1"))
+# Blocks a transfer must be buried under before alerting; with pending alerts enabled,
+# transfers in newer blocks get an immediate "pending" alert and a follow-up once confirmed
+MONITOR_CONFIRMATIONS = {
+    "eth": int(os.getenv("ETH_MONITOR_CONFIRMATIONS", "3")),
+    "base": int(os.getenv("BASE_MONITOR_CONFIRMATIONS", "10")),
+    "bsc": int(os.getenv("BSC_MONITOR_CONFIRMATIONS", "15"))
+}
+MONITOR_PENDING_ALERTS = os.getenv("MONITOR_PENDING_ALERTS", "false").lower() == "true"
+# Seconds between refreshes of the profitable wallets watched for tracked tokens
+MONITOR_PROFITABLE_WALLETS_REFRESH = int(os.getenv("MONITOR_PROFITABLE_WALLETS_REFRESH", "600"))
+# Seconds between rebuilds of the log prefilter, which drops addresses no longer tracked
+MONITOR_PREFILTER_REBUILD_INTERVAL = int(os.getenv("MONITOR_PREFILTER_REBUILD_INTERVAL", "900"))
+# Blocks replayed at most after a restart, and the bounds of the processed-event store
+MONITOR_MAX_CATCHUP_BLOCKS = int(os.getenv("MONITOR_MAX_CATCHUP_BLOCKS", "5000"))
+MONITOR_DEDUP_MAX_EVENTS = int(os.getenv("MONITOR_DEDUP_MAX_EVENTS", "100000"))
+MONITOR_DEDUP_MAX_BYTES = int(os.getenv("MONITOR_DEDUP_MAX_BYTES", str(32 * 1024 * 1024)))
+# Sharded monitor: run the chain followers in supervised worker processes, split by
+# chain and by address hash, with one shard per MONITOR_SUBSCRIPTIONS_PER_SHARD subscriptions
+MONITOR_WORKER_PROCESSES = os.getenv("MONITOR_WORKER_PROCESSES", "false").lower() == "true"
+MONITOR_MAX_SHARDS_PER_CHAIN = int(os.getenv("MONITOR_MAX_SHARDS_PER_CHAIN", "4"))
+MONITOR_SUBSCRIPTIONS_PER_SHARD = int(os.getenv("MONITOR_SUBSCRIPTIONS_PER_SHARD", "20000"))
+MONITOR_SUPERVISOR_INTERVAL = float(os.getenv("MONITOR_SUPERVISOR_INTERVAL", "10"))
+MONITOR_REBALANCE_INTERVAL = float(os.getenv("MONITOR_REBALANCE_INTERVAL", "600"))
+
+# Token metadata cache (TTLs in seconds; name, symbol and decimals never expire)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_SUPPLY_TTL = int(os.getenv("TOKEN_SUPPLY_TTL", "3600"))
+TOKEN_MARKET_DATA_TTL = int(os.getenv("TOKEN_MARKET_DATA_TTL", "300"))
+
+# Address classification cache (EOA / contract / ERC-20 token). Token results are kept forever;
+# EOA and non-token contract results expire after ADDRESS_CLASS_NEGATIVE_TTL seconds, because a
+# contract can later be deployed to the address (CREATE2) and failed ERC-20 calls look the same
+# as a contract without them
+ADDRESS_CLASS_CACHE_SIZE = int(os.getenv("ADDRESS_CLASS_CACHE_SIZE", "50000"))
+ADDRESS_CLASS_NEGATIVE_TTL = int(os.getenv("ADDRESS_CLASS_NEGATIVE_TTL", "86400"))
+
+# Concurrent token enrichment (per-chain concurrency limits and overall deadline in seconds)
+DEFAULT_ENRICHMENT_CONCURRENCY = int(os.getenv("ENRICHMENT_CONCURRENCY", "8"))
+ENRICHMENT_CONCURRENCY = {
+    "eth": int(os.getenv("ETH_ENRICHMENT_CONCURRENCY", DEFAULT_ENRICHMENT_CONCURRENCY)),
+    "base": int(os.getenv("BASE_ENRICHMENT_CONCURRENCY", DEFAULT_ENRICHMENT_CONCURRENCY)),
+    "bsc": int(os.getenv("BSC_ENRICHMENT_CONCURRENCY", DEFAULT_ENRICHMENT_CONCURRENCY))
+}
+ENRICHMENT_DEADLINE = float(os.getenv("ENRICHMENT_DEADLINE", "20"))
+# Tokens per token info lookup; each chunk is its own batch, so chunks finished before the deadline are kept
+ENRICHMENT_INFO_CHUNK_SIZE = int(os.getenv("ENRICHMENT_INFO_CHUNK_SIZE", "20"))
+# Token info chunks in flight at once per chain (each is a JSON-RPC batch of up to ~100 calls)
+DEFAULT_ENRICHMENT_RPC_CONCURRENCY = int(os.getenv("ENRICHMENT_RPC_CONCURRENCY", "2"))
+ENRICHMENT_RPC_CONCURRENCY = {
+    "eth": int(os.getenv("ETH_ENRICHMENT_RPC_CONCURRENCY", DEFAULT_ENRICHMENT_RPC_CONCURRENCY)),
+    "base": int(os.getenv("BASE_ENRICHMENT_RPC_CONCURRENCY", DEFAULT_ENRICHMENT_RPC_CONCURRENCY)),
+    "bsc": int(os.getenv("BSC_ENRICHMENT_RPC_CONCURRENCY", DEFAULT_ENRICHMENT_RPC_CONCURRENCY))
+}
+
 # Database configuration
 MONGODB_URI = os.getenv("MONGODB_URI")
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "5"))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "60000"))
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "5000"))
 DB_NAME = os.getenv("DB_NAME", "defiscope")
+# Write-behind buffer for last_active touches and scan counts: flushed every
+# WRITE_BEHIND_INTERVAL_MS milliseconds or once WRITE_BEHIND_MAX_OPS writes are buffered
+WRITE_BEHIND_INTERVAL_MS = int(os.getenv("WRITE_BEHIND_INTERVAL_MS", "1000"))
+WRITE_BEHIND_MAX_OPS = int(os.getenv("WRITE_BEHIND_MAX_OPS", "500"))
+# Users fetched per cursor batch when streaming the users collection
+USER_ITER_BATCH_SIZE = int(os.getenv("USER_ITER_BATCH_SIZE", "1000"))
+# In-process premium status cache; entries also expire at the user's premium_until
+PREMIUM_CACHE_SIZE = int(os.getenv("PREMIUM_CACHE_SIZE", "100000"))
+PREMIUM_CACHE_TTL = int(os.getenv("PREMIUM_CACHE_TTL", "3600"))
+# Seconds between refreshes of the cached admin user statistics
+USER_STATS_REFRESH_INTERVAL = int(os.getenv("USER_STATS_REFRESH_INTERVAL", "300"))
+# Document expiry through MongoDB TTL indexes: scan counts are kept for USER_SCAN_RETENTION_DAYS
+# days after their date, token and wallet data for DATA_RETENTION_DAYS days after their last update
+USER_SCAN_RETENTION_DAYS = int(os.getenv("USER_SCAN_RETENTION_DAYS", "2"))
+DATA_RETENTION_DAYS = int(os.getenv("DATA_RETENTION_DAYS", "30"))
+# Background maintenance: run interval (seconds), documents per chunk and pause between chunks (seconds)
+MAINTENANCE_INTERVAL = int(os.getenv("MAINTENANCE_INTERVAL", "3600"))
+MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", "500"))
+MAINTENANCE_BATCH_PAUSE = float(os.getenv("MAINTENANCE_BATCH_PAUSE", "0.5"))
 
 # Rate limits for free users
 FREE_TOKEN_SCANS_DAILY=3
@@ -1,61 +1,116 @@
 import logging
 import random
-from typing import Optional, Dict, List, Any, Union
+from typing import Optional, Dict, List, Any, Union, Callable, AsyncIterator, Iterable
 from datetime import datetime, timedelta
-from pymongo import MongoClient, ASCENDING, DESCENDING
-from pymongo.database import Database
-from pymongo.collection import Collection
+from pymongo import AsyncMongoClient, ASCENDING, DESCENDING, UpdateOne, ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import BulkWriteError, CollectionInvalid
 
-from config import MONGODB_URI, DB_NAME, SUBSCRIPTION_WALLET_ADDRESS
+from config import (
+    MONGODB_URI, DB_NAME, SUBSCRIPTION_WALLET_ADDRESS,
+    MONGODB_MAX_POOL_SIZE, MONGODB_MIN_POOL_SIZE, MONGODB_MAX_IDLE_TIME_MS, MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+    MONITOR_DEDUP_MAX_EVENTS, MONITOR_DEDUP_MAX_BYTES,
+    USER_SCAN_RETENTION_DAYS, DATA_RETENTION_DAYS, USER_ITER_BATCH_SIZE,
+    PREMIUM_CACHE_SIZE, PREMIUM_CACHE_TTL
+)
+from data.cache import LRUCache
 from data.models import User, UserScan, TokenData, WalletData, TrackingSubscription, KOLWallet
 from services.payment import get_plan_payment_details
 
 from api.token_api import *
 from api.wallet_api import *
 
-_db: Optional[Database] = None
+_client: Optional[AsyncMongoClient] = None
+_db: Optional[AsyncDatabase] = None
 
-def init_database() -> bool:
+# user_id -> whether the user is currently premium; invalidated on every premium write
+_premium_cache = LRUCache(maxsize=PREMIUM_CACHE_SIZE)
+# user_id -> generation bumped by every invalidation, so a read that raced with a premium
+# write can tell its result is stale and leave the cache alone
+_premium_versions: Dict[int, int] = {}
+
+# Collections whose documents carry an expires_at field enforced by a TTL index
+EXPIRING_COLLECTIONS = ("user_scans", "token_data", "wallet_data")
+
+# Callbacks notified whenever a tracking subscription is saved or deleted
+_subscription_listeners: List[Callable[[TrackingSubscription], None]] = []
+
+async def init_database() -> bool:
     """Initialize the database connection and set up indexes"""
-    global _db
+    global _client, _db
     
     try:
-        # Connect to MongoDB
-        client = MongoClient(MONGODB_URI) 
-        _db = client[DB_NAME]
+        # Connect to MongoDB with the async driver so queries never block the bot's event loop
+        client = AsyncMongoClient(
+            MONGODB_URI,
+            maxPoolSize=MONGODB_MAX_POOL_SIZE,
+            minPoolSize=MONGODB_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=MONGODB_WAIT_QUEUE_TIMEOUT_MS
+        )
+        db = client[DB_NAME]
         
         # Set up indexes for collections
         # Users collection
-        _db.users.create_index([("user_id", ASCENDING)], unique=True)
+        await db.users.create_index([("user_id", ASCENDING)], unique=True)
+        # Covers the admin stats aggregation, which only reads these two fields
+        await db.users.create_index([("last_active", ASCENDING), ("is_premium", ASCENDING)], name="user_activity_stats")
+        await db.users.create_index([("is_premium", ASCENDING), ("premium_until", ASCENDING)])
         
         # User scans collection
-        _db.user_scans.create_index([
+        await db.user_scans.create_index([
             ("user_id", ASCENDING),
             ("scan_type", ASCENDING),
             ("date", ASCENDING)
         ], unique=True)
         
         # Token data collection
-        _db.token_data.create_index([("address", ASCENDING)], unique=True)
-        _db.token_data.create_index([("deployer", ASCENDING)])
+        # Tokens are keyed by chain and address, since one address can exist on several chains;
+        # drop the older address-only unique index that would reject the second chain's entry
+        if "address_1" in await db.token_data.index_information():
+            await db.token_data.drop_index("address_1")
+        await db.token_data.create_index([("chain", ASCENDING), ("address", ASCENDING)], unique=True)
+        await db.token_data.create_index([("deployer", ASCENDING)])
         
         # Wallet data collection
-        _db.wallet_data.create_index([("address", ASCENDING)], unique=True)
-        _db.wallet_data.create_index([("is_kol", ASCENDING)])
-        _db.wallet_data.create_index([("is_deployer", ASCENDING)])
+        await db.wallet_data.create_index([("address", ASCENDING)], unique=True)
+        await db.wallet_data.create_index([("is_kol", ASCENDING)])
+        await db.wallet_data.create_index([("is_deployer", ASCENDING)])
+        
+        # Expired scan counts and stale token/wallet data are removed by MongoDB's TTL
+        # monitor, which deletes in small batches instead of one large delete_many
+        for collection in EXPIRING_COLLECTIONS:
+            await db[collection].create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
         
         # Tracking subscriptions collection
-        _db.tracking_subscriptions.create_index([
+        await db.tracking_subscriptions.create_index([
             ("user_id", ASCENDING),
             ("tracking_type", ASCENDING),
             ("target_address", ASCENDING)
         ], unique=True)
         
         # KOL wallets collection
-        _db.kol_wallets.create_index([("address", ASCENDING)], unique=True)
-        _db.kol_wallets.create_index([("name", ASCENDING)])
-        
-        server_info = client.server_info()
+        await db.kol_wallets.create_index([("address", ASCENDING)], unique=True)
+        await db.kol_wallets.create_index([("name", ASCENDING)])
+        
+        # Address classifications; negative results carry expires_at and are purged by MongoDB
+        await db.address_classes.create_index([("chain", ASCENDING), ("address", ASCENDING)], unique=True)
+        await db.address_classes.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        
+        # Processed monitor events; a capped collection keeps them in insertion order
+        # and drops the oldest once full, so the dedup store never grows unbounded
+        try:
+            await db.create_collection(
+                "processed_events",
+                capped=True,
+                size=MONITOR_DEDUP_MAX_BYTES,
+                max=MONITOR_DEDUP_MAX_EVENTS
+            )
+        except CollectionInvalid:
+            pass
+        
+        server_info = await client.server_info()
+        _client, _db = client, db
         logging.info(f"✅ Successfully connected to MongoDB version: {server_info.get('version')}")
         logging.info(f"✅ Using database: {DB_NAME}")
         return True
@@ -63,125 +118,342 @@ def init_database() -> bool:
         logging.error(f"❌ Failed to initialize database: {e}")
         return False
 
-def get_database() -> Database:
+async def close_database() -> None:
+    """Close the database connection pool"""
+    global _client, _db
+    if _client is not None:
+        await _client.close()
+    _client, _db = None, None
+
+async def get_database() -> AsyncDatabase:
     """Get the database instance"""
     global _db
     if _db is None:
-        init_database()
+        await init_database()
     return _db
 
-def get_user(user_id: int) -> Optional[User]:
+async def get_user(user_id: int) -> Optional[User]:
     """Get a user by ID"""
-    db = get_database()
-    user_data = db.users.find_one({"user_id": user_id})
+    db = await get_database()
+    user_data = await db.users.find_one({"user_id": user_id})
     if user_data:
         return User.from_dict(user_data)
     return None
 
-def save_user(user: User) -> None:
+async def save_user(user: User) -> None:
     """Save or update a user"""
-    db = get_database()
+    db = await get_database()
     user_dict = user.to_dict()
-    db.users.update_one(
+    await db.users.update_one(
         {"user_id": user.user_id},
         {"$set": user_dict},
         upsert=True
     )
 
-def update_user_activity(user_id: int) -> None:
+async def touch_user(user_id: int, username: Optional[str] = None,
+                     first_name: Optional[str] = None, last_name: Optional[str] = None) -> User:
+    """
+    Get a user, creating them if needed, in one round trip
+    
+    Args:
+        user_id: The Telegram user ID
+        username: Username stored when the user is created
+        first_name: First name stored when the user is created
+        last_name: Last name stored when the user is created
+    
+    Returns:
+        The user as stored after the update
+    """
+    db = await get_database()
+    now = datetime.now()
+    new_user = User(user_id=user_id, username=username, first_name=first_name, last_name=last_name, created_at=now)
+    version = _premium_versions.get(user_id, 0)
+    
+    # Only $setOnInsert, so for an existing user this is a read that writes nothing;
+    # last_active is recorded through the write-behind buffer instead
+    user_data = await db.users.find_one_and_update(
+        {"user_id": user_id},
+        {"$setOnInsert": new_user.to_dict()},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    user = User.from_dict(user_data)
+    # Seed the premium cache, which also treats a passed premium_until as expired
+    user.is_premium = cache_premium_status(user_id, user.is_premium, user.premium_until, version)
+    return user
+
+def cache_premium_status(user_id: int, is_premium: bool, premium_until: Optional[datetime],
+                         version: Optional[int] = None) -> bool:
+    """
+    Cache a user's premium status until it can next change
+    
+    Args:
+        user_id: The Telegram user ID
+        is_premium: The stored premium flag
+        premium_until: The stored premium expiry
+        version: The user's premium version from before the status was read; if it was
+            invalidated since, the status may be stale and is not cached
+    
+    Returns:
+        Whether the user is premium right now, treating a passed premium_until as expired
+    """
+    ttl = PREMIUM_CACHE_TTL
+    if is_premium and premium_until is not None:
+        remaining = (premium_until - datetime.now()).total_seconds()
+        is_premium = remaining > 0
+        if is_premium:
+            ttl = min(ttl, remaining)
+    
+    if version is None or version == _premium_versions.get(user_id, 0):
+        _premium_cache.set(user_id, is_premium, ttl=ttl)
+    return is_premium
+
+def invalidate_premium_status(user_id: int) -> None:
+    """Drop a user's cached premium status after it was changed"""
+    _premium_versions[user_id] = _premium_versions.get(user_id, 0) + 1
+    _premium_cache.pop(user_id)
+
+async def is_user_premium(user_id: int) -> bool:
+    """Check whether a user is premium, from memory when possible"""
+    is_premium = _premium_cache.get(user_id)
+    if is_premium is not None:
+        return is_premium
+    
+    version = _premium_versions.get(user_id, 0)
+    db = await get_database()
+    user_data = await db.users.find_one({"user_id": user_id}, {"_id": 0, "is_premium": 1, "premium_until": 1})
+    if not user_data:
+        return False
+    return cache_premium_status(user_id, user_data.get("is_premium", False), user_data.get("premium_until"), version)
+
+async def update_user_activity(user_id: int) -> None:
     """Update user's last active timestamp"""
-    db = get_database()
-    db.users.update_one(
+    db = await get_database()
+    await db.users.update_one(
         {"user_id": user_id},
         {"$set": {"last_active": datetime.now()}}
     )
 
-def set_premium_status(user_id: int, is_premium: bool, duration_days: int = 30) -> None:
+async def set_premium_status(user_id: int, is_premium: bool, duration_days: int = 30) -> None:
     """Set a user's premium status"""
-    db = get_database()
+    db = await get_database()
     premium_until = datetime.now() + timedelta(days=duration_days) if is_premium else None
-    db.users.update_one(
+    await db.users.update_one(
         {"user_id": user_id},
         {"$set": {
             "is_premium": is_premium,
             "premium_until": premium_until
         }}
     )
+    invalidate_premium_status(user_id)
 
-def get_user_scan_count(user_id: int, scan_type: str, date: str) -> int:
+async def get_user_scan_count(user_id: int, scan_type: str, date: str) -> int:
     """Get the number of scans a user has performed of a specific type on a date"""
-    db = get_database()
-    scan_data = db.user_scans.find_one({
+    db = await get_database()
+    scan_data = await db.user_scans.find_one({
         "user_id": user_id,
         "scan_type": scan_type,
         "date": date
     })
     return scan_data.get("count", 0) if scan_data else 0
 
-def increment_user_scan_count(user_id: int, scan_type: str, date: str) -> None:
+def scan_count_expiry(date: str) -> datetime:
+    """Get when the scan count of a date (ISO format) expires"""
+    return datetime.fromisoformat(date) + timedelta(days=USER_SCAN_RETENTION_DAYS)
+
+def data_expiry(last_updated: datetime) -> datetime:
+    """Get when token or wallet data last updated at the given time expires"""
+    return last_updated + timedelta(days=DATA_RETENTION_DAYS)
+
+async def increment_user_scan_count(user_id: int, scan_type: str, date: str) -> None:
     """Increment the scan count for a user"""
-    db = get_database()
-    db.user_scans.update_one(
+    db = await get_database()
+    await db.user_scans.update_one(
         {
             "user_id": user_id,
             "scan_type": scan_type,
             "date": date
         },
-        {"$inc": {"count": 1}},
+        {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": scan_count_expiry(date)}},
         upsert=True
     )
 
-def reset_user_scan_counts() -> None:
-    """Reset all user scan counts (typically called daily)"""
-    db = get_database()
-    today = datetime.now().date().isoformat()
-    # Delete all scan records except today's
-    db.user_scans.delete_many({"date": {"$ne": today}})
-
-def get_tokendata(address: str) -> Optional[TokenData]:
-    """Get token data by address"""
-    db = get_database()
-    token_data = db.token_data.find_one({"address": address.lower()})
+async def apply_last_active(last_active: Dict[int, datetime]) -> List[int]:
+    """
+    Apply buffered last_active touches with one bulk write
+    
+    Args:
+        last_active: Mapping of user ID to their latest activity time
+    
+    Returns:
+        The user IDs whose update failed; every other update was applied
+    """
+    if not last_active:
+        return []
+    
+    db = await get_database()
+    user_ids = list(last_active)
+    try:
+        await db.users.bulk_write([
+            UpdateOne({"user_id": user_id}, {"$max": {"last_active": last_active[user_id]}})
+            for user_id in user_ids
+        ], ordered=False)
+    except BulkWriteError as e:
+        return [user_ids[error["index"]] for error in e.details.get("writeErrors", [])]
+    return []
+
+async def apply_scan_increments(scan_increments: Dict[tuple, int]) -> List[tuple]:
+    """
+    Apply buffered scan count increments with one bulk write
+    
+    The write is unordered, so when some increments fail the rest have still been
+    applied; only the failed ones may be retried without double counting.
+    
+    Args:
+        scan_increments: Mapping of (user_id, scan_type, date) to the scans to add
+    
+    Returns:
+        The keys whose increment failed; every other increment was applied
+    """
+    if not scan_increments:
+        return []
+    
+    db = await get_database()
+    keys = list(scan_increments)
+    try:
+        await db.user_scans.bulk_write([
+            UpdateOne(
+                {"user_id": user_id, "scan_type": scan_type, "date": date},
+                {"$inc": {"count": scan_increments[(user_id, scan_type, date)]}, "$setOnInsert": {"expires_at": scan_count_expiry(date)}},
+                upsert=True
+            )
+            for user_id, scan_type, date in keys
+        ], ordered=False)
+    except BulkWriteError as e:
+        return [keys[error["index"]] for error in e.details.get("writeErrors", [])]
+    return []
+
+async def get_tokendata(chain: str, address: str) -> Optional[TokenData]:
+    """Get token data by chain and address"""
+    db = await get_database()
+    token_data = await db.token_data.find_one({"chain": chain, "address": address.lower()})
     if token_data:
         return TokenData.from_dict(token_data)
     return None
 
-def save_token_data(token: TokenData) -> None:
+async def save_token_data(token: TokenData) -> None:
     """Save or update token data"""
-    db = get_database()
+    db = await get_database()
     token_dict = token.to_dict()
     token_dict["address"] = token_dict["address"].lower()  # Normalize address
     token_dict["last_updated"] = datetime.now()
+    token_dict["expires_at"] = data_expiry(token_dict["last_updated"])
     
-    db.token_data.update_one(
-        {"address": token_dict["address"]},
+    await db.token_data.update_one(
+        {"chain": token_dict["chain"], "address": token_dict["address"]},
         {"$set": token_dict},
         upsert=True
     )
 
-def get_tokens_by_deployer(deployer_address: str) -> List[TokenData]:
+async def get_tokendata_many(chain: str, addresses: List[str]) -> Dict[str, TokenData]:
+    """Get token data for several addresses on a chain, keyed by lowercase address"""
+    db = await get_database()
+    tokens = db.token_data.find({
+        "chain": chain,
+        "address": {"$in": [address.lower() for address in addresses]}
+    })
+    return {token["address"]: TokenData.from_dict(token) async for token in tokens}
+
+async def update_token_fields_many(chain: str, updates: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Set specific fields on several token documents of a chain, creating them if needed
+    
+    Args:
+        chain: The blockchain network (eth, base, bsc)
+        updates: Mapping of token address to the fields to set
+    """
+    if not updates:
+        return
+    
+    db = await get_database()
+    now = datetime.now()
+    operations = [
+        UpdateOne(
+            {"chain": chain, "address": address.lower()},
+            {"$set": {**fields, "chain": chain, "address": address.lower(), "last_updated": now, "expires_at": data_expiry(now)}},
+            upsert=True
+        )
+        for address, fields in updates.items()
+    ]
+    await db.token_data.bulk_write(operations, ordered=False)
+
+async def get_address_classes(chain: str, addresses: List[str]) -> Dict[str, str]:
+    """
+    Get the stored classifications of several addresses on a chain
+    
+    Args:
+        chain: The blockchain network (eth, base, bsc)
+        addresses: The addresses to look up
+    
+    Returns:
+        Dictionary of lowercase address to "eoa", "contract" or "token"; expired entries are left out
+    """
+    db = await get_database()
+    classes = db.address_classes.find({
+        "chain": chain,
+        "address": {"$in": [address.lower() for address in addresses]},
+        "$or": [{"expires_at": None}, {"expires_at": {"$gt": datetime.now()}}]
+    })
+    return {entry["address"]: entry["kind"] async for entry in classes}
+
+async def save_address_classes(chain: str, classes: Dict[str, str], expires_at: Dict[str, datetime]) -> None:
+    """
+    Store address classifications on a chain
+    
+    Args:
+        chain: The blockchain network (eth, base, bsc)
+        classes: Mapping of address to its classification
+        expires_at: Expiry times for the classifications that should not be kept forever
+    """
+    if not classes:
+        return
+    
+    db = await get_database()
+    now = datetime.now()
+    operations = [
+        UpdateOne(
+            {"chain": chain, "address": address.lower()},
+            {"$set": {"kind": kind, "classified_at": now, "expires_at": expires_at.get(address)}},
+            upsert=True
+        )
+        for address, kind in classes.items()
+    ]
+    await db.address_classes.bulk_write(operations, ordered=False)
+
+async def get_tokens_by_deployer(deployer_address: str) -> List[TokenData]:
     """Get all tokens deployed by a specific address"""
-    db = get_database()
+    db = await get_database()
     tokens = db.token_data.find({"deployer": deployer_address.lower()})
-    return [TokenData.from_dict(token) for token in tokens]
+    return [TokenData.from_dict(token) async for token in tokens]
 
 
-def save_wallet_data(wallet: WalletData) -> None:
+async def save_wallet_data(wallet: WalletData) -> None:
     """Save or update wallet data"""
-    db = get_database()
+    db = await get_database()
     wallet_dict = wallet.to_dict()
     wallet_dict["address"] = wallet_dict["address"].lower()  # Normalize address
     wallet_dict["last_updated"] = datetime.now()
+    wallet_dict["expires_at"] = data_expiry(wallet_dict["last_updated"])
     
-    db.wallet_data.update_one(
+    await db.wallet_data.update_one(
         {"address": wallet_dict["address"]},
         {"$set": wallet_dict},
         upsert=True
     )
 
-def get_profitable_wallets(days: int, limit: int = 10) -> List[Dict[str, Any]]:
+async def get_profitable_wallets(days: int, limit: int = 10) -> List[Dict[str, Any]]:
     """Get most profitable wallets in the last N days"""
-    db = get_database()
+    db = await get_database()
     since_date = datetime.now() - timedelta(days=days)
     
     # This is a placeholder - in a real implementation, you would have a collection
@@ -191,11 +463,11 @@ def get_profitable_wallets(days: int, limit: int = 10) -> List[Dict[str, Any]]:
         "win_rate": {"$gt": 50}  # Only wallets with >50% win rate
     }).sort("win_rate", DESCENDING).limit(limit)
     
-    return [WalletData.from_dict(wallet).to_dict() for wallet in wallets]
+    return [WalletData.from_dict(wallet).to_dict() async for wallet in wallets]
 
-def get_profitable_deployers(days: int, limit: int = 10) -> List[Dict[str, Any]]:
+async def get_profitable_deployers(days: int, limit: int = 10) -> List[Dict[str, Any]]:
     """Get most profitable token deployer wallets in the last N days"""
-    db = get_database()
+    db = await get_database()
     since_date = datetime.now() - timedelta(days=days)
     
     # This is a placeholder - in a real implementation, you would have more complex logic
@@ -204,13 +476,13 @@ def get_profitable_deployers(days: int, limit: int = 10) -> List[Dict[str, Any]]
         "last_updated": {"$gte": since_date}
     }).sort("win_rate", DESCENDING).limit(limit)
     
-    return [WalletData.from_dict(wallet).to_dict() for wallet in wallets]
+    return [WalletData.from_dict(wallet).to_dict() async for wallet in wallets]
 
-def get_kol_wallet(name_or_address: str) -> Optional[KOLWallet]:
+async def get_kol_wallet(name_or_address: str) -> Optional[KOLWallet]:
     """Get a KOL wallet by name or address"""
-    db = get_database()
+    db = await get_database()
     # Try to find by name first (case-insensitive)
-    kol = db.kol_wallets.find_one({
+    kol = await db.kol_wallets.find_one({
         "$or": [
             {"name": {"$regex": f"^{name_or_address}$", "$options": "i"}},
             {"address": name_or_address.lower()}
@@ -221,46 +493,69 @@ def get_kol_wallet(name_or_address: str) -> Optional[KOLWallet]:
         return KOLWallet.from_dict(kol)
     return None
 
-def get_all_kol_wallets() -> List[KOLWallet]:
+async def get_all_kol_wallets() -> List[KOLWallet]:
     """Get all KOL wallets"""
-    db = get_database()
+    db = await get_database()
     kols = db.kol_wallets.find().sort("name", ASCENDING)
-    return [KOLWallet.from_dict(kol) for kol in kols]
+    return [KOLWallet.from_dict(kol) async for kol in kols]
 
-def save_kol_wallet(kol: KOLWallet) -> None:
+async def save_kol_wallet(kol: KOLWallet) -> None:
     """Save or update a KOL wallet"""
-    db = get_database()
+    db = await get_database()
     kol_dict = kol.to_dict()
     kol_dict["address"] = kol_dict["address"].lower()  # Normalize address
     
-    db.kol_wallets.update_one(
+    await db.kol_wallets.update_one(
         {"address": kol_dict["address"]},
         {"$set": kol_dict},
         upsert=True
     )
 
-def get_user_tracking_subscriptions(user_id: int) -> List[TrackingSubscription]:
+def add_subscription_listener(listener: Callable[[TrackingSubscription], None]) -> None:
+    """
+    Register a callback for tracking subscription changes
+    
+    Args:
+        listener: Called with the stored subscription after every save, and with an
+            inactive copy after a delete
+    """
+    if listener not in _subscription_listeners:
+        _subscription_listeners.append(listener)
+
+def remove_subscription_listener(listener: Callable[[TrackingSubscription], None]) -> None:
+    """Unregister a subscription change callback"""
+    if listener in _subscription_listeners:
+        _subscription_listeners.remove(listener)
+
+def _publish_subscription_change(subscription: TrackingSubscription) -> None:
+    for listener in list(_subscription_listeners):
+        try:
+            listener(subscription)
+        except Exception as e:
+            logging.error(f"Error in subscription listener: {e}")
+
+async def get_user_tracking_subscriptions(user_id: int) -> List[TrackingSubscription]:
     """Get all tracking subscriptions for a user"""
-    db = get_database()
+    db = await get_database()
     subscriptions = db.tracking_subscriptions.find({
         "user_id": user_id,
         "is_active": True
     })
-    return [TrackingSubscription.from_dict(sub) for sub in subscriptions]
+    return [TrackingSubscription.from_dict(sub) async for sub in subscriptions]
 
-def get_all_active_subscriptions_by_type(tracking_type: str) -> List[TrackingSubscription]:
+async def get_all_active_subscriptions_by_type(tracking_type: str) -> List[TrackingSubscription]:
     """Get all active subscriptions of a specific type"""
-    db = get_database()
+    db = await get_database()
     subscriptions = db.tracking_subscriptions.find({
         "tracking_type": tracking_type,
         "is_active": True
     })
-    return [TrackingSubscription.from_dict(sub) for sub in subscriptions]
+    return [TrackingSubscription.from_dict(sub) async for sub in subscriptions]
 
-def get_tracking_subscription(user_id: int, tracking_type: str, target_address: str) -> Optional[TrackingSubscription]:
+async def get_tracking_subscription(user_id: int, tracking_type: str, target_address: str) -> Optional[TrackingSubscription]:
     """Get a specific tracking subscription"""
-    db = get_database()
-    subscription = db.tracking_subscriptions.find_one({
+    db = await get_database()
+    subscription = await db.tracking_subscriptions.find_one({
         "user_id": user_id,
         "tracking_type": tracking_type,
         "target_address": target_address.lower()
@@ -269,13 +564,13 @@ def get_tracking_subscription(user_id: int, tracking_type: str, target_address:
         return TrackingSubscription.from_dict(subscription)
     return None
 
-def save_tracking_subscription(subscription: TrackingSubscription) -> None:
+async def save_tracking_subscription(subscription: TrackingSubscription) -> None:
     """Save or update a tracking subscription"""
-    db = get_database()
+    db = await get_database()
     sub_dict = subscription.to_dict()
     sub_dict["target_address"] = sub_dict["target_address"].lower()  # Normalize address
     
-    db.tracking_subscriptions.update_one(
+    await db.tracking_subscriptions.update_one(
         {
             "user_id": sub_dict["user_id"],
             "tracking_type": sub_dict["tracking_type"],
@@ -284,59 +579,224 @@ def save_tracking_subscription(subscription: TrackingSubscription) -> None:
         {"$set": sub_dict},
         upsert=True
     )
+    _publish_subscription_change(TrackingSubscription.from_dict(sub_dict))
+
+async def save_tracking_subscriptions_bulk(subscriptions: List[TrackingSubscription]) -> List[bool]:
+    """
+    Save or update several tracking subscriptions with one unordered bulk write
+    
+    Args:
+        subscriptions: The subscriptions to save; when the same (user, type, target) appears
+            more than once the last one wins, as with sequential saves
+    
+    Returns:
+        Per-item outcomes in input order: True if the subscription was saved
+    """
+    if not subscriptions:
+        return []
+    
+    db = await get_database()
+    documents: Dict[tuple, Dict[str, Any]] = {}
+    keys = []
+    for subscription in subscriptions:
+        sub_dict = subscription.to_dict()
+        sub_dict["target_address"] = sub_dict["target_address"].lower()  # Normalize address
+        key = (sub_dict["user_id"], sub_dict["tracking_type"], sub_dict["target_address"])
+        documents.pop(key, None)
+        documents[key] = sub_dict
+        keys.append(key)
+    
+    unique_keys = list(documents)
+    operations = [
+        UpdateOne(
+            {"user_id": user_id, "tracking_type": tracking_type, "target_address": target_address},
+            {"$set": documents[(user_id, tracking_type, target_address)]},
+            upsert=True
+        )
+        for user_id, tracking_type, target_address in unique_keys
+    ]
+    
+    failed = set()
+    try:
+        await db.tracking_subscriptions.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            failed.add(unique_keys[error["index"]])
+            logging.error(f"Error saving tracking subscription {unique_keys[error['index']]}: {error.get('errmsg')}")
+    
+    for key in unique_keys:
+        if key not in failed:
+            _publish_subscription_change(TrackingSubscription.from_dict(documents[key]))
+    
+    return [key not in failed for key in keys]
 
-def delete_tracking_subscription(user_id: int, tracking_type: str, target_address: str) -> None:
+async def delete_tracking_subscription(user_id: int, tracking_type: str, target_address: str) -> None:
     """Delete a tracking subscription"""
-    db = get_database()
-    db.tracking_subscriptions.delete_one({
+    db = await get_database()
+    result = await db.tracking_subscriptions.delete_one({
         "user_id": user_id,
         "tracking_type": tracking_type,
         "target_address": target_address.lower()
     })
+    if result.deleted_count:
+        _publish_subscription_change(TrackingSubscription(
+            user_id=user_id,
+            tracking_type=tracking_type,
+            target_address=target_address.lower(),
+            is_active=False
+        ))
 
-def update_subscription_check_time(subscription_id: str) -> None:
+async def update_subscription_check_time(subscription_id: str) -> None:
     """Update the last checked time for a subscription"""
-    db = get_database()
-    db.tracking_subscriptions.update_one(
+    db = await get_database()
+    await db.tracking_subscriptions.update_one(
         {"_id": subscription_id},
         {"$set": {"last_checked": datetime.now()}}
     )
 
-def cleanup_expired_premium() -> None:
-    """Remove premium status from users whose premium has expired"""
-    db = get_database()
+async def cleanup_expired_premium(limit: int = 0) -> List[int]:
+    """
+    Remove premium status from users whose premium has expired
+    
+    Args:
+        limit: Maximum number of users to update (0 = all), so callers can work in chunks
+    
+    Returns:
+        The IDs of the users whose premium was removed
+    """
+    db = await get_database()
     now = datetime.now()
-    db.users.update_many(
-        {
-            "is_premium": True,
-            "premium_until": {"$lt": now}
-        },
+    expired = db.users.find(
+        {"is_premium": True, "premium_until": {"$lt": now}},
+        {"_id": 0, "user_id": 1},
+        limit=limit
+    )
+    user_ids = [user["user_id"] async for user in expired]
+    if not user_ids:
+        return []
+    
+    await db.users.update_many(
+        {"user_id": {"$in": user_ids}, "is_premium": True, "premium_until": {"$lt": now}},
         {"$set": {
             "is_premium": False,
             "premium_until": None
         }}
     )
+    for user_id in user_ids:
+        invalidate_premium_status(user_id)
+    return user_ids
 
-def cleanup_old_data(days: int = 30) -> None:
-    """Clean up old data that hasn't been updated in a while"""
-    db = get_database()
-    cutoff_date = datetime.now() - timedelta(days=days)
+async def backfill_expires_at(collection: str, limit: int) -> int:
+    """
+    Set expires_at on documents written before their collection had a TTL index
+    
+    Args:
+        collection: One of EXPIRING_COLLECTIONS
+        limit: Maximum number of documents to update
     
-    # Remove old token data
-    db.token_data.delete_many({"last_updated": {"$lt": cutoff_date}})
+    Returns:
+        The number of documents updated; 0 once the collection is fully backfilled
+    """
+    db = await get_database()
+    now = datetime.now()
+    documents = db[collection].find(
+        {"expires_at": {"$exists": False}},
+        {"_id": 1, "date": 1, "last_updated": 1},
+        limit=limit
+    )
     
-    # Remove old wallet data
-    db.wallet_data.delete_many({"last_updated": {"$lt": cutoff_date}})
+    operations = []
+    async for document in documents:
+        if collection == "user_scans":
+            expires_at = scan_count_expiry(document["date"])
+        else:
+            expires_at = data_expiry(document.get("last_updated") or now)
+        operations.append(UpdateOne({"_id": document["_id"]}, {"$set": {"expires_at": expires_at}}))
+    
+    if operations:
+        await db[collection].bulk_write(operations, ordered=False)
+    return len(operations)
 
-def get_all_active_tracking_subscriptions() -> List[TrackingSubscription]:
+async def get_all_active_tracking_subscriptions() -> List[TrackingSubscription]:
     """Get all active tracking subscriptions across all users"""
-    db = get_database()
+    db = await get_database()
     subscriptions = db.tracking_subscriptions.find({"is_active": True})
-    return [TrackingSubscription.from_dict(sub) for sub in subscriptions]
+    return [TrackingSubscription.from_dict(sub) async for sub in subscriptions]
 
-def get_users_with_expiring_premium(days_left: List[int]) -> List[User]:
-    """Get users whose premium subscription is expiring in the specified number of days"""
-    db = get_database()
+async def get_block_cursor(name: str) -> Optional[int]:
+    """Get the last block processed by a blockchain monitor"""
+    db = await get_database()
+    cursor = await db.monitor_cursors.find_one({"_id": name})
+    return cursor["block"] if cursor else None
+
+async def save_block_cursor(name: str, chain: str, block: int) -> None:
+    """Record the last block processed by a blockchain monitor shard"""
+    db = await get_database()
+    await db.monitor_cursors.update_one(
+        {"_id": name},
+        {"$set": {"chain": chain, "block": block, "updated_at": datetime.now()}},
+        upsert=True
+    )
+
+async def consolidate_block_cursors(chain: str) -> Optional[int]:
+    """
+    Replace all shard cursors of a chain with one chain-wide cursor at the oldest block
+    
+    Args:
+        chain: The blockchain network (eth, base, bsc)
+    
+    Returns:
+        The consolidated block, or None if the chain has no cursors
+    """
+    db = await get_database()
+    query = {"$or": [{"chain": chain}, {"_id": chain}]}
+    cursors = {cursor["_id"]: cursor["block"] async for cursor in db.monitor_cursors.find(query)}
+    if not cursors:
+        return None
+    
+    # Once shards have saved their own cursors the chain-wide one is stale; including
+    # it would rewind every rebalance to the block of the first one
+    shard_cursors = [block for name, block in cursors.items() if name != chain]
+    block = min(shard_cursors) if shard_cursors else cursors[chain]
+    await db.monitor_cursors.delete_many(query)
+    await save_block_cursor(chain, chain, block)
+    return block
+
+async def claim_processed_events(event_keys: List[str]) -> List[str]:
+    """
+    Mark monitor events as processed
+    
+    Args:
+        event_keys: Unique event keys (chain, tx hash and log index)
+    
+    Returns:
+        The keys that had not been processed before
+    """
+    if not event_keys:
+        return []
+    
+    db = await get_database()
+    now = datetime.now()
+    documents = [{"_id": key, "created_at": now} for key in dict.fromkeys(event_keys)]
+    
+    try:
+        await db.processed_events.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in errors):
+            raise
+        seen = {documents[error["index"]]["_id"] for error in errors}
+        return [document["_id"] for document in documents if document["_id"] not in seen]
+    
+    return [document["_id"] for document in documents]
+
+async def count_active_tracking_subscriptions() -> int:
+    """Count the active tracking subscriptions across all users"""
+    db = await get_database()
+    return await db.tracking_subscriptions.count_documents({"is_active": True})
+
+def _expiring_premium_query(days_left: List[int]) -> Dict[str, Any]:
+    """Build the query for users whose premium expires in any of the given numbers of days"""
     now = datetime.now()
     
     # Calculate date ranges for the specified days left
@@ -346,37 +806,81 @@ def get_users_with_expiring_premium(days_left: List[int]) -> List[User]:
         end_date = start_date + timedelta(days=1)
         date_ranges.append({"premium_until": {"$gte": start_date, "$lt": end_date}})
     
+    return {"is_premium": True, "$or": date_ranges}
+
+async def get_users_with_expiring_premium(days_left: List[int]) -> List[User]:
+    """Get users whose premium subscription is expiring in the specified number of days"""
+    db = await get_database()
+    
     # Find users with premium expiring in any of the specified ranges
-    users = db.users.find({
-        "is_premium": True,
-        "$or": date_ranges
-    })
+    users = db.users.find(_expiring_premium_query(days_left))
     
-    return [User.from_dict(user) for user in users]
+    return [User.from_dict(user) async for user in users]
 
-def get_all_users() -> List[User]:
+async def get_all_users() -> List[User]:
     """Get all users in the database"""
-    db = get_database()
+    db = await get_database()
     users = db.users.find()
-    return [User.from_dict(user) for user in users]
+    return [User.from_dict(user) async for user in users]
 
-def get_admin_users() -> List[User]:
+async def get_admin_users() -> List[User]:
     """Get all users with admin privileges"""
-    db = get_database()
+    db = await get_database()
     admin_users = db.users.find({"is_admin": True})
-    return [User.from_dict(user) for user in admin_users]
+    return [User.from_dict(user) async for user in admin_users]
 
-def set_user_admin_status(user_id: int, is_admin: bool) -> None:
+async def iter_users(
+    query: Optional[Dict[str, Any]] = None,
+    fields: Iterable[str] = ("user_id",),
+    batch_size: int = USER_ITER_BATCH_SIZE
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream users from the database without loading them all into memory
+    
+    Args:
+        query: Filter on the users collection (default: every user)
+        fields: The only fields to fetch for each user
+        batch_size: Number of users fetched per cursor round trip
+    
+    Yields:
+        One dictionary per user holding just the requested fields
+    """
+    db = await get_database()
+    projection = {"_id": 0, **{field: 1 for field in fields}}
+    async for user in db.users.find(query or {}, projection, batch_size=batch_size):
+        yield user
+
+def iter_all_users(fields: Iterable[str] = ("user_id",)) -> AsyncIterator[Dict[str, Any]]:
+    """Stream every user; the streaming counterpart of get_all_users"""
+    return iter_users({}, fields)
+
+def iter_admin_users(fields: Iterable[str] = ("user_id",)) -> AsyncIterator[Dict[str, Any]]:
+    """Stream the users with admin privileges; the streaming counterpart of get_admin_users"""
+    return iter_users({"is_admin": True}, fields)
+
+def iter_users_with_expiring_premium(
+    days_left: List[int],
+    fields: Iterable[str] = ("user_id", "premium_until")
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream users whose premium expires in the given numbers of days; see get_users_with_expiring_premium"""
+    return iter_users(_expiring_premium_query(days_left), fields)
+
+async def set_user_admin_status(user_id: int, is_admin: bool) -> None:
     """Set a user's admin status"""
-    db = get_database()
-    db.users.update_one(
+    db = await get_database()
+    await db.users.update_one(
         {"user_id": user_id},
         {"$set": {"is_admin": is_admin}}
     )
 
-def get_user_counts() -> Dict[str, int]:
-    """Get user count statistics"""
-    db = get_database()
+async def get_user_counts() -> Dict[str, int]:
+    """
+    Get user count statistics with a single aggregation
+    
+    The pipeline only reads last_active and is_premium and is hinted onto the index
+    over both, so it is one covered index scan rather than a collection scan per count.
+    """
+    db = await get_database()
     now = datetime.now()
     
     # Calculate date thresholds
@@ -384,35 +888,39 @@ def get_user_counts() -> Dict[str, int]:
     week_ago = now - timedelta(days=7)
     month_ago = now - timedelta(days=30)
     
-    # Get counts
-    total_users = db.users.count_documents({})
-    premium_users = db.users.count_documents({"is_premium": True})
-    active_today = db.users.count_documents({"last_active": {"$gte": today_start}})
-    active_week = db.users.count_documents({"last_active": {"$gte": week_ago}})
-    active_month = db.users.count_documents({"last_active": {"$gte": month_ago}})
-    
-    return {
-        "total_users": total_users,
-        "premium_users": premium_users,
-        "active_today": active_today,
-        "active_week": active_week,
-        "active_month": active_month
-    }
+    def count_matching(query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"$match": query}, {"$count": "count"}]
+    
+    pipeline = [
+        {"$project": {"_id": 0, "last_active": 1, "is_premium": 1}},
+        {"$facet": {
+            "total_users": [{"$count": "count"}],
+            "premium_users": count_matching({"is_premium": True}),
+            "active_today": count_matching({"last_active": {"$gte": today_start}}),
+            "active_week": count_matching({"last_active": {"$gte": week_ago}}),
+            "active_month": count_matching({"last_active": {"$gte": month_ago}})
+        }}
+    ]
+    cursor = await db.users.aggregate(pipeline, hint="user_activity_stats")
+    facets = (await cursor.to_list(length=1))[0]
+    
+    # $count emits nothing when no document matches
+    return {name: result[0]["count"] if result else 0 for name, result in facets.items()}
 
-def update_user_referral_code(user_id: int, referral_code: str) -> None:
+async def update_user_referral_code(user_id: int, referral_code: str) -> None:
     """Update a user's referral code"""
-    db = get_database()
-    db.users.update_one(
+    db = await get_database()
+    await db.users.update_one(
         {"user_id": user_id},
         {"$set": {"referral_code": referral_code}}
     )
 
-def record_referral(referrer_id: int, referred_id: int) -> None:
+async def record_referral(referrer_id: int, referred_id: int) -> None:
     """Record a referral relationship"""
-    db = get_database()
+    db = await get_database()
     
     # Create referral record
-    db.referrals.update_one(
+    await db.referrals.update_one(
         {
             "referrer_id": referrer_id,
             "referred_id": referred_id
@@ -428,12 +936,12 @@ def record_referral(referrer_id: int, referred_id: int) -> None:
     )
     
     # Update referrer's stats
-    db.users.update_one(
+    await db.users.update_one(
         {"user_id": referrer_id},
         {"$inc": {"referral_count": 1}}
     )
     
-def update_user_premium_status(
+async def update_user_premium_status(
     user_id: int,
     is_premium: bool,
     premium_until: datetime,
@@ -454,10 +962,10 @@ def update_user_premium_status(
     """
     try:
         # Get database connection
-        db = get_database()
+        db = await get_database()
         
         # Update user premium status
-        db.users.update_one(
+        await db.users.update_one(
             {"user_id": user_id},
             {"$set": {
                 "is_premium": is_premium,
@@ -468,12 +976,13 @@ def update_user_premium_status(
                 "updated_at": datetime.now()
             }}
         )
+        invalidate_premium_status(user_id)
         
         # Get payment details
         payment_details = get_plan_payment_details(plan, payment_currency)
         
         # Record the transaction
-        db.transactions.insert_one({
+        await db.transactions.insert_one({
             "user_id": user_id,
             "type": "premium_purchase",
             "plan_type": plan,
@@ -542,7 +1051,9 @@ async def get_ath_data(token_address: str, chain:str) -> Dict[str, Any]:
     
     logging.info(f"Placeholder: get_ath_data called for {token_address}")
 
-    response = await fetch_market_cap(chain, token_address.lower())
+    from services.token_cache import get_cached_market_cap
+
+    response = await get_cached_market_cap(chain, token_address.lower())
 
     age = response.get("age")
     cur_mcap = response.get("current_mc")
@@ -571,7 +1082,7 @@ async def get_deployer_wallet_scan_data(token_address: str, chain:str) -> Dict[s
     """
     logging.info(f"Getting deployer wallet scan data for {token_address} on {chain}")
     
-    from utils import get_token_info
+    from services.token_cache import enrich_tokens
     
     try:
         # Fetch token deployer projects data from API
@@ -588,16 +1099,20 @@ async def get_deployer_wallet_scan_data(token_address: str, chain:str) -> Dict[s
         related_tokens = response.get("related_tokens", [])
         total_count = response.get("total_count", 0)
         
+        # Resolve token info and market caps concurrently, keeping whatever finishes in time
+        token_infos, market_caps = await enrich_tokens(
+            [token.get("contract_address") for token in related_tokens if token.get("contract_address")],
+            chain
+        )
+        
         # Process related tokens data
         deployed_tokens = []
         for token in related_tokens:
             contract_address = token.get("contract_address")
             
-            # Get token name and symbol using get_token_info
-            token_info = await get_token_info(contract_address, chain)
+            token_info = token_infos.get(contract_address.lower()) if contract_address else None
             
-            # Get market cap data using fetch_market_cap
-            market_cap_data = await fetch_market_cap(chain, contract_address)
+            market_cap_data = market_caps.get(contract_address.lower(), {}) if contract_address else {}
             
             # Extract market cap information
             current_mc = market_cap_data.get("current_mc", 0)
@@ -982,7 +1497,7 @@ async def get_tokens_deployed_by_wallet(wallet_address: str, chain: str = "eth")
     """   
     logging.info(f"Getting tokens deployed by wallet {wallet_address} on {chain}")
     
-    from utils import get_token_info
+    from services.token_cache import enrich_tokens
     
     try:
         # Fetch data from API
@@ -996,16 +1511,20 @@ async def get_tokens_deployed_by_wallet(wallet_address: str, chain: str = "eth")
         deployed_tokens_raw = response.get("tokens_deployed", [])
         total_count = response.get("total_count", 0)
         
+        # Resolve token info and market caps concurrently, keeping whatever finishes in time
+        token_infos, market_caps = await enrich_tokens(
+            [token.get("contract_address") for token in deployed_tokens_raw if token.get("contract_address")],
+            chain
+        )
+        
         # Process each token to get additional information
         tokens = []
         for token in deployed_tokens_raw:
             contract_address = token.get("contract_address")
             
-            # Get token name and symbol using get_token_info
-            token_info = await get_token_info(contract_address, chain)
+            token_info = token_infos.get(contract_address.lower()) if contract_address else None
             
-            # Get market cap data using fetch_market_cap
-            market_cap_data = await fetch_market_cap(chain, contract_address)
+            market_cap_data = market_caps.get(contract_address.lower(), {}) if contract_address else {}
             
             # Extract market cap information
             current_mc = market_cap_data.get("current_mc", 0) if market_cap_data else 0
@@ -98,7 +98,13 @@ class TokenData:
         current_market_cap: Optional[float] = None,
         ath_market_cap: Optional[float] = None,
         ath_date: Optional[datetime] = None,
-        last_updated: Optional[datetime] = None
+        age: Optional[str] = None,
+        last_updated: Optional[datetime] = None,
+        chain: Optional[str] = None,
+        decimals: Optional[int] = None,
+        total_supply: Optional[float] = None,
+        supply_updated: Optional[datetime] = None,
+        market_data_updated: Optional[datetime] = None
     ):
         self.address = address
         self.name = name
@@ -109,7 +115,13 @@ class TokenData:
         self.current_market_cap = current_market_cap
         self.ath_market_cap = ath_market_cap
         self.ath_date = ath_date
+        self.age = age
         self.last_updated = last_updated or datetime.now()
+        self.chain = chain
+        self.decimals = decimals
+        self.total_supply = total_supply
+        self.supply_updated = supply_updated
+        self.market_data_updated = market_data_updated
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert token data to dictionary for database storage"""
@@ -123,7 +135,13 @@ class TokenData:
             "current_market_cap": self.current_market_cap,
             "ath_market_cap": self.ath_market_cap,
             "ath_date": self.ath_date,
-            "last_updated": self.last_updated
+            "age": self.age,
+            "last_updated": self.last_updated,
+            "chain": self.chain,
+            "decimals": self.decimals,
+            "total_supply": self.total_supply,
+            "supply_updated": self.supply_updated,
+            "market_data_updated": self.market_data_updated
         }
     
     @classmethod
@@ -139,7 +157,13 @@ class TokenData:
             current_market_cap=data.get("current_market_cap"),
             ath_market_cap=data.get("ath_market_cap"),
             ath_date=data.get("ath_date"),
-            last_updated=data.get("last_updated")
+            age=data.get("age"),
+            last_updated=data.get("last_updated"),
+            chain=data.get("chain"),
+            decimals=data.get("decimals"),
+            total_supply=data.get("total_supply"),
+            supply_updated=data.get("supply_updated"),
+            market_data_updated=data.get("market_data_updated")
         )
 
 
@@ -0,0 +1,140 @@
+import logging
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from config import WRITE_BEHIND_INTERVAL_MS, WRITE_BEHIND_MAX_OPS
+from data.database import get_user_scan_count, apply_last_active, apply_scan_increments
+
+ScanKey = Tuple[int, str, str]
+
+class WriteBehindBuffer:
+    """
+    Write-behind buffer for per-interaction user writes
+
+    last_active touches and scan count increments are coalesced in memory, keyed by
+    user and by (user, scan_type, date), and written with one bulk write per collection
+    every WRITE_BEHIND_INTERVAL_MS or once WRITE_BEHIND_MAX_OPS writes are buffered.
+
+    Scan counts are read through the buffer: the stored count is loaded once and then
+    kept here alongside the unflushed increments, so rate limits see every scan even
+    before it reaches MongoDB.
+    """
+
+    def __init__(self, interval_ms: int = WRITE_BEHIND_INTERVAL_MS, max_ops: int = WRITE_BEHIND_MAX_OPS):
+        self._interval = interval_ms / 1000
+        self._max_ops = max_ops
+        self._last_active: Dict[int, datetime] = {}
+        self._scan_increments: Dict[ScanKey, int] = {}
+        # Stored count plus every increment made through this buffer
+        self._scan_counts: Dict[ScanKey, int] = {}
+        self._ops = 0
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def _record(self) -> None:
+        self._ops += 1
+        if self._ops >= self._max_ops:
+            self._wake.set()
+
+    def touch_user(self, user_id: int) -> None:
+        """Record user activity, written on the next flush"""
+        self._last_active[user_id] = datetime.now()
+        self._record()
+
+    async def get_scan_count(self, user_id: int, scan_type: str, date: str) -> int:
+        """Get a user's scan count including increments that are not flushed yet"""
+        key = (user_id, scan_type, date)
+        if key not in self._scan_counts:
+            stored = await get_user_scan_count(user_id, scan_type, date)
+            # Another coroutine may have loaded and incremented it meanwhile
+            self._scan_counts.setdefault(key, stored)
+        return self._scan_counts[key]
+
+    async def increment_scan_count(self, user_id: int, scan_type: str, date: str) -> int:
+        """
+        Increment a user's scan count
+
+        Returns:
+            The new count
+        """
+        key = (user_id, scan_type, date)
+        await self.get_scan_count(user_id, scan_type, date)
+        self._scan_counts[key] += 1
+        self._scan_increments[key] = self._scan_increments.get(key, 0) + 1
+        self._record()
+        return self._scan_counts[key]
+
+    async def flush(self) -> None:
+        """Write everything buffered so far"""
+        async with self._flush_lock:
+            last_active, self._last_active = self._last_active, {}
+            scan_increments, self._scan_increments = self._scan_increments, {}
+            self._ops = 0
+            self._wake.clear()
+
+            # The two collections are written and retried independently, so a failure in
+            # one never replays the other
+            try:
+                failed_active = await apply_last_active(last_active)
+            except Exception as e:
+                logging.error(f"Error flushing {len(last_active)} buffered activity updates: {e}")
+                failed_active = list(last_active)
+
+            try:
+                failed_scans = await apply_scan_increments(scan_increments)
+            except Exception as e:
+                # No per-operation result is available, so the whole batch is retried
+                logging.error(f"Error flushing {len(scan_increments)} buffered scan increments: {e}")
+                failed_scans = list(scan_increments)
+
+            if failed_active or failed_scans:
+                logging.error(f"Requeueing {len(failed_active)} activity updates and {len(failed_scans)} scan increments")
+
+            # Put the failed writes back so the next flush retries them
+            for user_id in failed_active:
+                active = last_active[user_id]
+                self._last_active[user_id] = max(active, self._last_active.get(user_id, active))
+            for key in failed_scans:
+                self._scan_increments[key] = self._scan_increments.get(key, 0) + scan_increments[key]
+            self._ops += len(failed_active) + len(failed_scans)
+
+            # Counts from earlier days are no longer read by rate limits
+            today = datetime.now().date().isoformat()
+            for key in [key for key in self._scan_counts if key[2] != today and key not in self._scan_increments]:
+                del self._scan_counts[key]
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def start(self) -> None:
+        """Start flushing in the background"""
+        if self.is_running:
+            return
+        self._stopping = False
+        self._worker = asyncio.create_task(self._run())
+        logging.info("User write-behind buffer started")
+
+    async def stop(self) -> None:
+        """Stop the background flush and write whatever is still buffered"""
+        if self._worker is not None:
+            # Let the worker finish its current flush rather than cancelling it mid-write
+            self._stopping = True
+            self._wake.set()
+            await self._worker
+            self._worker = None
+        await self.flush()
+
+# Create a singleton instance
+write_buffer = WriteBehindBuffer()
@@ -254,7 +254,7 @@ async def handle_expected_input(update: Update, context: ContextTypes.DEFAULT_TY
                     "deployer": deployer_wallet
                 }
             )
-            save_tracking_subscription(token_subscription)
+            subscriptions = [token_subscription]
             
             # Track deployer wallet if available
             if deployer_wallet:
@@ -271,7 +271,7 @@ async def handle_expected_input(update: Update, context: ContextTypes.DEFAULT_TY
                         "token_symbol": token_info.get("symbol", "Unknown")
                     }
                 )
-                save_tracking_subscription(deployer_subscription)
+                subscriptions.append(deployer_subscription)
             
             # Track top holders
             for holder in top_holders:
@@ -289,7 +289,12 @@ async def handle_expected_input(update: Update, context: ContextTypes.DEFAULT_TY
                         "percentage": holder.get("percentage", 0)
                     }
                 )
-                save_tracking_subscription(holder_subscription)
+                subscriptions.append(holder_subscription)
+            
+            # Save everything in one round trip; the token subscription is the one that must succeed
+            saved = await save_tracking_subscriptions_bulk(subscriptions)
+            if not saved[0]:
+                raise RuntimeError(f"Could not save whale tracking for {token_address}")
             
             # Format the response
             response = (
@@ -986,7 +991,7 @@ async def handle_kol_wallets(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def handle_setup_whale_tracking(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle setup whale tracking callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     callback_data = query.data
     token_address = callback_data.replace("setup_whale_tracking_", "")
@@ -1019,7 +1024,7 @@ async def handle_setup_whale_tracking(update: Update, context: ContextTypes.DEFA
                 "deployer": deployer_wallet
             }
         )
-        save_tracking_subscription(token_subscription)
+        subscriptions = [token_subscription]
         
         # Track deployer wallet if available
         if deployer_wallet:
@@ -1036,7 +1041,7 @@ async def handle_setup_whale_tracking(update: Update, context: ContextTypes.DEFA
                     "token_symbol": token_info.get("symbol", "Unknown")
                 }
             )
-            save_tracking_subscription(deployer_subscription)
+            subscriptions.append(deployer_subscription)
         
         # Track top holders
         for holder in top_holders:
@@ -1054,7 +1059,12 @@ async def handle_setup_whale_tracking(update: Update, context: ContextTypes.DEFA
                     "percentage": holder.get("percentage", 0)
                 }
             )
-            save_tracking_subscription(holder_subscription)
+            subscriptions.append(holder_subscription)
+        
+        # Save everything in one round trip; the token subscription is the one that must succeed
+        saved = await save_tracking_subscriptions_bulk(subscriptions)
+        if not saved[0]:
+            raise RuntimeError(f"Could not save whale tracking for {token_address}")
         
         # Format confirmation message
         response = (
@@ -1114,7 +1124,7 @@ async def handle_setup_whale_tracking(update: Update, context: ContextTypes.DEFA
 async def handle_first_buyers(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle first buyers button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user has reached daily limit
     has_reached_limit, current_count = await check_rate_limit_service(
@@ -1143,7 +1153,7 @@ async def handle_first_buyers(update: Update, context: ContextTypes.DEFAULT_TYPE
 async def handle_token_most_profitable_wallets(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle most profitable wallets button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user has reached daily limit
     has_reached_limit, current_count = await check_rate_limit_service(
@@ -1173,7 +1183,7 @@ async def handle_token_most_profitable_wallets(update: Update, context: ContextT
 async def handle_ath(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle ATH button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user has reached daily limit
     has_reached_limit, current_count = await check_rate_limit_service(
@@ -1204,7 +1214,7 @@ async def handle_ath(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
 async def handle_deployer_wallet_scan(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle deployer wallet scan button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user is premium
     if not user.is_premium:
@@ -1230,7 +1240,7 @@ async def handle_deployer_wallet_scan(update: Update, context: ContextTypes.DEFA
 async def handle_top_holders(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle top holders button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user is premium
     if not user.is_premium:
@@ -1255,7 +1265,7 @@ async def handle_top_holders(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def handle_high_net_worth_holders(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle high net worth token holders button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user is premium
     if not user.is_premium:
@@ -1443,7 +1453,7 @@ async def handle_most_profitable_token_deployer_wallet(update: Update, context:
 async def handle_wallet_holding_duration(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle wallet holding duration button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user has reached daily limit
     has_reached_limit, current_count = await check_rate_limit_service(
@@ -1478,7 +1488,7 @@ async def handle_wallet_holding_duration(update: Update, context: ContextTypes.D
 async def handle_tokens_deployed_by_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle tokens deployed by wallet button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user is premium
     if not user.is_premium:
@@ -1586,7 +1596,7 @@ async def handle_period_selection_callback(
         premium_limit: Limit for premium users
     """
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     selected_period = int(query.data.split("_")[-1])
     logging.info(f"Selected period: {selected_period} days")
@@ -1604,8 +1614,9 @@ async def handle_period_selection_callback(
     
     try:
         # For free users, limit the number of results
-        limit = premium_limit if user.is_premium else free_limit
-        logging.info(f"User is premium: {user.is_premium}, using limit: {limit}")
+        is_premium = await is_user_premium(user.user_id)
+        limit = premium_limit if is_premium else free_limit
+        logging.info(f"User is premium: {is_premium}, using limit: {limit}")
         logging.info(f"Calling get_data_func with days={selected_period}, limit={limit}, chain={selected_chain}")
 
         data = await get_data_func(
@@ -1687,7 +1698,7 @@ async def handle_deployer_period_selection(update: Update, context: ContextTypes
 async def handle_track_wallet_buy_sell(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle track wallet buy/sell button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user is premium
     if not user.is_premium:
@@ -1731,7 +1742,7 @@ async def handle_track_wallet_buy_sell(update: Update, context: ContextTypes.DEF
 async def handle_track_new_token_deploy(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle track new token deployments button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user is premium
     if not user.is_premium:
@@ -1775,7 +1786,7 @@ async def handle_track_new_token_deploy(update: Update, context: ContextTypes.DE
 async def handle_track_profitable_wallets(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle track profitable wallets button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user is premium
     if not user.is_premium:
@@ -1828,7 +1839,7 @@ async def handle_tracking_input(update: Update, context: ContextTypes.DEFAULT_TY
         target_address: Address to track (wallet or token)
     """
     # Get user from database
-    user = get_user(update.effective_user.id)
+    user = await get_user(update.effective_user.id)
     
     # Validate address format
     if not await is_valid_address(target_address):
@@ -1855,7 +1866,7 @@ async def handle_tracking_input(update: Update, context: ContextTypes.DEFAULT_TY
     )
     
     # Save subscription
-    save_tracking_subscription(subscription)
+    await save_tracking_subscription(subscription)
     
     # Prepare confirmation message
     tracking_type_display = {
@@ -1922,8 +1933,7 @@ async def handle_profitable_wallets_tracking(update: Update, context: ContextTyp
             created_at=datetime.now()
         )
         
-        # Save token subscription
-        save_tracking_subscription(token_subscription)
+        subscriptions = [token_subscription]
         
         # Also track the top profitable wallets individually
         for wallet in profitable_wallets:
@@ -1934,7 +1944,12 @@ async def handle_profitable_wallets_tracking(update: Update, context: ContextTyp
                 is_active=True,
                 created_at=datetime.now()
             )
-            save_tracking_subscription(wallet_subscription)
+            subscriptions.append(wallet_subscription)
+        
+        # Save the token and wallet subscriptions in one round trip
+        saved = await save_tracking_subscriptions_bulk(subscriptions)
+        if not saved[0]:
+            raise RuntimeError(f"Could not save profitable wallet tracking for {token_address}")
         
         # Format the response
         response = (
@@ -1973,10 +1988,10 @@ async def handle_profitable_wallets_tracking(update: Update, context: ContextTyp
 async def handle_view_tracking_subscriptions(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle view tracking subscriptions button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Get user's tracking subscriptions
-    subscriptions = get_user_tracking_subscriptions(user.user_id)
+    subscriptions = await get_user_tracking_subscriptions(user.user_id)
     
     if not subscriptions:
         keyboard = [[InlineKeyboardButton("🔙 Back", callback_data="tracking_and_monitoring")]]
@@ -2057,10 +2072,10 @@ async def handle_view_tracking_subscriptions(update: Update, context: ContextTyp
 async def handle_manage_wallet_tracking(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle manage wallet tracking button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Get user's tracking subscriptions
-    subscriptions = get_user_tracking_subscriptions(user.user_id)
+    subscriptions = await get_user_tracking_subscriptions(user.user_id)
     
     # Filter subscriptions by type
     wallet_subscriptions = [sub for sub in subscriptions if sub.tracking_type == "wallet_trades"]
@@ -2107,10 +2122,10 @@ async def handle_manage_wallet_tracking(update: Update, context: ContextTypes.DE
 async def handle_manage_deployment_tracking(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle manage deployment tracking button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Get user's tracking subscriptions
-    subscriptions = get_user_tracking_subscriptions(user.user_id)
+    subscriptions = await get_user_tracking_subscriptions(user.user_id)
     
     # Filter subscriptions by type
     deployment_subscriptions = [sub for sub in subscriptions if sub.tracking_type == "token_deployments"]
@@ -2151,10 +2166,10 @@ async def handle_manage_deployment_tracking(update: Update, context: ContextType
 async def handle_manage_token_tracking(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle manage token tracking button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Get user's tracking subscriptions
-    subscriptions = get_user_tracking_subscriptions(user.user_id)
+    subscriptions = await get_user_tracking_subscriptions(user.user_id)
     
     # Filter subscriptions by type
     token_subscriptions = [sub for sub in subscriptions if sub.tracking_type == "token_profitable_wallets"]
@@ -2203,11 +2218,11 @@ async def handle_remove_tracking(update: Update, context: ContextTypes.DEFAULT_T
     This function removes all tracking subscriptions for the given target address.
     """
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
         
     try:
         # Get all user's tracking subscriptions
-        subscriptions = get_user_tracking_subscriptions(user.user_id)
+        subscriptions = await get_user_tracking_subscriptions(user.user_id)
         
         # Filter subscriptions for the target address
         matching_subs = [sub for sub in subscriptions if sub.target_address.lower() == target_address.lower()]
@@ -2218,7 +2233,7 @@ async def handle_remove_tracking(update: Update, context: ContextTypes.DEFAULT_T
         
         # Delete each matching subscription
         for sub in matching_subs:
-            delete_tracking_subscription(user.user_id, sub.tracking_type, sub.target_address)
+            await delete_tracking_subscription(user.user_id, sub.tracking_type, sub.target_address)
         
         await query.answer("Tracking subscription(s) removed successfully!")
         
@@ -2234,7 +2249,7 @@ async def handle_remove_tracking(update: Update, context: ContextTypes.DEFAULT_T
 async def handle_kol_wallet_profitability(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle KOL wallet profitability button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     has_reached_limit, current_count = await check_rate_limit_service(
         user.user_id, "kol_wallet_profitability_scan", FREE_TOKEN_SCANS_DAILY
@@ -2273,7 +2288,7 @@ async def handle_kol_wallet_profitability(update: Update, context: ContextTypes.
 async def handle_track_whale_wallets(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle track whale wallets button callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user is premium
     if not user.is_premium:
@@ -2351,7 +2366,7 @@ async def handle_premium_info(update: Update, context: ContextTypes.DEFAULT_TYPE
     """Handle premium info callback"""
     query = update.callback_query
     
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     if user.is_premium:
         premium_until = user.premium_until.strftime("%d %B %Y") if user.premium_until else "Unknown"
@@ -2435,7 +2450,7 @@ async def handle_premium_info(update: Update, context: ContextTypes.DEFAULT_TYPE
 async def handle_premium_purchase(update: Update, context: ContextTypes.DEFAULT_TYPE, plan: str, currency: str) -> None:
     """Handle premium purchase callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Get all payment details from a single function call
     payment_details = get_plan_payment_details(plan, currency)
@@ -2546,7 +2561,7 @@ async def handle_payment_made(update: Update, context: ContextTypes.DEFAULT_TYPE
     if the payment is confirmed on the blockchain.
     """
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Show processing message
     await query.edit_message_text(
@@ -2605,7 +2620,7 @@ async def handle_payment_made(update: Update, context: ContextTypes.DEFAULT_TYPE
             from data.database import update_user_premium_status
             
             # Update user status
-            update_user_premium_status(
+            await update_user_premium_status(
                 user_id=user.user_id,
                 is_premium=True,
                 premium_until=premium_until,
@@ -2617,6 +2632,7 @@ async def handle_payment_made(update: Update, context: ContextTypes.DEFAULT_TYPE
             # Clear transaction data from user_data
             if "transaction_id" in context.user_data:
                 del context.user_data["transaction_id"]
+            await clear_cached_user(update, context)
             
             # Log successful premium activation
             logging.info(f"Premium activated for user {user.user_id}, plan: {plan}, currency: {currency}, until: {premium_until}")
@@ -2807,7 +2823,7 @@ async def handle_transaction_id_input(update: Update, context: ContextTypes.DEFA
 async def handle_track_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE, wallet_address: str) -> None:
     """Handle track wallet callback"""
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user is premium
     if not user.is_premium:
@@ -2835,7 +2851,7 @@ async def handle_track_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE
     )
     
     # Save subscription
-    save_tracking_subscription(subscription)
+    await save_tracking_subscription(subscription)
     
     # Confirm to user
     await query.edit_message_text(
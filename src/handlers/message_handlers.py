@@ -7,7 +7,7 @@ from telegram.constants import ParseMode
 
 from config import FREE_TOKEN_SCANS_DAILY, FREE_WALLET_SCANS_DAILY
 from data.database import get_token_data, get_wallet_data
-from services.blockchain import is_valid_address, get_first_buyers, get_token_holders
+from services.blockchain import is_valid_address, classify_address, get_first_buyers, get_token_holders
 from services.user_management import get_or_create_user, check_rate_limit_service
 from handlers.callback_handlers import handle_start_menu, handle_payment_made, handle_expected_input
 
@@ -88,10 +88,11 @@ async def handle_auto_detect_address(update: Update, context: ContextTypes.DEFAU
     )
     
     try:
-        # Try to get token data first
-        token_data = await get_token_data(address)
+        # Classify the address through the shared cache, which only asks the chain on a miss
+        chain = context.user_data.get("default_network") or context.user_data.get("selected_chain", "eth")
+        address_kind = await classify_address(address, chain, hedge=True)
         
-        if token_data:
+        if address_kind == "token":
             # It's a token address
             context.user_data["expecting"] = "token_address"
             # Create a dummy update with the processing message
@@ -118,10 +119,7 @@ async def handle_auto_detect_address(update: Update, context: ContextTypes.DEFAU
             await handle_expected_input(dummy_update, context)
             return
         
-        # If not a token, try as wallet
-        wallet_data = await get_wallet_data(address)
-        
-        if wallet_data:
+        if address_kind == "eoa":
             # It's a wallet address
             context.user_data["expecting"] = "wallet_address"
             # Create a dummy update with the processing message
@@ -182,7 +180,8 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         user_id=update.effective_user.id,
         username=update.effective_user.username,
         first_name=update.effective_user.first_name,
-        last_name=update.effective_user.last_name
+        last_name=update.effective_user.last_name,
+        context=context
     )
     
     # First check if this is a transaction ID submission
@@ -234,7 +233,8 @@ async def handle_command_scan_token(update: Update, context: ContextTypes.DEFAUL
         user_id=update.effective_user.id,
         username=update.effective_user.username,
         first_name=update.effective_user.first_name,
-        last_name=update.effective_user.last_name
+        last_name=update.effective_user.last_name,
+        context=context
     )
     
     has_reached_limit, current_count = await check_rate_limit_service(
@@ -311,7 +311,8 @@ async def handle_command_scan_wallet(update: Update, context: ContextTypes.DEFAU
         user_id=update.effective_user.id,
         username=update.effective_user.username,
         first_name=update.effective_user.first_name,
-        last_name=update.effective_user.last_name
+        last_name=update.effective_user.last_name,
+        context=context
     )
     
     has_reached_limit, current_count = await check_rate_limit_service(
@@ -387,7 +388,8 @@ async def handle_command_premium_help(update: Update, context: ContextTypes.DEFA
         user_id=update.effective_user.id,
         username=update.effective_user.username,
         first_name=update.effective_user.first_name,
-        last_name=update.effective_user.last_name
+        last_name=update.effective_user.last_name,
+        context=context
     )
     
     # Check if user is premium
@@ -466,7 +468,8 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
         user_id=update.effective_user.id,
         username=update.effective_user.username,
         first_name=update.effective_user.first_name,
-        last_name=update.effective_user.last_name
+        last_name=update.effective_user.last_name,
+        context=context
     )
     
     # Check if user is premium
@@ -519,7 +522,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
             from data.database import save_tracking_subscription, get_tracking_subscription
             
             # Check if subscription already exists
-            existing_sub = get_tracking_subscription(user.user_id, "deployer", wallet_address)
+            existing_sub = await get_tracking_subscription(user.user_id, "deployer", wallet_address)
             
             if existing_sub and existing_sub.is_active:
                 await update.message.reply_text(
@@ -537,7 +540,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
                 created_at=datetime.now()
             )
             
-            save_tracking_subscription(subscription)
+            await save_tracking_subscription(subscription)
             
             await update.message.reply_text(
                 f"✅ Now tracking wallet: `{wallet_address[:6]}...{wallet_address[-4:]}`\n\n"
@@ -562,7 +565,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
             from data.database import save_tracking_subscription, get_tracking_subscription
             
             # Check if subscription already exists
-            existing_sub = get_tracking_subscription(user.user_id, "wallet", wallet_address)
+            existing_sub = await get_tracking_subscription(user.user_id, "wallet", wallet_address)
             
             if existing_sub and existing_sub.is_active:
                 await update.message.reply_text(
@@ -580,7 +583,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
                 created_at=datetime.now()
             )
             
-            save_tracking_subscription(subscription)
+            await save_tracking_subscription(subscription)
             
             await update.message.reply_text(
                 f"✅ Now tracking wallet: `{wallet_address[:6]}...{wallet_address[-4:]}`\n\n"
@@ -605,7 +608,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
             from data.database import save_tracking_subscription, get_tracking_subscription, get_token_data
             
             # Check if subscription already exists
-            existing_sub = get_tracking_subscription(user.user_id, "token", token_address)
+            existing_sub = await get_tracking_subscription(user.user_id, "token", token_address)
             
             if existing_sub and existing_sub.is_active:
                 await update.message.reply_text(
@@ -623,7 +626,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
                 created_at=datetime.now()
             )
             
-            save_tracking_subscription(subscription)
+            await save_tracking_subscription(subscription)
             
             # Get token data for name
             token_data = await get_token_data(token_address)
@@ -649,12 +652,13 @@ async def handle_command_my_tracking(update: Update, context: ContextTypes.DEFAU
         user_id=update.effective_user.id,
         username=update.effective_user.username,
         first_name=update.effective_user.first_name,
-        last_name=update.effective_user.last_name
+        last_name=update.effective_user.last_name,
+        context=context
     )
     
     # Get user's tracking subscriptions
     from data.database import get_user_tracking_subscriptions
-    subscriptions = get_user_tracking_subscriptions(user.user_id)
+    subscriptions = await get_user_tracking_subscriptions(user.user_id)
     
     if not subscriptions:
         await update.message.reply_text(
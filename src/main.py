@@ -2,12 +2,17 @@ import logging
 import sys
 import asyncio
 from telegram import Update
-from telegram.ext import ApplicationBuilder, CallbackQueryHandler, MessageHandler, filters
+from telegram.ext import ApplicationBuilder, CallbackQueryHandler, MessageHandler, TypeHandler, filters
 from config import TELEGRAM_TOKEN
 from handlers.callback_handlers import handle_callback_query as button_callback, handle_expected_input, handle_start_menu, handle_profitable_period_selection, handle_deployer_period_selection
 from handlers.error_handlers import error_handler
-from data.database import init_database
-from services.blockchain import start_blockchain_monitor
+from data.database import init_database, close_database
+from data.write_buffer import write_buffer
+from services.monitor import start_blockchain_monitor, stop_blockchain_monitor
+from services.notification import notification_dispatcher
+from services.rpc_pool import start_rpc_health_checks, stop_rpc_health_checks
+from services.maintenance import start_maintenance, stop_maintenance
+from services.user_management import clear_cached_user, start_user_stats_refresh, stop_user_stats_refresh
 
 # Configure logging
 logging.basicConfig(
@@ -16,11 +21,49 @@ logging.basicConfig(
 
 async def post_init(application):
     """Run after the application has been initialized"""
+    # Initialize database connection on the bot's event loop
+    if not await init_database():
+        logging.error("❌ Could not connect to MongoDB. Please check your configuration.")
+        sys.exit(1)
+    
+    # Coalesce per-interaction user writes into periodic bulk writes
+    await write_buffer.start()
+    
+    # Keep the admin user statistics snapshot fresh
+    await start_user_stats_refresh()
+    
+    # Chunked, throttled database maintenance; expiry itself is left to TTL indexes
+    await start_maintenance()
+    
+    # Share the application's bot (and its connection pool) with the notification queue
+    await notification_dispatcher.start(application.bot)
+    
+    # Keep RPC endpoint health and latency fresh for provider selection
+    await start_rpc_health_checks()
+    
     # Start the blockchain monitor
     await start_blockchain_monitor()
 
+async def post_stop(application):
+    """Run after the application has stopped, before the bot is shut down"""
+    await stop_blockchain_monitor()
+    await stop_rpc_health_checks()
+    await stop_maintenance()
+    await stop_user_stats_refresh()
+    await notification_dispatcher.stop()
+    await write_buffer.stop()
+    await close_database()
+
 def create_bot():
-    application = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
+    application = (
+        ApplicationBuilder()
+        .token(TELEGRAM_TOKEN)
+        .post_init(post_init)
+        .post_stop(post_stop)
+        .build()
+    )
+    # Runs first for every update so the user cached by get_or_create_user never outlives it
+    application.add_handler(TypeHandler(Update, clear_cached_user), group=-1)
     application.add_handler(MessageHandler(filters.Text(["/start"]), handle_start_menu))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_expected_input))
     application.add_handler(CallbackQueryHandler(handle_profitable_period_selection, pattern="^profitable_period_"))
@@ -31,24 +74,12 @@ def create_bot():
     return application
 
 def main():
-    # Initialize database connection
-    if not init_database():
-        logging.error("❌ Could not connect to MongoDB. Please check your configuration.")
-        sys.exit(1)
-    
     logging.info("🚀 Starting Crypto DeFi Analyze Telegram Bot... 💎")
     
+    # The database, blockchain monitor and notification dispatcher are started in
+    # post_init so they run on the bot's event loop and share its Bot instance
     app = create_bot()
     
-    # Start the blockchain monitor in a separate thread
-    import threading
-    def run_blockchain_monitor():
-        asyncio.run(start_blockchain_monitor())
-    
-    monitor_thread = threading.Thread(target=run_blockchain_monitor)
-    monitor_thread.daemon = True  # This ensures the thread will exit when the main program exits
-    monitor_thread.start()
-    
     # Run the polling
     app.run_polling(allowed_updates=Update.ALL_TYPES)
 
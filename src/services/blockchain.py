@@ -1,31 +1,23 @@
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any
+import time
+from typing import Dict, List, Optional, Any, Tuple
 import re
-from web3 import Web3
+import aiohttp
+from eth_abi import decode as abi_decode
+from web3 import Web3, AsyncWeb3
 from web3.exceptions import InvalidAddress, ContractLogicError
 
-from config import WEB3_PROVIDER_URI_KEY
-
-from datetime import datetime, timedelta
-
-from data.database import (
-    get_all_active_tracking_subscriptions,
-    get_token_profitable_wallets,
+from config import (
+    RPC_BATCH_SIZE, RPC_REQUEST_TIMEOUT, RPC_HEDGE_ENABLED,
+    ADDRESS_CLASS_CACHE_SIZE, ADDRESS_CLASS_NEGATIVE_TTL
 )
 
-from services.notification import (
-    send_tracking_notification,
-    format_wallet_activity_notification,
-    format_token_deployment_notification,
-    format_profitable_wallet_notification
-)
+from datetime import datetime, timedelta
 
-# Configure web3 connection
-# This would be replaced with your actual blockchain node connection
-w3_eth = Web3(Web3.HTTPProvider("https://mainnet.infura.io/v3/29bb8bd1892e49eb8af5cea9060caa4e"))
-w3_base = Web3(Web3.HTTPProvider('https://mainnet.base.org'))
-w3_bsc = Web3(Web3.HTTPProvider('https://bsc-dataseed.binance.org/'))
+from data.cache import LRUCache
+from data.database import get_address_classes, save_address_classes
+from services.rpc_pool import RPCEndpoint, RPCPool, get_rpc_pool, rpc_pools
 
 ERC20_ABI = [
     {
@@ -57,6 +49,376 @@ ERC20_ABI = [
     }
 ]
 
+# Function selectors for the ERC-20 metadata getters
+ERC20_METADATA_SELECTORS = {
+    "name": "0x06fdde03",
+    "symbol": "0x95d89b41",
+    "decimals": "0x313ce567",
+    "total_supply": "0x18160ddd"
+}
+
+class RPCPoolExhausted(Exception):
+    """Raised when every endpoint of a chain's pool has been tried for a request"""
+
+_rpc_session: Optional[aiohttp.ClientSession] = None
+
+async def _get_rpc_session() -> aiohttp.ClientSession:
+    """Get or create the HTTP session used for JSON-RPC batches"""
+    global _rpc_session
+    if _rpc_session is None or _rpc_session.closed:
+        _rpc_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=RPC_REQUEST_TIMEOUT))
+    return _rpc_session
+
+async def _post_rpc(pool: RPCPool, endpoint: RPCEndpoint, payload: List[Dict[str, Any]],
+                    observe: bool = False) -> List[Dict[str, Any]]:
+    """
+    Post a JSON-RPC batch to one endpoint, recording its latency and health
+    
+    Args:
+        pool: The chain's endpoint pool
+        endpoint: The endpoint to post to
+        payload: The JSON-RPC batch
+        observe: Add the latency to the pool's hedge delay samples; only hedgeable reads
+            do, so large log and receipt batches don't inflate the delay
+    
+    Returns:
+        The JSON-RPC replies
+    """
+    session = await _get_rpc_session()
+    started = time.monotonic()
+    try:
+        async with session.post(endpoint.url, json=payload) as response:
+            response.raise_for_status()
+            replies = await response.json(content_type=None)
+        
+        if not isinstance(replies, list):
+            raise ValueError(f"Provider rejected batch request: {replies}")
+    except Exception:
+        endpoint.record_failure()
+        raise
+    
+    latency = time.monotonic() - started
+    endpoint.record_success(latency)
+    if observe:
+        pool.observe(latency)
+    return replies
+
+async def _post_rpc_hedged(pool: RPCPool, tried: List[RPCEndpoint], payload: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Post a read-only JSON-RPC batch, resending it to a second endpoint if the first is slow
+    
+    The first endpoint gets the pool's p95 latency to answer; after that, if the hedge
+    budget allows, the same batch goes to another endpoint and the first answer wins.
+    
+    Args:
+        pool: The chain's endpoint pool
+        tried: Endpoints already used for this batch; chosen endpoints are appended
+        payload: The JSON-RPC batch
+    
+    Returns:
+        The replies from whichever endpoint answered first
+    """
+    primary = await pool.acquire(exclude=tried)
+    if primary is None:
+        raise RPCPoolExhausted(f"All {pool.chain} RPC endpoints failed")
+    tried.append(primary)
+    pool.count_request()
+    
+    pending = {asyncio.ensure_future(_post_rpc(pool, primary, payload, observe=True))}
+    delay = pool.hedge_delay()
+    if delay is not None:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done and pool.try_hedge():
+            secondary = pool.select(exclude=tried)
+            # A hedge never waits for budget; without any it just isn't sent
+            if secondary is not None:
+                tried.append(secondary)
+                pending.add(asyncio.ensure_future(_post_rpc(pool, secondary, payload, observe=True)))
+    
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+    raise error
+
+async def rpc_batch(chain: str, calls: List[Tuple[str, list]], hedge: bool = False) -> List[Any]:
+    """
+    Send several JSON-RPC calls to a chain's provider in a single HTTP request
+    
+    Args:
+        chain: The blockchain network (eth, base, bsc)
+        calls: List of (method, params) tuples
+        hedge: Resend slow batches to a second endpoint; only for read-only calls on
+            latency-critical paths
+    
+    Returns:
+        List of results in the same order as calls; failed calls yield None
+    """
+    if not calls:
+        return []
+    
+    pool = get_rpc_pool(chain)
+    results: List[Any] = [None] * len(calls)
+    
+    async def send_chunk(offset: int) -> None:
+        payload = [
+            {"jsonrpc": "2.0", "id": offset + i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls[offset:offset + RPC_BATCH_SIZE])
+        ]
+        
+        # Fail over to the next endpoint until one answers
+        tried: List[RPCEndpoint] = []
+        while True:
+            if hedge and RPC_HEDGE_ENABLED:
+                try:
+                    replies = await _post_rpc_hedged(pool, tried, payload)
+                    break
+                except RPCPoolExhausted:
+                    raise
+                except Exception as e:
+                    logging.warning(f"Hedged {chain} RPC request failed: {e}")
+                    continue
+            
+            endpoint = await pool.acquire(exclude=tried)
+            if endpoint is None:
+                raise RPCPoolExhausted(f"All {chain} RPC endpoints failed")
+            tried.append(endpoint)
+            try:
+                replies = await _post_rpc(pool, endpoint, payload)
+                break
+            except Exception as e:
+                logging.warning(f"RPC request to {endpoint.url} failed: {e}")
+        
+        for reply in replies:
+            if "error" in reply:
+                continue
+            results[reply["id"]] = reply.get("result")
+    
+    await asyncio.gather(*(send_chunk(offset) for offset in range(0, len(calls), RPC_BATCH_SIZE)))
+    return results
+
+def _decode_string_result(data: Optional[str]) -> Optional[str]:
+    """Decode an eth_call result as a string, falling back to bytes32 for older tokens"""
+    if not data or data == "0x":
+        return None
+    raw = bytes.fromhex(data[2:])
+    try:
+        return abi_decode(["string"], raw)[0]
+    except Exception:
+        if len(raw) == 32:
+            return raw.rstrip(b"\x00").decode("utf-8", errors="ignore") or None
+        return None
+
+def _decode_uint_result(data: Optional[str]) -> Optional[int]:
+    """Decode an eth_call result as a uint"""
+    if not data or data == "0x" or len(data) < 66:
+        return None
+    return int(data[2:66], 16)
+
+async def get_token_metadata_batch(token_addresses: List[str], chain: str, hedge: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch contract code and ERC-20 metadata for many tokens in one batched request
+    
+    Args:
+        token_addresses: The token contract addresses
+        chain: The blockchain network (eth, base, bsc)
+        hedge: Hedge the RPC batch against a slow endpoint (user-facing lookups)
+    
+    Returns:
+        Dictionary keyed by lowercase address with the validity verdict ("is_token")
+        and the name, symbol, decimals and total_supply fields
+    """
+    metadata = {}
+    calls = []
+    queried = []
+    
+    for address in token_addresses:
+        key = address.lower() if address else address
+        if key in metadata:
+            continue
+        
+        metadata[key] = {
+            "address": address,
+            "is_token": False,
+            "name": None,
+            "symbol": None,
+            "decimals": None,
+            "total_supply": None,
+            "has_code": None
+        }
+        if not await is_valid_address(address):
+            logging.warning(f"Invalid address format: {address}")
+            continue
+        
+        checksum_address = Web3.to_checksum_address(key)
+        calls.append(("eth_getCode", [checksum_address, "latest"]))
+        for selector in ERC20_METADATA_SELECTORS.values():
+            calls.append(("eth_call", [{"to": checksum_address, "data": selector}, "latest"]))
+        queried.append(key)
+    
+    results = await rpc_batch(chain, calls, hedge=hedge)
+    stride = 1 + len(ERC20_METADATA_SELECTORS)
+    
+    for i, key in enumerate(queried):
+        code, name, symbol, decimals, total_supply = results[i * stride:(i + 1) * stride]
+        entry = metadata[key]
+        
+        entry["name"] = _decode_string_result(name)
+        entry["symbol"] = _decode_string_result(symbol)
+        entry["decimals"] = _decode_uint_result(decimals)
+        raw_supply = _decode_uint_result(total_supply)
+        if raw_supply is not None and entry["decimals"] is not None:
+            entry["total_supply"] = raw_supply / (10 ** entry["decimals"])
+        
+        if code is None:
+            # The node returned an error, so the address stays unclassified
+            continue
+        
+        entry["has_code"] = code != "0x"
+        entry["is_token"] = entry["has_code"] and (entry["name"] is not None or entry["decimals"] is not None)
+        _remember_address_class(chain, key, _classify_metadata(entry))
+    
+    return metadata
+
+async def get_token_metadata(token_address: str, chain: str) -> Dict[str, Any]:
+    """Fetch contract code and ERC-20 metadata for a single token"""
+    metadata = await get_token_metadata_batch([token_address], chain)
+    return metadata[token_address.lower() if token_address else token_address]
+
+async def get_token_supply_batch(token_decimals: Dict[str, int], chain: str, hedge: bool = False) -> Dict[str, Optional[float]]:
+    """
+    Fetch only the total supply of many known tokens in one batched request
+    
+    Args:
+        token_decimals: Mapping of lowercase token address to its decimals
+        chain: The blockchain network (eth, base, bsc)
+        hedge: Hedge the RPC batch against a slow endpoint (user-facing lookups)
+    
+    Returns:
+        Dictionary keyed by lowercase address with the scaled total supply, or None
+        where the call failed
+    """
+    addresses = list(token_decimals)
+    calls = [
+        ("eth_call", [{"to": Web3.to_checksum_address(address), "data": ERC20_METADATA_SELECTORS["total_supply"]}, "latest"])
+        for address in addresses
+    ]
+    results = await rpc_batch(chain, calls, hedge=hedge)
+    
+    supplies = {}
+    for address, result in zip(addresses, results):
+        raw_supply = _decode_uint_result(result)
+        supplies[address] = raw_supply / (10 ** token_decimals[address]) if raw_supply is not None else None
+    return supplies
+
+# In-process tier of the address classification cache, keyed by (chain, lowercase address)
+_address_class_cache = LRUCache(maxsize=ADDRESS_CLASS_CACHE_SIZE)
+
+def _classify_metadata(metadata: Dict[str, Any]) -> Optional[str]:
+    """Classify an address from its batched metadata as "eoa", "contract" or "token", or None if its code is unknown"""
+    if metadata["has_code"] is None:
+        return None
+    if metadata["is_token"]:
+        return "token"
+    return "contract" if metadata["has_code"] else "eoa"
+
+def _remember_address_class(chain: str, address: str, kind: str) -> None:
+    """Store a classification in memory; only token results are permanent"""
+    ttl = None if kind == "token" else ADDRESS_CLASS_NEGATIVE_TTL
+    _address_class_cache.set((chain, address), kind, ttl=ttl)
+
+async def classify_addresses(addresses: List[str], chain: str, hedge: bool = False) -> Dict[str, Optional[str]]:
+    """
+    Classify addresses as externally owned, contract or ERC-20 token, checking memory, then MongoDB, then the chain
+    
+    Whether an address holds code almost never changes, so the validators share this
+    cache instead of calling eth_getCode on every input. Only "token" results are
+    permanent: a contract can later be deployed to an "eoa", and the batch cannot tell
+    a reverted ERC-20 call from one that failed on the node, so a "contract" may be a
+    token whose calls errored.
+    
+    Args:
+        addresses: The addresses to classify
+        chain: The blockchain network (eth, base, bsc)
+        hedge: Hedge the chain lookup against a slow RPC endpoint
+    
+    Returns:
+        Dictionary keyed by lowercase address with "eoa", "contract" or "token";
+        malformed addresses and addresses the node failed to answer for map to None
+    """
+    results: Dict[str, Optional[str]] = {}
+    missing = []
+    
+    for address in addresses:
+        if not address or address.lower() in results:
+            continue
+        
+        key = address.lower()
+        results[key] = None
+        if not await is_valid_address(address):
+            continue
+        
+        kind = _address_class_cache.get((chain, key))
+        if kind is not None:
+            results[key] = kind
+        else:
+            missing.append(key)
+    
+    if not missing:
+        return results
+    
+    # Second tier: the address_classes collection
+    try:
+        stored = await get_address_classes(chain, missing)
+    except Exception as e:
+        logging.error(f"Error reading address classifications: {e}")
+        stored = {}
+    
+    to_fetch = []
+    for key in missing:
+        if key in stored:
+            results[key] = stored[key]
+            _remember_address_class(chain, key, stored[key])
+        else:
+            to_fetch.append(key)
+    
+    if not to_fetch:
+        return results
+    
+    # Everything left comes from the chain in one batched request
+    metadata = await get_token_metadata_batch(to_fetch, chain, hedge=hedge)
+    now = datetime.now()
+    classes = {}
+    expires_at = {}
+    
+    for key in to_fetch:
+        kind = _classify_metadata(metadata[key])
+        results[key] = kind
+        if kind is None:
+            continue
+        classes[key] = kind
+        if kind != "token":
+            expires_at[key] = now + timedelta(seconds=ADDRESS_CLASS_NEGATIVE_TTL)
+    
+    try:
+        await save_address_classes(chain, classes, expires_at)
+    except Exception as e:
+        logging.error(f"Error saving address classifications: {e}")
+    
+    return results
+
+async def classify_address(address: str, chain: str, hedge: bool = False) -> Optional[str]:
+    """Classify a single address; see classify_addresses"""
+    classes = await classify_addresses([address], chain, hedge=hedge)
+    return classes.get(address.lower()) if address else None
+
 async def is_valid_address(address: str) -> bool:
     if not address:
         return False
@@ -67,40 +429,12 @@ async def is_valid_token_contract(address: str, chain: str) -> bool:
         logging.warning(f"Invalid address format: {address}")
         return False
 
-    w3 = get_web3_provider(chain)
-
     try:
-        checksum_address = w3.to_checksum_address(address.lower())
-        code = w3.eth.get_code(checksum_address)
-
-        if code == b'' or code == b'0x':
-            logging.info("Address has no contract code.")
+        if await classify_address(address, chain) != "token":
+            logging.warning("Address has no contract code or no ERC-20 behavior.")
             return False
-
-        contract = w3.eth.contract(address=checksum_address, abi=ERC20_ABI)
-
-        try:
-            symbol = contract.functions.symbol().call()
-            logging.info(f"Token symbol: {symbol}")
-        except Exception as e:
-            logging.warning(f"Couldn't get token symbol: {e}")
-
-        try:
-            name = contract.functions.name().call()
-            logging.info(f"Token name: {name}")
-            return True
-        except Exception as e:
-            logging.warning(f"Couldn't get token name: {e}")
-
-        try:
-            decimals = contract.functions.decimals().call()
-            logging.info(f"Token decimals: {decimals}")
-            return True
-        except Exception as e:
-            logging.warning(f"Couldn't get token decimals: {e}")
-
-        logging.warning("Address has code but no ERC-20 behavior.")
-        return False
+        
+        return True
 
     except Exception as e:
         logging.error(f"Error validating token contract: {e}")
@@ -121,44 +455,41 @@ async def is_valid_wallet_address(address: str, chain:str) -> bool:
     if not await is_valid_address(address):
         return False
     
-    w3 = get_web3_provider(chain)
-    
     try:
-        checksum_address = w3.to_checksum_address(address.lower())
-        code = w3.eth.get_code(checksum_address)
+        kind = await classify_address(address, chain, hedge=True)
+        if kind is None:
+            raise ValueError("eth_getCode returned an error")
         # If there's no code, it's a regular wallet address
-        return code == b'' or code == '0x'
+        return kind == "eoa"
     except Exception as e:
         logging.error(f"Error validating wallet address on {chain}: {e}")
         # Return True if the format is correct but web3 validation fails
         # This is a fallback to prevent false negatives due to connection issues
         return True
 
-def get_web3_provider(chain: str):
+def get_web3_provider(chain: str) -> AsyncWeb3:
     """
-    Get the appropriate Web3 provider for the specified chain
+    Get a Web3 provider for the specified chain from its endpoint pool
     
     Args:
         chain: The blockchain network (eth, base, bsc)
     
     Returns:
-        Web3: The Web3 provider for the specified chain
+        AsyncWeb3: The async Web3 provider of the currently preferred endpoint
     """
-    if chain == "eth":
-        return w3_eth
-    elif chain == "base":
-        return w3_base
-    elif chain == "bsc":
-        return w3_bsc
-    else:
-        logging.warning(f"Unknown chain '{chain}', defaulting to Ethereum")
-        return w3_eth
+    # Only a lookup: the provider's own requests are not known here, so nothing is charged
+    endpoint = get_rpc_pool(chain).select(charge=False)
+    if endpoint is None:
+        raise RPCPoolExhausted(f"No {chain} RPC endpoint has budget left")
+    return endpoint.w3
 
-def check_providers():
-    """Check if all blockchain providers are connected"""
-    eth_connected = w3_eth.is_connected()
-    base_connected = w3_base.is_connected()
-    bsc_connected = w3_bsc.is_connected()
+async def check_providers():
+    """Probe every pooled endpoint and check that each chain has a connected one"""
+    eth_connected, base_connected, bsc_connected = await asyncio.gather(
+        rpc_pools["eth"].probe(),
+        rpc_pools["base"].probe(),
+        rpc_pools["bsc"].probe()
+    )
     
     if not (eth_connected and base_connected and bsc_connected):
         logging.warning(f"Provider connection status: ETH: {eth_connected}, BASE: {base_connected}, BSC: {bsc_connected}")
@@ -185,13 +516,10 @@ async def get_recent_transactions(
     logging.info(f"Getting recent transactions for wallet {wallet_address}")
     
     try:
-        # Initialize Web3 connection
-        w3 = Web3(Web3.HTTPProvider(WEB3_PROVIDER_URI_KEY))
-        
         # Normalize addresses
-        wallet_address = w3.to_checksum_address(wallet_address)
+        wallet_address = Web3.to_checksum_address(wallet_address)
         if token_address:
-            token_address = w3.to_checksum_address(token_address)
+            token_address = Web3.to_checksum_address(token_address)
         
         # In a real implementation, you would:
         # 1. Query blockchain or indexer API for transactions
@@ -274,141 +602,3 @@ def is_contract_creation(tx: Dict[str, Any]) -> bool:
     
     # For now, use a simple flag in our mock data
     return tx.get('is_contract_creation', False)
-
-# Keep track of processed transactions to avoid duplicate notifications
-processed_txs = set()
-
-async def start_blockchain_monitor():
-    """Start the blockchain monitor as a background task"""
-    logging.info("Starting blockchain monitor...")
-    asyncio.create_task(monitor_blockchain_events())
-
-async def monitor_blockchain_events():
-    """Background task to monitor blockchain events and send notifications"""
-    logging.info("Blockchain monitor running")
-
-    from utils import get_token_info
-    
-    # Keep track of processed transactions to avoid duplicate notifications
-    processed_txs = set()
-    
-    while True:
-        try:
-            # Get all active tracking subscriptions
-            subscriptions = get_all_active_tracking_subscriptions()
-            
-            if not subscriptions:
-                # No active subscriptions, sleep and check again later
-                await asyncio.sleep(60)
-                continue
-            
-            # Group subscriptions by address for efficient querying
-            tracked_wallets = {}
-            tracked_tokens = {}
-            
-            for sub in subscriptions:
-                if sub.tracking_type in ["wallet_trades", "token_deployments"]:
-                    if sub.target_address not in tracked_wallets:
-                        tracked_wallets[sub.target_address] = []
-                    tracked_wallets[sub.target_address].append(sub)
-                elif sub.tracking_type == "token_profitable_wallets":
-                    if sub.target_address not in tracked_tokens:
-                        tracked_tokens[sub.target_address] = []
-                    tracked_tokens[sub.target_address].append(sub)
-            
-            # Check for new transactions for tracked wallets
-            for wallet_address, subs in tracked_wallets.items():
-                # Get transactions from the last 10 minutes
-                recent_txs = await get_recent_transactions(
-                    wallet_address, 
-                    from_time=datetime.now() - timedelta(minutes=10)
-                )
-                
-                for tx in recent_txs:
-                    # Skip already processed transactions
-                    tx_hash = tx.get('hash')
-                    if tx_hash in processed_txs:
-                        continue
-                    
-                    # Mark as processed
-                    processed_txs.add(tx_hash)
-                    
-                    # Process each transaction
-                    if is_token_transfer(tx):
-                        # Notify users tracking wallet trades
-                        for sub in subs:
-                            if sub.tracking_type == "wallet_trades":
-                                token_info = await get_token_info(tx['token_address'])
-                                tx['token_name'] = token_info.get('symbol', 'Unknown Token')
-                                
-                                message = format_wallet_activity_notification(
-                                    wallet_address=wallet_address,
-                                    tx_data=tx
-                                )
-                                
-                                await send_tracking_notification(sub.user_id, message)
-                    
-                    elif is_contract_creation(tx):
-                        # Notify users tracking token deployments
-                        for sub in subs:
-                            if sub.tracking_type == "token_deployments":
-                                message = format_token_deployment_notification(
-                                    deployer_address=wallet_address,
-                                    contract_address=tx['contract_address'],
-                                    timestamp=tx['timestamp']
-                                )
-                                
-                                await send_tracking_notification(sub.user_id, message)
-            
-            # Check for transactions involving tracked tokens
-            for token_address, subs in tracked_tokens.items():
-                # Get profitable wallets for this token
-                profitable_wallets = await get_token_profitable_wallets(token_address)
-                
-                # Get token info once for all notifications
-                token_info = await get_token_info(token_address)
-                token_name = token_info.get('symbol', 'Unknown Token')
-                
-                # Check for recent transactions by these wallets
-                for wallet in profitable_wallets:
-                    wallet_address = wallet['address']
-                    
-                    # Get transactions involving this token from the last 10 minutes
-                    recent_txs = await get_recent_transactions(
-                        wallet_address=wallet_address,
-                        token_address=token_address,
-                        from_time=datetime.now() - timedelta(minutes=10)
-                    )
-                    
-                    for tx in recent_txs:
-                        # Skip already processed transactions
-                        tx_hash = tx.get('hash')
-                        if tx_hash in processed_txs:
-                            continue
-                        
-                        # Mark as processed
-                        processed_txs.add(tx_hash)
-                        
-                        # Notify users tracking profitable wallets
-                        for sub in subs:
-                            message = format_profitable_wallet_notification(
-                                wallet_address=wallet_address,
-                                token_name=token_name,
-                                tx_data=tx
-                            )
-                            
-                            await send_tracking_notification(sub.user_id, message)
-            
-            # Limit the size of processed_txs to prevent memory issues
-            if len(processed_txs) > 10000:
-                # Keep only the 5000 most recent transactions
-                processed_txs_list = list(processed_txs)
-                processed_txs = set(processed_txs_list[-5000:])
-            
-            # Sleep before next check
-            await asyncio.sleep(60)  # Check every minute
-            
-        except Exception as e:
-            logging.error(f"Error in blockchain monitor: {e}")
-            # Sleep before retrying
-            await asyncio.sleep(60)
@@ -0,0 +1,76 @@
+import logging
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from config import MAINTENANCE_INTERVAL, MAINTENANCE_BATCH_SIZE, MAINTENANCE_BATCH_PAUSE
+from data.database import EXPIRING_COLLECTIONS, backfill_expires_at, cleanup_expired_premium
+
+_maintenance_task: Optional[asyncio.Task] = None
+
+async def _run_in_chunks(name: str, run_chunk: Callable[[], Awaitable[int]]) -> int:
+    """
+    Repeat a chunked database job until it has nothing left, pausing between chunks
+
+    Args:
+        name: Job name for logging
+        run_chunk: Processes up to MAINTENANCE_BATCH_SIZE documents and returns how many it touched
+
+    Returns:
+        The total number of documents processed
+    """
+    total = 0
+    while True:
+        processed = await run_chunk()
+        total += processed
+        if processed < MAINTENANCE_BATCH_SIZE:
+            break
+        # Leave the primary room for live traffic between chunks
+        await asyncio.sleep(MAINTENANCE_BATCH_PAUSE)
+
+    if total:
+        logging.info(f"Maintenance job {name} processed {total} documents")
+    return total
+
+async def run_maintenance() -> None:
+    """
+    Run one pass of the background maintenance jobs
+
+    Expiry itself is handled by the TTL indexes on expires_at; this only backfills
+    expires_at on documents written before those indexes existed and removes premium
+    status once it has run out.
+    """
+    for collection in EXPIRING_COLLECTIONS:
+        await _run_in_chunks(
+            f"backfill_expires_at({collection})",
+            lambda collection=collection: backfill_expires_at(collection, MAINTENANCE_BATCH_SIZE)
+        )
+
+    async def expire_premium_chunk() -> int:
+        return len(await cleanup_expired_premium(limit=MAINTENANCE_BATCH_SIZE))
+
+    await _run_in_chunks("cleanup_expired_premium", expire_premium_chunk)
+
+async def _run_maintenance_periodically() -> None:
+    while True:
+        try:
+            await run_maintenance()
+        except Exception as e:
+            logging.error(f"Error running database maintenance: {e}")
+        await asyncio.sleep(MAINTENANCE_INTERVAL)
+
+async def start_maintenance() -> None:
+    """Start the background maintenance jobs"""
+    global _maintenance_task
+    if _maintenance_task is None or _maintenance_task.done():
+        _maintenance_task = asyncio.create_task(_run_maintenance_periodically())
+
+async def stop_maintenance() -> None:
+    """Stop the background maintenance jobs"""
+    global _maintenance_task
+    if _maintenance_task is not None:
+        _maintenance_task.cancel()
+        try:
+            await _maintenance_task
+        except asyncio.CancelledError:
+            pass
+        _maintenance_task = None
@@ -0,0 +1,671 @@
+import logging
+import asyncio
+import multiprocessing
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple
+
+from config import (
+    MONITOR_CHAINS,
+    MONITOR_POLL_INTERVALS,
+    MONITOR_MAX_BLOCK_RANGE,
+    MONITOR_LOG_BLOCK_ATTEMPTS,
+    MONITOR_LOG_RETRY_DELAY,
+    MONITOR_CONFIRMATIONS,
+    MONITOR_PENDING_ALERTS,
+    MONITOR_MAX_CATCHUP_BLOCKS,
+    MONITOR_WORKER_PROCESSES,
+    MONITOR_MAX_SHARDS_PER_CHAIN,
+    MONITOR_SUBSCRIPTIONS_PER_SHARD,
+    MONITOR_SUPERVISOR_INTERVAL,
+    MONITOR_REBALANCE_INTERVAL
+)
+
+from data.database import (
+    init_database,
+    close_database,
+    get_block_cursor,
+    save_block_cursor,
+    consolidate_block_cursors,
+    claim_processed_events,
+    count_active_tracking_subscriptions,
+    add_subscription_listener,
+    remove_subscription_listener,
+)
+from data.models import TrackingSubscription
+
+from services.blockchain import rpc_batch
+from services.rpc_pool import start_rpc_health_checks, stop_rpc_health_checks
+from services.subscription_index import SubscriptionIndex, subscription_chains
+from services.token_cache import get_cached_token_info_batch
+from services.notification import (
+    send_tracking_notification,
+    format_wallet_activity_notification,
+    format_token_deployment_notification,
+    format_profitable_wallet_notification,
+    format_pending_notification,
+    format_confirmed_notification,
+    format_reorged_notification
+)
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+def _topic_to_address(topic: str) -> str:
+    """Extract the address from a 32-byte indexed log topic"""
+    return "0x" + topic[-40:].lower()
+
+# Worker processes are spawned rather than forked so they never inherit the bot's
+# event loop, MongoDB client or open sockets
+_mp_context = multiprocessing.get_context("spawn")
+
+Notifier = Callable[[int, str], Awaitable[None]]
+
+def _event_key(chain: str, event_id: str, target: str) -> str:
+    """
+    Build the dedup key for one alert
+
+    The key names the subscription target as well as the on-chain event, so shards that
+    match the same log for different targets never claim each other's alerts.
+    """
+    return f"{chain}:{event_id.lower()}:{target}"
+
+def _format_timestamp(timestamp: Optional[int]) -> str:
+    """Format a block timestamp for notifications, defaulting to now"""
+    moment = datetime.fromtimestamp(timestamp) if timestamp else datetime.now()
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+class MonitorShard:
+    """
+    A slice of the monitor's work: one chain and one bucket of tracked addresses
+
+    Addresses are bucketed by their low bits, which are uniformly distributed and,
+    unlike hash(), stable across processes.
+    """
+
+    def __init__(self, chain: str, index: int = 0, count: int = 1):
+        self.chain = chain
+        self.index = index
+        self.count = count
+
+    @property
+    def name(self) -> str:
+        """Identifier used for the shard's block cursor and worker process"""
+        return self.chain if self.count == 1 else f"{self.chain}:{self.index}/{self.count}"
+
+    def owns(self, address: str) -> bool:
+        """Check whether a subscription target belongs to this shard"""
+        return self.count == 1 or int(address[-8:], 16) % self.count == self.index
+
+    @classmethod
+    def for_address(cls, chain: str, address: str, count: int) -> 'MonitorShard':
+        """Get the shard that owns an address"""
+        return cls(chain, int(address[-8:], 16) % count if count > 1 else 0, count)
+
+class ChainMonitor:
+    """
+    Follows new blocks on one chain and matches them against the subscription index
+
+    Each poll fetches the ERC-20 Transfer logs for a whole block range with a single
+    eth_getLogs call (plus the blocks themselves when deployers are tracked), so the
+    RPC cost depends on the number of new blocks, not on the number of subscriptions.
+
+    The last processed block is persisted per shard after every range and each alert is
+    claimed in the processed-event store before sending, so a restart resumes where the
+    shard stopped and a replayed range never alerts twice.
+
+    Blocks are only processed once they are MONITOR_CONFIRMATIONS deep, so reorged
+    transfers never alert. With MONITOR_PENDING_ALERTS, transfers in the newer blocks
+    get an immediate pending alert and are tracked by transaction and log index, not
+    by block, so a transfer that a reorg moves to another block still confirms its
+    pending alert. A pending alert is reported as dropped only once the transfer has
+    not reappeared within MONITOR_CONFIRMATIONS confirmed blocks of where it was last seen.
+    """
+
+    def __init__(self, shard: MonitorShard, index: SubscriptionIndex, notify: Notifier = send_tracking_notification):
+        self.shard = shard
+        self.chain = shard.chain
+        self.cursor: Optional[int] = None
+        self.index = index
+        self.notify = notify
+        self.confirmations = MONITOR_CONFIRMATIONS.get(self.chain, 0)
+        # alert key (tx hash, log index, target) -> (block by which it must have confirmed,
+        # tx hash, notified user ids) for pending alerts
+        self._unconfirmed: Dict[str, Tuple[int, str, List[int]]] = {}
+        self._pending_scanned = 0
+
+    async def run(self) -> None:
+        """Follow the chain until cancelled"""
+        logging.info(f"Block monitor running on {self.shard.name}")
+        interval = MONITOR_POLL_INTERVALS.get(self.chain, 5)
+
+        while True:
+            try:
+                caught_up = await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Error in {self.shard.name} block monitor: {e}")
+                caught_up = True
+
+            # Keep going without sleeping while we are still catching up to the head
+            if caught_up:
+                await asyncio.sleep(interval)
+
+    async def poll(self) -> bool:
+        """
+        Process the next range of new blocks
+
+        Returns:
+            True if the monitor has caught up with the chain head
+        """
+        head_hex, = await rpc_batch(self.chain, [("eth_blockNumber", [])])
+        if head_hex is None:
+            raise RuntimeError("Could not get the latest block number")
+
+        chain_head = int(head_hex, 16)
+        head = chain_head - self.confirmations
+        if self.cursor is None:
+            # A new shard starts from the chain-wide cursor left by the previous layout
+            self.cursor = await get_block_cursor(self.shard.name)
+            if self.cursor is None:
+                self.cursor = await get_block_cursor(self.chain)
+            if self.cursor is None:
+                # First run: start following from the current head rather than backfilling
+                self.cursor = head
+                await save_block_cursor(self.shard.name, self.chain, head)
+                return True
+
+            if head - self.cursor > MONITOR_MAX_CATCHUP_BLOCKS:
+                logging.warning(
+                    f"{self.shard.name} monitor is {head - self.cursor} blocks behind, "
+                    f"skipping to the last {MONITOR_MAX_CATCHUP_BLOCKS}"
+                )
+                self.cursor = head - MONITOR_MAX_CATCHUP_BLOCKS
+
+        if head > self.cursor:
+            to_block = min(head, self.cursor + MONITOR_MAX_BLOCK_RANGE)
+            await self.process_range(self.cursor + 1, to_block)
+            await save_block_cursor(self.shard.name, self.chain, to_block)
+            self.cursor = to_block
+            await self._settle_unconfirmed(to_block)
+            if to_block < head:
+                return False
+
+        if MONITOR_PENDING_ALERTS and self.confirmations and chain_head > max(head, self._pending_scanned):
+            await self.scan_unconfirmed(max(head, self._pending_scanned) + 1, chain_head)
+        return True
+
+    async def process_range(self, from_block: int, to_block: int) -> None:
+        """
+        Fetch and match the Transfer logs and contract creations in a block range
+
+        Args:
+            from_block: First block of the range (inclusive)
+            to_block: Last block of the range (inclusive)
+        """
+        watch_deployers = bool(self.index.addresses(self.chain, "token_deployments"))
+
+        async def get_blocks() -> List[Dict[str, Any]]:
+            if not watch_deployers:
+                return []
+            blocks = await rpc_batch(
+                self.chain, [("eth_getBlockByNumber", [hex(number), True]) for number in range(from_block, to_block + 1)]
+            )
+            if any(block is None for block in blocks):
+                raise RuntimeError(f"Incomplete RPC response for blocks {from_block}-{to_block}")
+            return blocks
+
+        logs, blocks = await asyncio.gather(self.get_transfer_logs(from_block, to_block), get_blocks())
+        timestamps = {int(block["number"], 16): int(block["timestamp"], 16) for block in blocks}
+
+        await self.handle_transfer_logs(logs, timestamps)
+        if watch_deployers:
+            await self.handle_contract_creations(blocks)
+
+    async def get_transfer_logs(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        """
+        Fetch the Transfer logs in a block range, splitting the range when the provider refuses it
+
+        Providers cap eth_getLogs by block span and by result count (commonly 10k logs), so
+        a busy range can fail no matter how often it is retried. A failed range is split in
+        half until single blocks remain; a single block that still fails after
+        MONITOR_LOG_BLOCK_ATTEMPTS tries is skipped so the cursor keeps moving.
+
+        Args:
+            from_block: First block of the range (inclusive)
+            to_block: Last block of the range (inclusive)
+
+        Returns:
+            The Transfer logs of every block that could be fetched
+        """
+        attempts = 1 if from_block < to_block else MONITOR_LOG_BLOCK_ATTEMPTS
+        for attempt in range(attempts):
+            if attempt:
+                await asyncio.sleep(MONITOR_LOG_RETRY_DELAY)
+            logs, = await rpc_batch(self.chain, [("eth_getLogs", [{
+                "fromBlock": hex(from_block),
+                "toBlock": hex(to_block),
+                "topics": [TRANSFER_TOPIC]
+            }])])
+            if logs is not None:
+                return logs
+
+        if from_block == to_block:
+            logging.error(f"{self.shard.name} monitor skipped block {from_block}: eth_getLogs failed {attempts} times")
+            return []
+
+        middle = (from_block + to_block) // 2
+        logging.warning(f"eth_getLogs failed for {self.shard.name} blocks {from_block}-{to_block}, splitting the range")
+        return await self.get_transfer_logs(from_block, middle) + await self.get_transfer_logs(middle + 1, to_block)
+
+    async def scan_unconfirmed(self, from_block: int, to_block: int) -> None:
+        """
+        Send pending alerts for matching transfers in blocks that are not yet confirmed
+
+        Args:
+            from_block: First unconfirmed block not scanned yet (inclusive)
+            to_block: The chain head (inclusive)
+        """
+        logs = await self.get_transfer_logs(from_block, to_block)
+
+        alerts = []
+        for alert in self.match_transfer_logs(logs):
+            key, log = alert[0], alert[1]
+            settle_block = int(log["blockNumber"], 16) + self.confirmations
+            if key in self._unconfirmed:
+                # Already alerted, e.g. re-included in a new block after a reorg; give it
+                # until that block is confirmed before calling it dropped
+                _, tx_hash, user_ids = self._unconfirmed[key]
+                self._unconfirmed[key] = (settle_block, tx_hash, user_ids)
+            else:
+                alerts.append(alert)
+
+        for key, log, user_ids, message in await self._render_transfer_alerts(alerts, {}):
+            settle_block = int(log["blockNumber"], 16) + self.confirmations
+            self._unconfirmed[key] = (settle_block, log["transactionHash"], user_ids)
+            for user_id in user_ids:
+                await self.notify(user_id, format_pending_notification(message, self.confirmations))
+
+        self._pending_scanned = to_block
+
+    async def _settle_unconfirmed(self, confirmed_block: int) -> None:
+        """Flag pending alerts whose transfer has not confirmed in time as dropped"""
+        expired = [key for key, (settle_block, _, _) in self._unconfirmed.items() if settle_block <= confirmed_block]
+        for key in expired:
+            _, tx_hash, user_ids = self._unconfirmed.pop(key)
+            message = format_reorged_notification(tx_hash)
+            for user_id in user_ids:
+                await self.notify(user_id, message)
+
+    def match_transfer_logs(self, logs: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any], str, str, bool, str]]:
+        """
+        Match Transfer logs against the subscription index
+
+        Returns:
+            List of (alert key, log, token address, wallet address, is_buy, tracking type)
+        """
+        index = self.index
+        trade_wallets = index.addresses(self.chain, "wallet_trades")
+        watched_topics = index.watched_topics(self.chain)
+        alerts = []
+
+        for log in logs:
+            topics = log.get("topics") or []
+            # ERC-721 transfers index the token id as a fourth topic; only ERC-20 has three
+            if len(topics) != 3:
+                continue
+
+            # Nearly every log involves only untracked wallets; reject those on the raw
+            # topics before any decoding or exact matching
+            if topics[1] not in watched_topics and topics[2] not in watched_topics:
+                continue
+
+            token_address = log["address"].lower()
+            sender = _topic_to_address(topics[1])
+            recipient = _topic_to_address(topics[2])
+            profitable = index.profitable_wallets(self.chain, token_address)
+            event_id = f"{log['transactionHash']}:{log['logIndex']}"
+
+            for wallet_address, is_buy in ((sender, False), (recipient, True)):
+                if wallet_address in trade_wallets:
+                    alerts.append((
+                        _event_key(self.chain, event_id, wallet_address),
+                        log, token_address, wallet_address, is_buy, "wallet_trades"
+                    ))
+                if wallet_address in profitable:
+                    alerts.append((
+                        _event_key(self.chain, event_id, f"{token_address}:{wallet_address}"),
+                        log, token_address, wallet_address, is_buy, "token_profitable_wallets"
+                    ))
+
+        return alerts
+
+    async def handle_transfer_logs(self, logs: List[Dict[str, Any]], timestamps: Dict[int, int]) -> None:
+        """Notify wallet-trade and profitable-wallet subscribers about matching confirmed transfers"""
+        alerts = self.match_transfer_logs(logs)
+        if not alerts:
+            return
+
+        # Render first: it can fail on RPC errors, and a range that is retried must not
+        # find its events already claimed
+        rendered = await self._render_transfer_alerts(alerts, timestamps)
+        claimed = set(await claim_processed_events([alert[0] for alert in rendered]))
+
+        for key, log, user_ids, message in rendered:
+            # Matched by transaction and log index, whichever block it ended up in; settled
+            # even when another shard or an earlier run already claimed the alert
+            pending = self._unconfirmed.pop(key, None)
+            if key not in claimed:
+                continue
+            if pending is not None:
+                message = format_confirmed_notification(message)
+            for user_id in user_ids:
+                await self.notify(user_id, message)
+
+    async def _render_transfer_alerts(
+        self,
+        alerts: List[Tuple[str, Dict[str, Any], str, str, bool, str]],
+        timestamps: Dict[int, int]
+    ) -> List[Tuple[str, Dict[str, Any], List[int], str]]:
+        """Build the message and recipients of each matched transfer as (key, log, user ids, message)"""
+        if not alerts:
+            return []
+
+        index = self.index
+        rendered = []
+        token_infos = await get_cached_token_info_batch(
+            list({alert[2] for alert in alerts}), self.chain
+        )
+
+        for key, log, token_address, wallet_address, is_buy, tracking_type in alerts:
+            token_info = token_infos.get(token_address) or {}
+            decimals = token_info.get("decimals", 18)
+            raw_amount = int(log["data"], 16) if log.get("data") not in (None, "0x") else 0
+            token_name = token_info.get("symbol", "Unknown Token")
+
+            tx_data = {
+                "hash": log["transactionHash"],
+                "token_address": token_address,
+                "token_name": token_name,
+                "amount": raw_amount / (10 ** decimals),
+                "value_usd": "Unknown",
+                "is_buy": is_buy,
+                "timestamp": _format_timestamp(timestamps.get(int(log["blockNumber"], 16)))
+            }
+
+            if tracking_type == "wallet_trades":
+                message = format_wallet_activity_notification(
+                    wallet_address=wallet_address,
+                    tx_data=tx_data
+                )
+                subscriptions = index.lookup(self.chain, wallet_address, tracking_type)
+            else:
+                message = format_profitable_wallet_notification(
+                    wallet_address=wallet_address,
+                    token_name=token_name,
+                    tx_data=tx_data
+                )
+                subscriptions = index.lookup(self.chain, token_address, tracking_type)
+
+            rendered.append((key, log, [subscription.user_id for subscription in subscriptions], message))
+
+        return rendered
+
+    async def handle_contract_creations(self, blocks: List[Dict[str, Any]]) -> None:
+        """Notify deployment subscribers about contracts created by tracked wallets"""
+        deployer_wallets = self.index.addresses(self.chain, "token_deployments")
+        creations = [
+            (_event_key(self.chain, tx["hash"], "create"), tx, int(block["timestamp"], 16))
+            for block in blocks
+            for tx in block.get("transactions", [])
+            if tx.get("to") is None and tx.get("from", "").lower() in deployer_wallets
+        ]
+        if not creations:
+            return
+
+        # Receipts are only needed for the (rare) matching deployments. Fetch them before
+        # claiming the events so a failed request leaves the range retryable
+        receipts = await rpc_batch(
+            self.chain, [("eth_getTransactionReceipt", [tx["hash"]]) for _, tx, _ in creations]
+        )
+        if any(receipt is None for receipt in receipts):
+            raise RuntimeError("Incomplete RPC response for deployment receipts")
+        claimed = set(await claim_processed_events([key for key, _, _ in creations]))
+
+        for (key, tx, timestamp), receipt in zip(creations, receipts):
+            if key not in claimed:
+                continue
+            if receipt.get("status") != "0x1" or not receipt.get("contractAddress"):
+                continue
+
+            deployer_address = tx["from"].lower()
+            message = format_token_deployment_notification(
+                deployer_address=deployer_address,
+                contract_address=receipt["contractAddress"],
+                timestamp=_format_timestamp(timestamp)
+            )
+
+            for subscription in self.index.lookup(self.chain, deployer_address, "token_deployments"):
+                await self.notify(subscription.user_id, message)
+
+class BlockchainMonitor:
+    """Runs one ChainMonitor per shard over a shared subscription index"""
+
+    def __init__(self, shards: List[MonitorShard], notify: Notifier = send_tracking_notification):
+        self.index = SubscriptionIndex({shard.chain: shard for shard in shards})
+        self.monitors = [ChainMonitor(shard, self.index, notify) for shard in shards]
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Load the subscription index and start following every shard's chain"""
+        try:
+            await self.index.start()
+        except Exception as e:
+            logging.error(f"Error loading subscription index: {e}")
+
+        self._tasks = [asyncio.create_task(monitor.run()) for monitor in self.monitors]
+
+    async def stop(self) -> None:
+        """Cancel the chain followers"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.index.stop()
+
+def run_monitor_shard(shard: MonitorShard, changes: multiprocessing.Queue, alerts: multiprocessing.Queue) -> None:
+    """
+    Entry point of a monitor worker process
+
+    Args:
+        shard: The chain and address bucket this worker owns
+        changes: Subscription changes forwarded by the supervisor (dicts; None stops the worker)
+        alerts: Outgoing (user_id, message) pairs, delivered by the supervisor's dispatcher
+    """
+    logging.basicConfig(
+        format=f'%(asctime)s - monitor[{shard.name}] - %(levelname)s - %(message)s',
+        level=logging.INFO)
+    asyncio.run(_serve_monitor_shard(shard, changes, alerts))
+
+async def _serve_monitor_shard(shard: MonitorShard, changes: multiprocessing.Queue, alerts: multiprocessing.Queue) -> None:
+    if not await init_database():
+        raise SystemExit(1)
+
+    async def forward_alert(user_id: int, message: str) -> None:
+        alerts.put((user_id, message))
+
+    await start_rpc_health_checks()
+    monitor = BlockchainMonitor([shard], notify=forward_alert)
+    await monitor.start()
+    loop = asyncio.get_running_loop()
+
+    try:
+        while True:
+            change = await loop.run_in_executor(None, changes.get)
+            if change is None:
+                break
+            monitor.index.apply(TrackingSubscription.from_dict(change))
+    finally:
+        await monitor.stop()
+        await stop_rpc_health_checks()
+        await close_database()
+
+class MonitorWorker:
+    """Handle on one monitor worker process owned by the supervisor"""
+
+    def __init__(self, shard: MonitorShard, alerts: multiprocessing.Queue):
+        self.shard = shard
+        self.changes = _mp_context.Queue()
+        self.process = _mp_context.Process(
+            target=run_monitor_shard,
+            args=(shard, self.changes, alerts),
+            name=f"monitor-{shard.name}",
+            daemon=True
+        )
+        self.process.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Ask the worker to exit, terminating it if it does not within timeout seconds"""
+        if self.process.is_alive():
+            self.changes.put(None)
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+class MonitorSupervisor:
+    """
+    Runs the monitor as one worker process per shard
+
+    Work is split by chain and, within a chain, by address hash (see MonitorShard), so
+    every subscription is matched by exactly one process. The supervisor forwards
+    subscription changes to the owning worker, relays worker alerts to the notification
+    dispatcher, restarts workers that die, and periodically re-sizes the number of
+    shards per chain to the number of active subscriptions.
+    """
+
+    def __init__(self, chains: List[str]):
+        self.chains = chains
+        self.shard_count = 1
+        self.workers: Dict[str, MonitorWorker] = {}
+        self._alerts = _mp_context.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    async def _desired_shard_count(self) -> int:
+        subscriptions = await count_active_tracking_subscriptions()
+        wanted = -(-subscriptions // MONITOR_SUBSCRIPTIONS_PER_SHARD)
+        return max(1, min(MONITOR_MAX_SHARDS_PER_CHAIN, wanted))
+
+    def _shards(self) -> List[MonitorShard]:
+        return [
+            MonitorShard(chain, index, self.shard_count)
+            for chain in self.chains
+            for index in range(self.shard_count)
+        ]
+
+    def _spawn(self, shard: MonitorShard) -> None:
+        self.workers[shard.name] = MonitorWorker(shard, self._alerts)
+        logging.info(f"Started monitor worker {shard.name} (pid {self.workers[shard.name].process.pid})")
+
+    async def _stop_workers(self) -> None:
+        workers = list(self.workers.values())
+        self.workers = {}
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(None, worker.stop) for worker in workers))
+
+    def forward(self, subscription: TrackingSubscription) -> None:
+        """Subscription listener forwarding a change to the worker that owns it"""
+        change = subscription.to_dict()
+        address = subscription.target_address.lower()
+        for chain in subscription_chains(subscription):
+            if chain not in self.chains:
+                continue
+            worker = self.workers.get(MonitorShard.for_address(chain, address, self.shard_count).name)
+            if worker is not None:
+                worker.changes.put(change)
+
+    async def _relay_alerts(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            alert = await loop.run_in_executor(None, self._alerts.get)
+            if alert is None:
+                return
+            user_id, message = alert
+            await send_tracking_notification(user_id, message)
+
+    async def _supervise(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_rebalance = loop.time() + MONITOR_REBALANCE_INTERVAL
+
+        while True:
+            await asyncio.sleep(MONITOR_SUPERVISOR_INTERVAL)
+
+            for name, worker in list(self.workers.items()):
+                if not worker.process.is_alive():
+                    # Reap the dead process before replacing it
+                    worker.process.join()
+                    logging.error(f"Monitor worker {name} exited with code {worker.process.exitcode}, restarting")
+                    self._spawn(worker.shard)
+
+            if loop.time() < next_rebalance:
+                continue
+            next_rebalance = loop.time() + MONITOR_REBALANCE_INTERVAL
+
+            try:
+                shard_count = await self._desired_shard_count()
+                if shard_count == self.shard_count:
+                    continue
+
+                logging.info(f"Rebalancing monitor from {self.shard_count} to {shard_count} shards per chain")
+                await self._stop_workers()
+                # New shards resume from the oldest cursor of the previous layout; the
+                # per-target dedup keys keep the replayed blocks from alerting twice
+                for chain in self.chains:
+                    await consolidate_block_cursors(chain)
+                self.shard_count = shard_count
+                for shard in self._shards():
+                    self._spawn(shard)
+            except Exception as e:
+                logging.error(f"Error rebalancing monitor shards: {e}")
+
+    async def start(self) -> None:
+        """Start one worker per shard and the supervision tasks"""
+        try:
+            self.shard_count = await self._desired_shard_count()
+        except Exception as e:
+            logging.error(f"Error counting subscriptions, starting with one shard per chain: {e}")
+
+        add_subscription_listener(self.forward)
+        for shard in self._shards():
+            self._spawn(shard)
+        self._tasks = [
+            asyncio.create_task(self._relay_alerts()),
+            asyncio.create_task(self._supervise())
+        ]
+
+    async def stop(self) -> None:
+        """Stop the workers, then deliver the alerts they already produced"""
+        if not self._tasks:
+            return
+
+        remove_subscription_listener(self.forward)
+        self._tasks[1].cancel()
+        await self._stop_workers()
+        self._alerts.put(None)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+# Create a singleton instance
+if MONITOR_WORKER_PROCESSES:
+    blockchain_monitor = MonitorSupervisor(MONITOR_CHAINS)
+else:
+    blockchain_monitor = BlockchainMonitor([MonitorShard(chain) for chain in MONITOR_CHAINS])
+
+async def start_blockchain_monitor():
+    """Start the blockchain monitor, in this process or as sharded worker processes"""
+    logging.info("Starting blockchain monitor...")
+    await blockchain_monitor.start()
+
+async def stop_blockchain_monitor():
+    """Stop the blockchain monitor"""
+    await blockchain_monitor.stop()
@@ -1,43 +1,299 @@
 import asyncio
 import logging
+import time
+from collections import deque
 from datetime import datetime
+from typing import Any, AsyncIterable, Deque, Dict, Iterable, Optional, Tuple
+from telegram import Bot
 from telegram.constants import ParseMode
-from telegram.ext import ApplicationBuilder
+from telegram.error import RetryAfter
 
-from config import TELEGRAM_TOKEN
-from data.database import get_all_active_tracking_subscriptions
+from config import TELEGRAM_TOKEN, TELEGRAM_GLOBAL_RATE_LIMIT, TELEGRAM_PER_CHAT_RATE_LIMIT, BROADCAST_MAX_PENDING
+from data.database import get_all_active_tracking_subscriptions, iter_all_users, iter_admin_users
+
+class TokenBucket:
+    """Simple token bucket used to pace outgoing Telegram messages"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def acquire(self) -> None:
+        """Wait until a token is available and consume it"""
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class NotificationDispatcher:
+    """
+    Long-lived queue for outgoing notifications
+    
+    Messages are queued per chat and drained by a single worker that respects
+    Telegram's global and per-chat rate limits, reusing one Bot connection pool.
+    
+    Broadcast messages are queued separately and only sent when no chat has an
+    alert ready, so a large broadcast never delays monitor alerts.
+    """
+    
+    # Ready queue priorities; lower is sent first
+    ALERT_PRIORITY = 0
+    BULK_PRIORITY = 1
+    # Scheduled marker for a chat whose message is being sent; it outranks every real
+    # entry, so enqueues during the send wait for the chat's next send time instead
+    IN_FLIGHT = (-1, 0)
+    
+    def __init__(self, global_rate: float = TELEGRAM_GLOBAL_RATE_LIMIT, per_chat_rate: float = TELEGRAM_PER_CHAT_RATE_LIMIT):
+        self._bot: Optional[Bot] = None
+        self._owns_bot = False
+        self._global_bucket = TokenBucket(global_rate)
+        self._per_chat_interval = 1 / per_chat_rate
+        self._pending: Dict[int, Deque[Tuple[str, str]]] = {}
+        self._bulk_pending: Dict[int, Deque[Tuple[str, str]]] = {}
+        self._chat_next_send: Dict[int, float] = {}
+        # chat_id -> (priority, sequence) of its live ready queue entry; older entries are skipped
+        self._scheduled: Dict[int, Tuple[int, int]] = {}
+        self._sequence = 0
+        self._ready: Optional[asyncio.PriorityQueue] = None
+        # Notified whenever a chat's broadcast queue empties
+        self._bulk_drained = asyncio.Condition()
+        self._worker: Optional[asyncio.Task] = None
+    
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+    
+    async def start(self, bot: Optional[Bot] = None) -> None:
+        """
+        Start the dispatcher worker
+        
+        Args:
+            bot: The application's Bot instance. If omitted, a standalone Bot is created.
+        """
+        if self.is_running:
+            return
+        
+        if bot is None:
+            bot = Bot(TELEGRAM_TOKEN)
+            await bot.initialize()
+            self._owns_bot = True
+        
+        self._bot = bot
+        self._ready = asyncio.PriorityQueue()
+        self._scheduled.clear()
+        for chat_id in {*self._pending, *self._bulk_pending}:
+            self._schedule(chat_id)
+        self._worker = asyncio.create_task(self._run())
+        logging.info("Notification dispatcher started")
+    
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Drain queued notifications (up to timeout seconds) and stop the worker"""
+        if not self.is_running:
+            return
+        
+        deadline = time.monotonic() + timeout
+        while (self._pending or self._bulk_pending) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        
+        if self._pending or self._bulk_pending:
+            logging.warning(f"Notification dispatcher stopped with {self.pending_count()} unsent messages")
+        
+        if self._owns_bot:
+            await self._bot.shutdown()
+            self._owns_bot = False
+        self._bot = None
+    
+    async def enqueue(self, chat_id: int, text: str, parse_mode: str = ParseMode.HTML, bulk: bool = False) -> None:
+        """
+        Queue a message for delivery
+        
+        Args:
+            chat_id: The chat to send to
+            text: The message text
+            parse_mode: Telegram parse mode for the text
+            bulk: Queue as broadcast traffic, sent only when no alert is waiting
+        """
+        if not self.is_running:
+            await self.start()
+        
+        pending = self._bulk_pending if bulk else self._pending
+        pending.setdefault(chat_id, deque()).append((text, parse_mode))
+        self._schedule(chat_id)
+    
+    def pending_count(self) -> int:
+        """Number of messages waiting to be sent"""
+        return sum(len(q) for q in self._pending.values()) + sum(len(q) for q in self._bulk_pending.values())
+    
+    async def wait_for_capacity(self, max_pending_chats: int) -> None:
+        """Wait until fewer than max_pending_chats chats have broadcast messages queued"""
+        async with self._bulk_drained:
+            await self._bulk_drained.wait_for(lambda: len(self._bulk_pending) < max_pending_chats)
+    
+    def _schedule(self, chat_id: int) -> None:
+        """Put a chat on the ready queue once its per-chat limit allows another send"""
+        if self._ready is None:
+            return
+        
+        priority = self.ALERT_PRIORITY if self._pending.get(chat_id) else self.BULK_PRIORITY
+        scheduled = self._scheduled.get(chat_id)
+        if scheduled is not None and scheduled[0] <= priority:
+            return
+        
+        # A new alert for a chat waiting as broadcast traffic replaces its entry
+        self._sequence += 1
+        entry = (priority, self._sequence, chat_id)
+        self._scheduled[chat_id] = entry[:2]
+        
+        delay = self._chat_next_send.get(chat_id, 0) - time.monotonic()
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._ready.put_nowait, entry)
+        else:
+            self._ready.put_nowait(entry)
+    
+    async def _run(self) -> None:
+        while True:
+            priority, sequence, chat_id = await self._ready.get()
+            if self._scheduled.get(chat_id) != (priority, sequence):
+                continue
+            
+            queue = self._pending.get(chat_id) or self._bulk_pending.get(chat_id)
+            if not queue:
+                del self._scheduled[chat_id]
+                await self._forget_chat(chat_id)
+                continue
+            
+            self._scheduled[chat_id] = self.IN_FLIGHT
+            
+            await self._global_bucket.acquire()
+            text, parse_mode = queue[0]
+            next_send = time.monotonic() + self._per_chat_interval
+            
+            try:
+                await self._bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                logging.info(f"Notification sent to user {chat_id}")
+                queue.popleft()
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                retry_delay = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+                logging.warning(f"Rate limited by Telegram for chat {chat_id}, retrying in {retry_delay}s")
+                next_send = max(next_send, time.monotonic() + retry_delay)
+            except Exception as e:
+                logging.error(f"Failed to send notification to user {chat_id}: {e}")
+                queue.popleft()
+            
+            self._chat_next_send[chat_id] = next_send
+            del self._scheduled[chat_id]
+            
+            await self._forget_chat(chat_id)
+            if chat_id in self._pending or chat_id in self._bulk_pending:
+                self._schedule(chat_id)
+            else:
+                self._prune_chat_timestamps()
+    
+    async def _forget_chat(self, chat_id: int) -> None:
+        """Drop a chat's empty queues, waking broadcasts waiting for capacity"""
+        if not self._pending.get(chat_id):
+            self._pending.pop(chat_id, None)
+        if chat_id in self._bulk_pending and not self._bulk_pending[chat_id]:
+            del self._bulk_pending[chat_id]
+            async with self._bulk_drained:
+                self._bulk_drained.notify_all()
+    
+    def _prune_chat_timestamps(self) -> None:
+        """Forget per-chat send times once they no longer restrict anything"""
+        if len(self._chat_next_send) < 1000:
+            return
+        now = time.monotonic()
+        for chat_id in [c for c, t in self._chat_next_send.items() if t <= now]:
+            del self._chat_next_send[chat_id]
+
+# Create a singleton instance
+notification_dispatcher = NotificationDispatcher()
 
 async def send_tracking_notification(user_id: int, message: str) -> None:
     """
     Send a notification to a user about a tracked event
     
+    The message is queued on the shared notification dispatcher and delivered
+    as soon as Telegram's rate limits allow.
+    
     Args:
         user_id: The Telegram user ID to send the notification to
         message: The message text to send (supports HTML formatting)
     """
     try:
-        application = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
-        await application.bot.send_message(
-            chat_id=user_id,
-            text=message,
-            parse_mode=ParseMode.HTML
-        )
-        logging.info(f"Notification sent to user {user_id}")
+        await notification_dispatcher.enqueue(user_id, message)
     except Exception as e:
-        logging.error(f"Failed to send notification to user {user_id}: {e}")
+        logging.error(f"Failed to queue notification for user {user_id}: {e}")
 
-async def send_bulk_notifications(user_ids: list, message: str) -> None:
+async def send_bulk_notifications(user_ids: Iterable[int], message: str) -> None:
     """
     Send the same notification to multiple users
     
     Args:
-        user_ids: List of Telegram user IDs to send notifications to
+        user_ids: Telegram user IDs to send notifications to
         message: The message text to send (supports HTML formatting)
     """
     for user_id in user_ids:
         await send_tracking_notification(user_id, message)
-        # Add a small delay to avoid hitting Telegram API rate limits
-        await asyncio.sleep(0.05)
+
+async def broadcast_notification(users: AsyncIterable[Dict[str, Any]], message: str) -> int:
+    """
+    Queue the same message for a stream of users
+    
+    Users are pulled from the stream only as fast as the dispatcher drains, so no
+    more than BROADCAST_MAX_PENDING chats are held in memory at once. Broadcast
+    messages yield to monitor alerts in the dispatcher.
+    
+    Args:
+        users: Stream of user documents with at least a user_id, e.g. from iter_all_users
+        message: The message text to send (supports HTML formatting)
+    
+    Returns:
+        The number of users the message was queued for
+    """
+    queued = 0
+    async for user in users:
+        await notification_dispatcher.wait_for_capacity(BROADCAST_MAX_PENDING)
+        try:
+            await notification_dispatcher.enqueue(user["user_id"], message, bulk=True)
+        except Exception as e:
+            logging.error(f"Failed to queue broadcast for user {user['user_id']}: {e}")
+            continue
+        queued += 1
+    return queued
+
+async def broadcast_admin_message(message: str, admins_only: bool = False) -> int:
+    """
+    Broadcast an admin announcement to every user, or only to admins
+    
+    Args:
+        message: The message text to send (supports HTML formatting)
+        admins_only: Send only to users with admin privileges
+    
+    Returns:
+        The number of users the message was queued for
+    """
+    users = iter_admin_users() if admins_only else iter_all_users()
+    queued = await broadcast_notification(users, message)
+    logging.info(f"Broadcast queued for {queued} users")
+    return queued
 
 def format_wallet_activity_notification(wallet_address: str, tx_data: dict) -> str:
     """
@@ -107,3 +363,39 @@ def format_profitable_wallet_notification(wallet_address: str, token_name: str,
         f"Value: ${tx_data.get('value_usd', 'Unknown')}\n"
         f"Time: {tx_data.get('timestamp', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))}"
     )
+
+def format_pending_notification(message: str, confirmations: int) -> str:
+    """
+    Mark an alert as seen in a block that is not yet confirmed
+    
+    Args:
+        message: The formatted alert
+        confirmations: Number of confirmations the final alert waits for
+        
+    Returns:
+        Formatted HTML message
+    """
+    return (
+        f"⏳ <b>Pending</b> (waiting for {confirmations} confirmations)\n\n"
+        f"{message}"
+    )
+
+def format_confirmed_notification(message: str) -> str:
+    """Mark a previously pending alert as confirmed"""
+    return f"✅ <b>Confirmed</b>\n\n{message}"
+
+def format_reorged_notification(tx_hash: str) -> str:
+    """
+    Format the follow-up for a pending alert whose transaction was reorged out
+    
+    Args:
+        tx_hash: The transaction hash from the pending alert
+        
+    Returns:
+        Formatted HTML message
+    """
+    return (
+        f"⚠️ <b>Pending Alert Dropped</b>\n\n"
+        f"Transaction <code>{tx_hash[:10]}...{tx_hash[-6:]}</code> was removed by a chain "
+        f"reorganization before it was confirmed."
+    )
@@ -0,0 +1,240 @@
+import logging
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from web3 import AsyncWeb3
+
+from config import (
+    RPC_ENDPOINTS,
+    RPC_HEALTH_CHECK_INTERVAL,
+    RPC_MAX_FAILURES,
+    RPC_ENDPOINT_BUDGET,
+    RPC_HEDGE_MAX_RATIO,
+    RPC_HEDGE_MIN_DELAY,
+    RPC_LATENCY_WINDOW
+)
+
+class RPCEndpoint:
+    """One JSON-RPC node with its observed latency, health and request budget"""
+
+    # Weight of the newest sample in the latency moving average
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, url: str, budget: float = RPC_ENDPOINT_BUDGET):
+        self.url = url
+        self.w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url))
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.healthy = True
+        self.budget = budget
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+
+    def _roll_window(self) -> None:
+        now = time.monotonic()
+        if now - self._window_start >= 1:
+            self._window_start = now
+            self._window_requests = 0
+
+    def has_budget(self) -> bool:
+        """Check whether the endpoint can take another request this second"""
+        if not self.budget:
+            return True
+        self._roll_window()
+        return self._window_requests < self.budget
+
+    def budget_reset_in(self) -> float:
+        """Get the seconds until the endpoint can take another request, 0 if it can now"""
+        if self.has_budget():
+            return 0.0
+        return max(0.0, self._window_start + 1 - time.monotonic())
+
+    def record_request(self) -> None:
+        """Count a request against this second's budget when it is sent, so concurrent requests see it"""
+        self._roll_window()
+        self._window_requests += 1
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful request and its latency in seconds"""
+        self.failures = 0
+        self.healthy = True
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.LATENCY_SMOOTHING * (latency - self.latency)
+
+    def record_failure(self) -> None:
+        """Record a failed request, taking the endpoint out of rotation after repeated failures"""
+        self.failures += 1
+        if self.failures >= RPC_MAX_FAILURES and self.healthy:
+            self.healthy = False
+            logging.warning(f"RPC endpoint {self.url} marked unhealthy after {self.failures} failures")
+
+class RPCPool:
+    """
+    Pool of JSON-RPC endpoints for one chain
+
+    Requests go to a healthy endpoint with budget left, picked at random weighted
+    toward the lowest latency. Endpoints that keep failing drop out of rotation until
+    a health probe succeeds again. An endpoint over its per-second budget is never
+    picked; once every endpoint is, requests wait for the next budget window.
+
+    The pool also keeps the latencies of recent hedgeable reads, which set the delay
+    after which a hedged read is resent, and counts requests against hedges so hedging
+    stays within RPC_HEDGE_MAX_RATIO of the pool's load.
+    """
+
+    # Seconds over which the request and hedge counters are compared
+    HEDGE_WINDOW = 60
+
+    def __init__(self, chain: str, urls: List[str]):
+        self.chain = chain
+        self.endpoints = [RPCEndpoint(url) for url in urls]
+        self._latencies: Deque[float] = deque(maxlen=RPC_LATENCY_WINDOW)
+        self._window_start = time.monotonic()
+        self._requests = 0
+        self._hedges = 0
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of a completed hedgeable request"""
+        self._latencies.append(latency)
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Get how long to wait for the first endpoint before hedging
+
+        Returns:
+            The p95 of recent hedgeable request latencies, or None until enough samples exist
+        """
+        if len(self._latencies) < 20:
+            return None
+        ordered = sorted(self._latencies)
+        return max(RPC_HEDGE_MIN_DELAY, ordered[int(len(ordered) * 0.95) - 1])
+
+    def _roll_window(self) -> None:
+        now = time.monotonic()
+        if now - self._window_start >= self.HEDGE_WINDOW:
+            self._window_start = now
+            self._requests = 0
+            self._hedges = 0
+
+    def count_request(self) -> None:
+        """Count a primary request toward the hedge budget"""
+        self._roll_window()
+        self._requests += 1
+
+    def try_hedge(self) -> bool:
+        """Reserve a hedge if the budget allows one"""
+        self._roll_window()
+        if len(self.endpoints) < 2 or self._hedges >= self._requests * RPC_HEDGE_MAX_RATIO:
+            return False
+        self._hedges += 1
+        return True
+
+    def select(self, exclude: Optional[List[RPCEndpoint]] = None, charge: bool = True) -> Optional[RPCEndpoint]:
+        """
+        Pick an endpoint for the next request and count it against that endpoint's budget
+
+        Args:
+            exclude: Endpoints already tried for this request
+            charge: Count the pick against the endpoint's budget; False only looks one up
+
+        Returns:
+            The chosen endpoint, or None if every endpoint is excluded or over budget
+        """
+        candidates = [
+            endpoint for endpoint in self.endpoints
+            if endpoint not in (exclude or []) and endpoint.has_budget()
+        ]
+        if not candidates:
+            return None
+
+        # Prefer healthy endpoints, falling back to unhealthy ones rather than failing
+        pool = [endpoint for endpoint in candidates if endpoint.healthy] or candidates
+
+        # Unmeasured endpoints get the best known latency so they are tried early
+        known = [endpoint.latency for endpoint in pool if endpoint.latency is not None]
+        best = min(known) if known else 1.0
+        weights = [1 / max(endpoint.latency or best, 0.001) for endpoint in pool]
+        endpoint = random.choices(pool, weights=weights)[0]
+        if charge:
+            endpoint.record_request()
+        return endpoint
+
+    async def acquire(self, exclude: Optional[List[RPCEndpoint]] = None) -> Optional[RPCEndpoint]:
+        """
+        Pick an endpoint like select, waiting for the next budget window while all are over budget
+
+        Args:
+            exclude: Endpoints already tried for this request
+
+        Returns:
+            The chosen endpoint, or None if every endpoint is excluded
+        """
+        while True:
+            endpoint = self.select(exclude)
+            if endpoint is not None:
+                return endpoint
+            waits = [endpoint.budget_reset_in() for endpoint in self.endpoints if endpoint not in (exclude or [])]
+            if not waits:
+                return None
+            await asyncio.sleep(min(waits))
+
+    async def probe(self) -> bool:
+        """
+        Check every endpoint's connectivity and latency
+
+        Returns:
+            True if at least one endpoint is connected
+        """
+        async def probe_endpoint(endpoint: RPCEndpoint) -> bool:
+            started = time.monotonic()
+            if await endpoint.w3.is_connected():
+                endpoint.record_success(time.monotonic() - started)
+                return True
+            endpoint.record_failure()
+            return False
+
+        results = await asyncio.gather(*(probe_endpoint(endpoint) for endpoint in self.endpoints))
+        return any(results)
+
+rpc_pools: Dict[str, RPCPool] = {chain: RPCPool(chain, urls) for chain, urls in RPC_ENDPOINTS.items()}
+
+_health_check_task: Optional[asyncio.Task] = None
+
+def get_rpc_pool(chain: str) -> RPCPool:
+    """Get the endpoint pool for a chain, defaulting to Ethereum for unknown chains"""
+    if chain not in rpc_pools:
+        logging.warning(f"Unknown chain '{chain}', defaulting to Ethereum")
+        return rpc_pools["eth"]
+    return rpc_pools[chain]
+
+async def _run_health_checks() -> None:
+    while True:
+        for chain, pool in rpc_pools.items():
+            try:
+                if not await pool.probe():
+                    logging.warning(f"No RPC endpoint is reachable for {chain}")
+            except Exception as e:
+                logging.error(f"Error probing {chain} RPC endpoints: {e}")
+        await asyncio.sleep(RPC_HEALTH_CHECK_INTERVAL)
+
+async def start_rpc_health_checks() -> None:
+    """Start probing every RPC endpoint in the background"""
+    global _health_check_task
+    if _health_check_task is None or _health_check_task.done():
+        _health_check_task = asyncio.create_task(_run_health_checks())
+
+async def stop_rpc_health_checks() -> None:
+    """Stop the background RPC endpoint probes"""
+    global _health_check_task
+    if _health_check_task is not None:
+        _health_check_task.cancel()
+        try:
+            await _health_check_task
+        except asyncio.CancelledError:
+            pass
+        _health_check_task = None
@@ -0,0 +1,222 @@
+import logging
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config import MONITOR_CHAINS, MONITOR_PROFITABLE_WALLETS_REFRESH, MONITOR_PREFILTER_REBUILD_INTERVAL
+
+from data.database import (
+    get_all_active_tracking_subscriptions,
+    get_token_profitable_wallets,
+    add_subscription_listener,
+    remove_subscription_listener,
+)
+from data.models import TrackingSubscription
+
+def subscription_chains(subscription: TrackingSubscription) -> List[str]:
+    """
+    Get the chains a subscription should be matched on
+
+    Subscriptions that do not record a chain in their metadata are matched on
+    every monitored chain, since the same address is valid on all EVM chains.
+    """
+    chain = (subscription.metadata or {}).get("chain")
+    return [chain] if chain in MONITOR_CHAINS else list(MONITOR_CHAINS)
+
+def address_to_topic(address: str) -> str:
+    """Encode a lowercase address the way it appears as an indexed log topic"""
+    return "0x" + "0" * 24 + address[2:]
+
+class SubscriptionIndex:
+    """
+    Inverted index from (chain, address) to the active subscriptions on that address
+
+    The index is loaded from MongoDB once and then kept up to date by the subscription
+    listener in data.database, so matching an on-chain event is a dictionary lookup and
+    the monitor never rescans the tracking_subscriptions collection.
+    
+    In front of the exact index sits a per-chain prefilter: the set of watched wallets
+    encoded as raw log topics. Like a Bloom filter it never misses a watched address but
+    may still hold addresses that were unsubscribed until the next rebuild; unlike one,
+    a probe is a single hash lookup on the topic string exactly as the node returned it,
+    which is what is cheapest in Python.
+    """
+
+    def __init__(self, shards: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            shards: Optional mapping of chain to the MonitorShard this index serves; only
+                subscriptions whose target the shard owns are indexed. Defaults to every
+                monitored chain and every address.
+        """
+        self._shards = shards
+        self._chains = list(shards) if shards is not None else list(MONITOR_CHAINS)
+        # (chain, address) -> tracking_type -> user_id -> subscription
+        self._entries: Dict[Tuple[str, str], Dict[str, Dict[int, TrackingSubscription]]] = {}
+        # (chain, tracking_type) -> addresses with at least one subscriber
+        self._addresses: Dict[Tuple[str, str], Set[str]] = {}
+        # (chain, token) -> profitable wallets for tokens tracked with token_profitable_wallets
+        self._profitable_wallets: Dict[Tuple[str, str], Set[str]] = {}
+        # chain -> topic-encoded wallets that can match a Transfer log (superset, see above)
+        self._watched_topics: Dict[str, Set[str]] = {chain: set() for chain in self._chains}
+        self._tasks: Set[asyncio.Task] = set()
+        self._background_tasks: List[asyncio.Task] = []
+
+    def lookup(self, chain: str, address: str, tracking_type: str) -> List[TrackingSubscription]:
+        """
+        Get the subscribers of one type for an address
+
+        Args:
+            chain: The blockchain network (eth, base, bsc)
+            address: Lowercase address seen on chain
+            tracking_type: The subscription type to match
+
+        Returns:
+            List of matching subscriptions
+        """
+        entry = self._entries.get((chain, address))
+        if not entry or tracking_type not in entry:
+            return []
+        return list(entry[tracking_type].values())
+
+    def addresses(self, chain: str, tracking_type: str) -> Set[str]:
+        """Get the addresses with at least one subscriber of the given type"""
+        return self._addresses.get((chain, tracking_type), set())
+
+    def profitable_wallets(self, chain: str, token_address: str) -> Set[str]:
+        """Get the profitable wallets watched for a tracked token"""
+        return self._profitable_wallets.get((chain, token_address), set())
+
+    def owns(self, chain: str, address: str) -> bool:
+        """Check whether this index serves a subscription target on a chain"""
+        if self._shards is None:
+            return chain in self._chains
+        shard = self._shards.get(chain)
+        return shard is not None and shard.owns(address)
+
+    def watched_topics(self, chain: str) -> Set[str]:
+        """Get the prefilter of topic-encoded wallets that may match a Transfer log"""
+        return self._watched_topics.setdefault(chain, set())
+
+    def rebuild_prefilter(self) -> None:
+        """Rebuild the prefilters from the exact index, dropping unsubscribed addresses"""
+        for chain in self._chains:
+            wallets = set(self.addresses(chain, "wallet_trades"))
+            for token_address in self.addresses(chain, "token_profitable_wallets"):
+                wallets |= self.profitable_wallets(chain, token_address)
+            self._watched_topics[chain] = {address_to_topic(wallet) for wallet in wallets}
+
+    def _add(self, chain: str, subscription: TrackingSubscription) -> None:
+        address = subscription.target_address.lower()
+        by_type = self._entries.setdefault((chain, address), {})
+        by_type.setdefault(subscription.tracking_type, {})[subscription.user_id] = subscription
+        self._addresses.setdefault((chain, subscription.tracking_type), set()).add(address)
+        if subscription.tracking_type == "wallet_trades":
+            self.watched_topics(chain).add(address_to_topic(address))
+
+    def _remove(self, chain: str, subscription: TrackingSubscription) -> None:
+        address = subscription.target_address.lower()
+        by_type = self._entries.get((chain, address))
+        if not by_type or subscription.tracking_type not in by_type:
+            return
+
+        subscribers = by_type[subscription.tracking_type]
+        subscribers.pop(subscription.user_id, None)
+        if subscribers:
+            return
+
+        del by_type[subscription.tracking_type]
+        self._addresses.get((chain, subscription.tracking_type), set()).discard(address)
+        if subscription.tracking_type == "token_profitable_wallets":
+            self._profitable_wallets.pop((chain, address), None)
+        if not by_type:
+            del self._entries[(chain, address)]
+
+    def apply(self, subscription: TrackingSubscription) -> None:
+        """
+        Apply a saved or deleted subscription to the index
+
+        Args:
+            subscription: The subscription as stored; inactive subscriptions are removed
+        """
+        address = subscription.target_address.lower()
+        for chain in subscription_chains(subscription):
+            if not self.owns(chain, address):
+                continue
+
+            if not subscription.is_active:
+                self._remove(chain, subscription)
+                continue
+
+            is_new_token = (
+                subscription.tracking_type == "token_profitable_wallets"
+                and not self.lookup(chain, address, subscription.tracking_type)
+            )
+            self._add(chain, subscription)
+
+            if is_new_token:
+                task = asyncio.get_running_loop().create_task(self._load_profitable_wallets(chain, address))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _load_profitable_wallets(self, chain: str, token_address: str) -> None:
+        try:
+            wallets = await get_token_profitable_wallets(token_address, chain) or []
+        except Exception as e:
+            logging.error(f"Error loading profitable wallets for {token_address} on {chain}: {e}")
+            return
+
+        # The token may have been unsubscribed while the request was in flight
+        if not self.lookup(chain, token_address, "token_profitable_wallets"):
+            return
+
+        profitable = {
+            (wallet.get("address") or wallet.get("trader_id")).lower()
+            for wallet in wallets
+            if wallet.get("address") or wallet.get("trader_id")
+        }
+        self._profitable_wallets[(chain, token_address)] = profitable
+        self.watched_topics(chain).update(address_to_topic(wallet) for wallet in profitable)
+
+    async def _refresh_profitable_wallets(self) -> None:
+        """Periodically refresh the profitable wallet sets, which change over time"""
+        while True:
+            await asyncio.sleep(MONITOR_PROFITABLE_WALLETS_REFRESH)
+            for chain in self._chains:
+                for token_address in list(self.addresses(chain, "token_profitable_wallets")):
+                    await self._load_profitable_wallets(chain, token_address)
+
+    async def _rebuild_prefilter_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(MONITOR_PREFILTER_REBUILD_INTERVAL)
+            self.rebuild_prefilter()
+
+    async def start(self) -> None:
+        """Load the active subscriptions and start following subscription changes"""
+        # Register first so subscriptions saved while loading are not missed
+        add_subscription_listener(self.apply)
+
+        subscriptions = await get_all_active_tracking_subscriptions()
+        for subscription in subscriptions:
+            for chain in subscription_chains(subscription):
+                if self.owns(chain, subscription.target_address.lower()):
+                    self._add(chain, subscription)
+
+        await asyncio.gather(*(
+            self._load_profitable_wallets(chain, token_address)
+            for chain in self._chains
+            for token_address in self.addresses(chain, "token_profitable_wallets")
+        ))
+        self._background_tasks = [
+            asyncio.create_task(self._refresh_profitable_wallets()),
+            asyncio.create_task(self._rebuild_prefilter_periodically())
+        ]
+        logging.info(f"Subscription index loaded with {len(subscriptions)} subscriptions")
+
+    async def stop(self) -> None:
+        """Stop following subscription changes"""
+        remove_subscription_listener(self.apply)
+        tasks = list(self._tasks) + self._background_tasks
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._background_tasks = []
@@ -0,0 +1,290 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    TOKEN_CACHE_SIZE, TOKEN_SUPPLY_TTL, TOKEN_MARKET_DATA_TTL,
+    ENRICHMENT_CONCURRENCY, DEFAULT_ENRICHMENT_CONCURRENCY, ENRICHMENT_DEADLINE,
+    ENRICHMENT_INFO_CHUNK_SIZE, ENRICHMENT_RPC_CONCURRENCY, DEFAULT_ENRICHMENT_RPC_CONCURRENCY
+)
+from data.cache import LRUCache
+from data.database import get_tokendata_many, update_token_fields_many
+from api.token_api import fetch_market_cap
+from services.blockchain import get_token_metadata_batch, get_token_supply_batch
+
+# Two-tier token cache: these in-process LRUs sit in front of the token_data collection.
+# Name, symbol and decimals never expire; total supply and market data have their own TTLs.
+_token_info_cache = LRUCache(maxsize=TOKEN_CACHE_SIZE)
+_market_data_cache = LRUCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_MARKET_DATA_TTL)
+
+# Per-chain limit on token info chunks in flight, shared by every enrichment
+_info_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+def _is_fresh(updated: Optional[datetime], ttl: int) -> bool:
+    """Check whether a field updated at the given time is still within its TTL"""
+    return updated is not None and datetime.now() - updated < timedelta(seconds=ttl)
+
+def token_info_from_metadata(token_address: str, metadata: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Build the token info dictionary from batched metadata, or None if it is not a complete ERC-20"""
+    if not metadata or not metadata.get("is_token"):
+        return None
+    
+    if any(metadata.get(field) is None for field in ("name", "symbol", "decimals", "total_supply")):
+        return None
+    
+    return {
+        "address": token_address,
+        "name": metadata["name"],
+        "symbol": metadata["symbol"],
+        "decimals": metadata["decimals"],
+        "total_supply": metadata["total_supply"]
+    }
+
+async def get_cached_token_info_batch(token_addresses: List[str], chain: str, hedge: bool = False) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Get token info for many tokens, checking memory, then MongoDB, then the chain
+    
+    Tokens whose name, symbol and decimals are already known only have their total
+    supply refreshed once TOKEN_SUPPLY_TTL has passed.
+    
+    Args:
+        token_addresses: The token contract addresses
+        chain: The blockchain network (eth, base, bsc)
+        hedge: Hedge the chain lookup against a slow RPC endpoint
+    
+    Returns:
+        Dictionary keyed by lowercase address; addresses that are not ERC-20 tokens map to None
+    """
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    missing = []
+    stale_supply: Dict[str, Dict[str, Any]] = {}
+    
+    for address in token_addresses:
+        if not address or address.lower() in results:
+            continue
+        
+        key = address.lower()
+        entry = _token_info_cache.get((chain, key))
+        if entry is None:
+            results[key] = None
+            missing.append(address)
+            continue
+        
+        results[key] = {**entry["info"], "address": address}
+        if not _is_fresh(entry["supply_updated"], TOKEN_SUPPLY_TTL):
+            stale_supply[key] = results[key]
+    
+    to_fetch = []
+    if missing:
+        # Second tier: the token_data collection
+        try:
+            stored = await get_tokendata_many(chain, missing)
+        except Exception as e:
+            logging.error(f"Error reading cached token data: {e}")
+            stored = {}
+        
+        for address in missing:
+            key = address.lower()
+            token = stored.get(key)
+            
+            if not token or None in (token.name, token.symbol, token.decimals):
+                to_fetch.append(address)
+                continue
+            
+            info = {
+                "address": address,
+                "name": token.name,
+                "symbol": token.symbol,
+                "decimals": token.decimals,
+                "total_supply": token.total_supply
+            }
+            results[key] = info
+            if token.total_supply is not None and _is_fresh(token.supply_updated, TOKEN_SUPPLY_TTL):
+                _token_info_cache.set((chain, key), {"info": info, "supply_updated": token.supply_updated})
+            else:
+                stale_supply[key] = info
+    
+    if not to_fetch and not stale_supply:
+        return results
+    
+    now = datetime.now()
+    updates = {}
+    
+    if to_fetch:
+        # Unknown tokens come from the chain in one batched request
+        metadata = await get_token_metadata_batch(to_fetch, chain, hedge=hedge)
+        
+        for key, entry in metadata.items():
+            if not key:
+                continue
+            
+            info = token_info_from_metadata(entry["address"], entry)
+            results[key] = info
+            
+            if info:
+                _token_info_cache.set((chain, key), {"info": info, "supply_updated": now})
+                updates[key] = {
+                    "name": info["name"],
+                    "symbol": info["symbol"],
+                    "decimals": info["decimals"],
+                    "total_supply": info["total_supply"],
+                    "supply_updated": now
+                }
+    
+    if stale_supply:
+        # Metadata never changes, so known tokens only need their totalSupply re-read
+        try:
+            supplies = await get_token_supply_batch(
+                {key: info["decimals"] for key, info in stale_supply.items()}, chain, hedge=hedge
+            )
+        except Exception as e:
+            logging.error(f"Error refreshing token supplies on {chain}: {e}")
+            supplies = {}
+        
+        for key, info in stale_supply.items():
+            total_supply = supplies.get(key)
+            if total_supply is None:
+                # Keep serving the last known supply, if any; the next lookup retries the refresh
+                if info["total_supply"] is None:
+                    results[key] = None
+                continue
+            
+            info["total_supply"] = total_supply
+            _token_info_cache.set((chain, key), {"info": info, "supply_updated": now})
+            updates[key] = {"total_supply": total_supply, "supply_updated": now}
+    
+    try:
+        await update_token_fields_many(chain, updates)
+    except Exception as e:
+        logging.error(f"Error saving token data: {e}")
+    
+    return results
+
+async def get_cached_market_cap(chain: str, token_address: str) -> Dict[str, Any]:
+    """
+    Get market cap data for a token, checking memory, then MongoDB, then the API
+    
+    Args:
+        chain: The blockchain network (eth, base, bsc)
+        token_address: The token contract address
+    
+    Returns:
+        Market cap data in the same shape as fetch_market_cap
+    """
+    key = (chain, token_address.lower())
+    cached = _market_data_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    try:
+        token = (await get_tokendata_many(chain, [token_address])).get(key[1])
+    except Exception as e:
+        logging.error(f"Error reading cached market data: {e}")
+        token = None
+    
+    if token and _is_fresh(token.market_data_updated, TOKEN_MARKET_DATA_TTL):
+        market_data = {
+            "current_mc": token.current_market_cap,
+            "max_mc": token.ath_market_cap,
+            "ath_date": token.ath_date,
+            "age": token.age,
+            "current_price": token.current_price
+        }
+        remaining = TOKEN_MARKET_DATA_TTL - (datetime.now() - token.market_data_updated).total_seconds()
+        _market_data_cache.set(key, market_data, ttl=remaining)
+        return market_data
+    
+    response = await fetch_market_cap(chain, token_address)
+    if not response or "error" in response:
+        return response
+    
+    _market_data_cache.set(key, response)
+    
+    try:
+        await update_token_fields_many(chain, {
+            token_address: {
+                "current_market_cap": response.get("current_mc"),
+                "ath_market_cap": response.get("max_mc"),
+                "ath_date": response.get("ath_date"),
+                "age": response.get("age"),
+                "current_price": response.get("current_price"),
+                "market_data_updated": datetime.now()
+            }
+        })
+    except Exception as e:
+        logging.error(f"Error saving market data: {e}")
+    
+    return response
+
+async def enrich_tokens(
+    token_addresses: List[str],
+    chain: str,
+    deadline: float = ENRICHMENT_DEADLINE
+) -> Tuple[Dict[str, Optional[Dict[str, Any]]], Dict[str, Dict[str, Any]]]:
+    """
+    Fetch token info and market caps for many tokens with bounded concurrency
+    
+    Token info is resolved in batched chunks of ENRICHMENT_INFO_CHUNK_SIZE tokens, at most
+    ENRICHMENT_RPC_CONCURRENCY chunks in flight per chain, while market caps are fetched
+    concurrently, limited per chain by ENRICHMENT_CONCURRENCY.
+    Anything that has not finished when the deadline expires is cancelled and left out.
+    
+    Args:
+        token_addresses: The token contract addresses
+        chain: The blockchain network (eth, base, bsc)
+        deadline: Seconds to wait before returning partial results
+    
+    Returns:
+        Tuple of (token info by lowercase address, market cap data by lowercase address)
+    """
+    addresses = list(dict.fromkeys(address.lower() for address in token_addresses if address))
+    if not addresses:
+        return {}, {}
+    
+    semaphore = asyncio.Semaphore(ENRICHMENT_CONCURRENCY.get(chain, DEFAULT_ENRICHMENT_CONCURRENCY))
+    
+    async def fetch_market_cap_limited(address: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await get_cached_market_cap(chain, address)
+    
+    info_semaphore = _info_semaphores.setdefault(
+        chain, asyncio.Semaphore(ENRICHMENT_RPC_CONCURRENCY.get(chain, DEFAULT_ENRICHMENT_RPC_CONCURRENCY))
+    )
+    
+    async def fetch_info_limited(chunk: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        async with info_semaphore:
+            return await get_cached_token_info_batch(chunk, chain)
+    
+    info_tasks = [
+        asyncio.create_task(fetch_info_limited(addresses[offset:offset + ENRICHMENT_INFO_CHUNK_SIZE]))
+        for offset in range(0, len(addresses), ENRICHMENT_INFO_CHUNK_SIZE)
+    ]
+    market_tasks = {address: asyncio.create_task(fetch_market_cap_limited(address)) for address in addresses}
+    
+    done, pending = await asyncio.wait([*info_tasks, *market_tasks.values()], timeout=deadline)
+    for task in pending:
+        task.cancel()
+    
+    if pending:
+        logging.warning(f"Token enrichment on {chain} hit its {deadline}s deadline; {len(pending)} of {len(info_tasks) + len(addresses)} lookups unfinished")
+    
+    token_infos = {}
+    for task in info_tasks:
+        if task not in done:
+            continue
+        try:
+            token_infos.update(task.result())
+        except Exception as e:
+            logging.error(f"Error getting token info batch on {chain}: {e}")
+    
+    market_caps = {}
+    for address, task in market_tasks.items():
+        if task not in done:
+            continue
+        try:
+            market_caps[address] = task.result() or {}
+        except Exception as e:
+            logging.error(f"Error getting market cap for {address} on {chain}: {e}")
+    
+    return token_infos, market_caps
@@ -1,37 +1,57 @@
 import logging
+import asyncio
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from config import USER_STATS_REFRESH_INTERVAL
 from data.models import User
 from data.database import (
-    get_user, save_user, update_user_activity, get_user_scan_count,
-    increment_user_scan_count, set_premium_status,
+    get_user, touch_user, is_user_premium, set_premium_status,
     cleanup_expired_premium, get_user_counts, set_user_admin_status as db_set_user_admin_status
 )
+from data.write_buffer import write_buffer
 
 async def get_or_create_user(user_id: int, username: Optional[str] = None, 
-                           first_name: Optional[str] = None, last_name: Optional[str] = None) -> User:
-    """Get a user from the database or create if not exists"""
-    user = get_user(user_id)
+                           first_name: Optional[str] = None, last_name: Optional[str] = None,
+                           context: Optional[ContextTypes.DEFAULT_TYPE] = None) -> User:
+    """
+    Get a user from the database or create if not exists, updating their activity
     
-    if not user:
-        # Create new user
-        user = User(
-            user_id=user_id,
-            username=username,
-            first_name=first_name,
-            last_name=last_name
-        )
-        save_user(user)
-    else:
-        # Update user activity
-        update_user_activity(user_id)
+    Args:
+        user_id: The Telegram user ID
+        username: The user's Telegram username
+        first_name: The user's first name
+        last_name: The user's last name
+        context: The handler context; when given, the user is cached on context.user_data
+            so later lookups while handling the same update skip the database
+    
+    Returns:
+        The user
+    """
+    if context is not None and context.user_data is not None:
+        cached = context.user_data.get("user")
+        if cached is not None and cached.user_id == user_id:
+            return cached
+    
+    user = await touch_user(user_id, username, first_name, last_name)
+    write_buffer.touch_user(user_id)
+    user.last_active = datetime.now()
     
+    if context is not None and context.user_data is not None:
+        context.user_data["user"] = user
     return user
 
+async def clear_cached_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Drop the user cached by get_or_create_user; runs before the handlers of every update"""
+    if context.user_data is not None:
+        context.user_data.pop("user", None)
+
 async def extend_premium_subscription(user_id: int, additional_days: int) -> bool:
     """Extend an existing premium subscription"""
-    user = get_user(user_id)
+    user = await get_user(user_id)
     if not user:
         return False
     
@@ -42,10 +62,10 @@ async def extend_premium_subscription(user_id: int, additional_days: int) -> boo
             current_expiry = user.premium_until
             new_expiry = current_expiry + timedelta(days=additional_days)
             days_until_expiry = (new_expiry - datetime.now()).days
-            set_premium_status(user_id, True, days_until_expiry)
+            await set_premium_status(user_id, True, days_until_expiry)
         else:
             # If not premium, start new subscription
-            set_premium_status(user_id, True, additional_days)
+            await set_premium_status(user_id, True, additional_days)
         
         return True
     except Exception as e:
@@ -57,27 +77,24 @@ async def check_rate_limit_service(user_id: int, scan_type: str, limit: int) ->
     Check if user has exceeded their daily scan limit
     Returns (has_reached_limit, current_count)
     """
-    user = get_user(user_id)
-    
     # Premium users have no limits
-    if user and user.is_premium:
+    if await is_user_premium(user_id):
         return False, 0
     
     # Check scan count for today
     today = datetime.now().date().isoformat()
-    scan_count = get_user_scan_count(user_id, scan_type, today)
+    scan_count = await write_buffer.get_scan_count(user_id, scan_type, today)
     
     return scan_count >= limit, scan_count
 
 async def increment_scan_count(user_id: int, scan_type: str) -> int:
     """Increment a user's scan count and return the new count"""
     today = datetime.now().date().isoformat()
-    increment_user_scan_count(user_id, scan_type, today)
-    return get_user_scan_count(user_id, scan_type, today)
+    return await write_buffer.increment_scan_count(user_id, scan_type, today)
 
 async def get_user_premium_info(user_id: int) -> Dict[str, Any]:
     """Get information about a user's premium status"""
-    user = get_user(user_id)
+    user = await get_user(user_id)
     if not user:
         return {
             "is_premium": False,
@@ -107,7 +124,7 @@ async def get_user_premium_info(user_id: int) -> Dict[str, Any]:
 
 async def get_user_usage_stats(user_id: int) -> Dict[str, Any]:
     """Get a user's usage statistics"""
-    user = get_user(user_id)
+    user = await get_user(user_id)
     if not user:
         return {}
     
@@ -115,16 +132,16 @@ async def get_user_usage_stats(user_id: int) -> Dict[str, Any]:
     yesterday = (datetime.now() - timedelta(days=1)).date().isoformat()
     
     # Get today's scan counts
-    token_scans_today = get_user_scan_count(user_id, "token_scan", today)
-    wallet_scans_today = get_user_scan_count(user_id, "wallet_scan", today)
+    token_scans_today = await write_buffer.get_scan_count(user_id, "token_scan", today)
+    wallet_scans_today = await write_buffer.get_scan_count(user_id, "wallet_scan", today)
     
     # Get yesterday's scan counts
-    token_scans_yesterday = get_user_scan_count(user_id, "token_scan", yesterday)
-    wallet_scans_yesterday = get_user_scan_count(user_id, "wallet_scan", yesterday)
+    token_scans_yesterday = await write_buffer.get_scan_count(user_id, "token_scan", yesterday)
+    wallet_scans_yesterday = await write_buffer.get_scan_count(user_id, "wallet_scan", yesterday)
     
     # Get tracking subscriptions
     from data.database import get_user_tracking_subscriptions
-    tracking_subscriptions = get_user_tracking_subscriptions(user_id)
+    tracking_subscriptions = await get_user_tracking_subscriptions(user_id)
     
     token_tracks = sum(1 for sub in tracking_subscriptions if sub.tracking_type == "token")
     wallet_tracks = sum(1 for sub in tracking_subscriptions if sub.tracking_type == "wallet")
@@ -149,19 +166,14 @@ async def cleanup_expired_premium_subscriptions() -> int:
     Returns the number of subscriptions that were expired
     """
     try:
-        # This function is in data.database
-        cleanup_expired_premium()
-        
-        # Count how many were expired (would need to be implemented in database.py)
-        # For now, just return a placeholder
-        return 0
+        return len(await cleanup_expired_premium())
     except Exception as e:
         logging.error(f"Error cleaning up expired premium subscriptions: {e}")
         return 0
 
 async def get_user_referral_code(user_id: int) -> str:
     """Get a user's referral code"""
-    user = get_user(user_id)
+    user = await get_user(user_id)
     if not user:
         return ""
     
@@ -172,7 +184,7 @@ async def get_user_referral_code(user_id: int) -> str:
         
         # Save the referral code
         from data.database import update_user_referral_code
-        update_user_referral_code(user_id, referral_code)
+        await update_user_referral_code(user_id, referral_code)
         
         return referral_code
     
@@ -185,8 +197,8 @@ async def process_referral(referrer_id: int, referred_id: int) -> bool:
     """
     try:
         # Check if users exist
-        referrer = get_user(referrer_id)
-        referred = get_user(referred_id)
+        referrer = await get_user(referrer_id)
+        referred = await get_user(referred_id)
         
         if not referrer or not referred:
             return False
@@ -197,7 +209,7 @@ async def process_referral(referrer_id: int, referred_id: int) -> bool:
         
         # Record the referral
         from data.database import record_referral
-        record_referral(referrer_id, referred_id)
+        await record_referral(referrer_id, referred_id)
         
         # Give the referrer some benefit (e.g., extra free scans or discount)
         # This would be implemented based on the referral program specifics
@@ -210,16 +222,29 @@ async def process_referral(referrer_id: int, referred_id: int) -> bool:
 async def set_user_admin_status(user_id: int, is_admin: bool) -> bool:
     """Set a user's admin status"""
     try:
-        db_set_user_admin_status(user_id, is_admin)
+        await db_set_user_admin_status(user_id, is_admin)
         return True
     except Exception as e:
         logging.error(f"Error setting admin status for user {user_id}: {e}")
         return False
 
+# Snapshot of get_user_counts, refreshed in the background for the admin stats view
+_user_count_stats: Optional[Dict[str, int]] = None
+_user_stats_task: Optional[asyncio.Task] = None
+
+async def refresh_user_count_stats() -> Dict[str, int]:
+    """Recompute the user count statistics snapshot"""
+    global _user_count_stats
+    _user_count_stats = await get_user_counts()
+    return _user_count_stats
+
 async def get_user_count_stats() -> Dict[str, int]:
-    """Get user count statistics"""
+    """Get user count statistics from the cached snapshot, computing it on first use"""
+    if _user_count_stats is not None:
+        return _user_count_stats
+    
     try:
-        return get_user_counts()
+        return await refresh_user_count_stats()
     except Exception as e:
         logging.error(f"Error getting user count stats: {e}")
         return {
@@ -229,3 +254,28 @@ async def get_user_count_stats() -> Dict[str, int]:
             "active_week": 0,
             "active_month": 0
         }
+
+async def _refresh_user_count_stats_periodically() -> None:
+    while True:
+        try:
+            await refresh_user_count_stats()
+        except Exception as e:
+            logging.error(f"Error refreshing user count stats: {e}")
+        await asyncio.sleep(USER_STATS_REFRESH_INTERVAL)
+
+async def start_user_stats_refresh() -> None:
+    """Start refreshing the user count statistics in the background"""
+    global _user_stats_task
+    if _user_stats_task is None or _user_stats_task.done():
+        _user_stats_task = asyncio.create_task(_refresh_user_count_stats_periodically())
+
+async def stop_user_stats_refresh() -> None:
+    """Stop the background user count statistics refresh"""
+    global _user_stats_task
+    if _user_stats_task is not None:
+        _user_stats_task.cancel()
+        try:
+            await _user_stats_task
+        except asyncio.CancelledError:
+            pass
+        _user_stats_task = None
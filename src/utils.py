@@ -12,21 +12,21 @@ from config import FREE_WALLET_SCANS_DAILY
 from services.blockchain import * 
 from services.notification import *
 from services.user_management import *
+from services.token_cache import get_cached_token_info_batch
 
-async def check_callback_user(update: Update) -> User:
+async def check_callback_user(update: Update, context: Optional[ContextTypes.DEFAULT_TYPE] = None) -> User:
     """Check if user exists in database, create if not, and update activity"""
     return await get_or_create_user(
         user_id=update.callback_query.from_user.id,
         username=update.callback_query.from_user.username,
         first_name=update.callback_query.from_user.first_name,
-        last_name=update.callback_query.from_user.last_name
+        last_name=update.callback_query.from_user.last_name,
+        context=context
     )
 
 async def check_premium_required(update: Update, context: ContextTypes.DEFAULT_TYPE, feature_name: str) -> bool:
     """Check if a premium feature is being accessed by a non-premium user"""
-    user = await check_callback_user(update)
-    
-    if not user.is_premium:
+    if not await is_user_premium(update.effective_user.id):
         keyboard = [
             [InlineKeyboardButton("💎 Upgrade to Premium", callback_data="premium_info")],
             [InlineKeyboardButton("🔙 Back to Menu", callback_data="back")]
@@ -119,8 +119,9 @@ async def handle_token_analysis_input(
     token_address = update.message.text.strip()
     selected_chain = context.user_data.get("default_network")
     
-    # Validate address
-    if not await is_valid_token_contract(token_address, selected_chain):
+    # Validate address through the token cache so repeat scans skip the chain
+    token_info = await get_token_info(token_address, selected_chain)
+    if not token_info:
         keyboard = [[InlineKeyboardButton("🔙 Back", callback_data="token_analysis")]]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
@@ -135,7 +136,6 @@ async def handle_token_analysis_input(
     
     try:
         # Get data
-        token_info = await get_token_info(token_address, selected_chain)
         data = await get_data_func(token_address, selected_chain)
         
         if not data or not token_info:
@@ -184,7 +184,7 @@ async def handle_token_analysis_input(
         if success:
             # Get the user directly from the message update
             user_id = update.effective_user.id
-            user = get_user(user_id)
+            user = await get_user(user_id)
             if not user:
                 # Create user if not exists
                 user = User(user_id=user_id, username=update.effective_user.username)
@@ -205,44 +205,31 @@ async def handle_token_analysis_input(
         )
 
 async def get_token_info(token_address: str, chain: str = "eth") -> Optional[Dict[str, Any]]:
-    """Get detailed information about a token"""
-    if not await is_valid_token_contract(token_address, chain):
-        return None
-    
-    try:      
-        # Get the appropriate web3 provider based on chain
-        w3 = get_web3_provider(chain)
-        
-        # ERC20 ABI for basic token information
-        abi = [
-            {"constant": True, "inputs": [], "name": "name", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-            {"constant": True, "inputs": [], "name": "symbol", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-            {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "type": "function"},
-            {"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"}
-        ]
-        
-        # Create contract instance
-        checksum_address = w3.to_checksum_address(token_address)
-        contract = w3.eth.contract(address=checksum_address, abi=abi)
-        
-        # Get basic token information
-        name = contract.functions.name().call()
-        symbol = contract.functions.symbol().call()
-        decimals = contract.functions.decimals().call()
-        total_supply = contract.functions.totalSupply().call() / (10 ** decimals)
-        
-        # Simulate historical data
-        return {
-            "address": token_address,
-            "name": name,
-            "symbol": symbol,
-            "decimals": decimals,
-            "total_supply": total_supply
-        }
+    """Get detailed information about a token; a user is waiting, so the RPC read is hedged"""
+    try:
+        token_infos = await get_cached_token_info_batch([token_address], chain, hedge=True)
+        return token_infos.get(token_address.lower()) if token_address else None
     except Exception as e:
         logging.error(f"Error getting token info on {chain}: {e}")
         return None
 
+async def get_token_info_batch(token_addresses: List[str], chain: str = "eth") -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Get detailed information about many tokens, fetching cache misses in one batched request
+    
+    Args:
+        token_addresses: The token contract addresses
+        chain: The blockchain network (eth, base, bsc)
+    
+    Returns:
+        Dictionary keyed by lowercase address; invalid tokens map to None
+    """
+    try:
+        return await get_cached_token_info_batch(token_addresses, chain)
+    except Exception as e:
+        logging.error(f"Error getting token info batch on {chain}: {e}")
+        return {address.lower(): None for address in token_addresses if address}
+
 def format_first_buyers_response(first_buyers: List[Dict[str, Any]], 
                                 token_data: Dict[str, Any], 
                                 token_address: str) -> Tuple[str, List[List[InlineKeyboardButton]]]:
@@ -620,7 +607,7 @@ async def handle_wallet_analysis_input(
         if success:
             # Get the user directly from the message update
             user_id = update.effective_user.id
-            user = get_user(user_id)
+            user = await get_user(user_id)
             if not user:
                 # Create user if not exists
                 user = User(user_id=user_id, username=update.effective_user.username)
@@ -1016,7 +1003,7 @@ async def handle_period_selection(
         callback_prefix: Prefix for callback data
     """
     query = update.callback_query
-    user = await check_callback_user(update)
+    user = await check_callback_user(update, context)
     
     # Check if user has reached daily limit
     has_reached_limit, current_count = await check_rate_limit_service(
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from aiohttp import web
+
+# The bot runs from src/ and imports its modules top-level (config, api, data, ...)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# config.py parses ADMIN_USER_IDS at import time and rejects an empty value
+os.environ.setdefault("ADMIN_USER_IDS", "0")
+
+pytest_plugins = ["aiohttp.pytest_plugin"]
+
+class FakeAnalyzer:
+    """
+    Stand-in for the token analyzer API
+
+    Every GET under /api/v1/ is counted and answered by the current behaviour:
+    an HTTP status, an optional delay, and an optional event the handler waits on.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.status = 200
+        self.delay = 0.0
+        self.fail_first = 0
+        self.release = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+        if self.hits <= self.fail_first:
+            return web.Response(status=503, text="warming up")
+        if self.status != 200:
+            return web.Response(status=self.status, text="upstream error")
+        return web.json_response({"family": request.match_info["family"], "hits": self.hits})
+
+@pytest.fixture
+async def analyzer(aiohttp_server):
+    """Run a FakeAnalyzer and yield it along with its base URL"""
+    fake = FakeAnalyzer()
+    app = web.Application()
+    app.router.add_get("/api/v1/{family}/{tail:.*}", fake.handle)
+    server = await aiohttp_server(app)
+    fake.url = str(server.make_url("/api/v1"))
+    yield fake
+
+@pytest.fixture
+async def client(monkeypatch):
+    """An APIClient with fast retries, short timeouts and a low breaker threshold"""
+    import api.client as client_module
+
+    monkeypatch.setattr(client_module, "API_MAX_RETRIES", 2)
+    monkeypatch.setattr(client_module, "API_RETRY_BACKOFF", 0.05)
+    monkeypatch.setattr(client_module, "API_READ_TIMEOUT", 0.2)
+    monkeypatch.setattr(client_module, "API_TOTAL_TIMEOUT", 1.0)
+    monkeypatch.setattr(client_module, "API_UNIX_SOCKET", None)
+
+    api = client_module.APIClient(breaker_failure_threshold=2, breaker_reset_timeout=0.3)
+    yield api
+    await api.close()
+
+class FakeRPCNode:
+    """
+    Stand-in for a JSON-RPC node
+
+    Batches are answered from canned per-method results (a value, or a callable taking
+    the call's params); methods in errors get a JSON-RPC error instead. Every POST
+    takes delay seconds, and every slow_every-th POST is held for slow_delay seconds
+    to simulate tail latency.
+    """
+
+    def __init__(self):
+        self.posts = 0
+        self.calls = 0
+        self.delay = 0.0
+        self.slow_every = 0
+        self.slow_delay = 0.0
+        self.results = {"eth_blockNumber": "0x10"}
+        self.errors = set()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.posts += 1
+        payload = await request.json()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.slow_every and self.posts % self.slow_every == 0:
+            await asyncio.sleep(self.slow_delay)
+
+        replies = []
+        for call in payload:
+            self.calls += 1
+            if call["method"] in self.errors:
+                replies.append({"jsonrpc": "2.0", "id": call["id"], "error": {"code": -32000, "message": "execution reverted"}})
+                continue
+            result = self.results.get(call["method"])
+            if callable(result):
+                result = result(call["params"])
+            replies.append({"jsonrpc": "2.0", "id": call["id"], "result": result})
+        return web.json_response(replies)
+
+@pytest.fixture
+async def rpc_nodes(aiohttp_server, monkeypatch):
+    """Two FakeRPCNodes pooled as the "test" chain"""
+    import services.blockchain as blockchain
+    from services.rpc_pool import RPCPool, rpc_pools
+
+    nodes = []
+    for _ in range(2):
+        node = FakeRPCNode()
+        app = web.Application()
+        app.router.add_post("/", node.handle)
+        server = await aiohttp_server(app)
+        node.url = str(server.make_url("/"))
+        nodes.append(node)
+
+    monkeypatch.setitem(rpc_pools, "test", RPCPool("test", [node.url for node in nodes]))
+    yield nodes
+
+    # The shared RPC session belongs to this test's event loop
+    if blockchain._rpc_session is not None:
+        await blockchain._rpc_session.close()
+        blockchain._rpc_session = None
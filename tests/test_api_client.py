@@ -0,0 +1,165 @@
+import asyncio
+import time
+
+import api.client as client_module
+from api.client import CircuitBreaker
+
+async def test_retries_server_errors_with_backoff(analyzer, client, monkeypatch):
+    monkeypatch.setattr(client_module.random, "uniform", lambda a, b: 1.0)
+    analyzer.fail_first = 2
+
+    started = time.monotonic()
+    result = await client.get(f"{analyzer.url}/ath_mcap/eth/0xabc")
+
+    assert result == {"family": "ath_mcap", "hits": 3}
+    assert analyzer.hits == 3
+    # Two backoffs: API_RETRY_BACKOFF, then twice that
+    assert time.monotonic() - started >= 0.05 + 0.1
+    assert client.get_circuit_states() == {"ath_mcap": CircuitBreaker.CLOSED}
+
+async def test_gives_up_after_max_retries(analyzer, client):
+    analyzer.status = 500
+
+    result = await client.get(f"{analyzer.url}/ath_mcap/eth/0xabc")
+
+    assert result["error"] == "API error: 500"
+    assert analyzer.hits == 3
+
+async def test_client_errors_are_not_retried(analyzer, client):
+    analyzer.status = 404
+
+    result = await client.get(f"{analyzer.url}/ath_mcap/eth/0xabc")
+
+    assert result["error"] == "API error: 404"
+    assert analyzer.hits == 1
+    assert client.get_circuit_states() == {"ath_mcap": CircuitBreaker.CLOSED}
+
+async def test_slow_responses_time_out_and_retry(analyzer, client):
+    analyzer.delay = 0.5
+
+    started = time.monotonic()
+    result = await client.get(f"{analyzer.url}/ath_mcap/eth/0xabc")
+
+    assert result["error"].startswith("Request failed")
+    assert analyzer.hits == 3
+    # Each attempt is cut off by the 0.2s read timeout rather than waiting for the server
+    assert time.monotonic() - started < 3 * 0.5
+
+async def test_breaker_opens_and_fails_fast(analyzer, client):
+    analyzer.status = 500
+    url = f"{analyzer.url}/top_holders/eth/0xabc/10"
+
+    await client.get(url)
+    await client.get(url)
+    assert client.get_circuit_states() == {"top_holders": CircuitBreaker.OPEN}
+
+    hits = analyzer.hits
+    result = await client.get(url)
+
+    assert result["error"] == "API temporarily unavailable"
+    assert analyzer.hits == hits
+
+async def test_breaker_is_per_endpoint_family(analyzer, client):
+    analyzer.status = 500
+    for _ in range(2):
+        await client.get(f"{analyzer.url}/top_holders/eth/0xabc/10")
+
+    analyzer.status = 200
+    result = await client.get(f"{analyzer.url}/ath_mcap/eth/0xabc")
+
+    assert "error" not in result
+    assert client.get_circuit_states()["top_holders"] == CircuitBreaker.OPEN
+
+async def test_half_open_probe_closes_the_circuit(analyzer, client):
+    analyzer.status = 500
+    url = f"{analyzer.url}/top_holders/eth/0xabc/10"
+    for _ in range(2):
+        await client.get(url)
+
+    analyzer.status = 200
+    await asyncio.sleep(0.35)
+    hits = analyzer.hits
+    result = await client.get(url)
+
+    assert "error" not in result
+    # A single probe went upstream and its success closed the circuit
+    assert analyzer.hits == hits + 1
+    assert client.get_circuit_states() == {"top_holders": CircuitBreaker.CLOSED}
+
+async def test_failed_half_open_probe_reopens_the_circuit(analyzer, client, monkeypatch):
+    monkeypatch.setattr(client_module, "API_MAX_RETRIES", 0)
+    analyzer.status = 500
+    url = f"{analyzer.url}/top_holders/eth/0xabc/10"
+    for _ in range(2):
+        await client.get(url)
+
+    await asyncio.sleep(0.35)
+    await client.get(url)
+    assert client.get_circuit_states() == {"top_holders": CircuitBreaker.OPEN}
+
+    hits = analyzer.hits
+    result = await client.get(url)
+
+    assert result["error"] == "API temporarily unavailable"
+    assert analyzer.hits == hits
+
+async def test_cancelled_half_open_probe_lets_the_next_request_probe(analyzer, client):
+    analyzer.status = 500
+    url = f"{analyzer.url}/top_holders/eth/0xabc/10"
+    for _ in range(2):
+        await client.get(url)
+
+    await asyncio.sleep(0.35)
+    analyzer.status = 200
+    analyzer.release = asyncio.Event()
+    probe = asyncio.create_task(client.get(url))
+    await asyncio.sleep(0.05)
+    # Cancel the shared request itself, as a deadline cancelling its task would
+    next(iter(client._inflight.values())).cancel()
+    await asyncio.gather(probe, return_exceptions=True)
+    assert client.get_circuit_states() == {"top_holders": CircuitBreaker.OPEN}
+
+    analyzer.release = None
+    result = await client.get(url)
+
+    assert "error" not in result
+    assert client.get_circuit_states() == {"top_holders": CircuitBreaker.CLOSED}
+
+async def test_concurrent_identical_requests_are_coalesced(analyzer, client):
+    analyzer.release = asyncio.Event()
+    url = f"{analyzer.url}/ath_mcap/eth/0xabc"
+
+    callers = [asyncio.create_task(client.get(url)) for _ in range(5)]
+    await asyncio.sleep(0.05)
+    analyzer.release.set()
+    results = await asyncio.gather(*callers)
+
+    assert analyzer.hits == 1
+    assert all(result == results[0] for result in results)
+    stats = client.get_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["inflight"] == 0
+
+async def test_cancelled_caller_does_not_cancel_shared_request(analyzer, client):
+    analyzer.release = asyncio.Event()
+    url = f"{analyzer.url}/ath_mcap/eth/0xabc"
+
+    cancelled = asyncio.create_task(client.get(url))
+    waiting = asyncio.create_task(client.get(url))
+    await asyncio.sleep(0.05)
+    cancelled.cancel()
+    analyzer.release.set()
+
+    assert (await waiting)["hits"] == 1
+    assert analyzer.hits == 1
+
+async def test_successful_responses_are_cached(analyzer, client):
+    url = f"{analyzer.url}/ath_mcap/eth/0xabc"
+
+    first = await client.get(url)
+    second = await client.get(url)
+
+    assert first == second
+    assert analyzer.hits == 1
+    assert client.get_cache_stats()["hits"] == 1
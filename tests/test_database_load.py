@@ -0,0 +1,88 @@
+"""
+Load test for the async data layer against a local mongod
+
+Set MONGODB_TEST_URI to point it elsewhere; the test is skipped when no mongod
+answers. It runs in a throwaway database that is dropped afterwards. Run with -s
+to see the numbers.
+"""
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+from pymongo import AsyncMongoClient
+
+import data.database as database
+import services.user_management as user_management
+from data.write_buffer import WriteBehindBuffer
+
+MONGODB_TEST_URI = os.getenv("MONGODB_TEST_URI", "mongodb://localhost:27017")
+USERS = int(os.getenv("DB_LOAD_USERS", "500"))
+SCANS_PER_USER = 3
+
+@pytest.fixture
+async def mongo_database(loop, monkeypatch):
+    """Point data.database at a fresh database on the local mongod, or skip"""
+    probe = AsyncMongoClient(MONGODB_TEST_URI, serverSelectionTimeoutMS=1000)
+    try:
+        await probe.admin.command("ping")
+    except Exception as e:
+        pytest.skip(f"no mongod at {MONGODB_TEST_URI}: {e}")
+    finally:
+        await probe.close()
+
+    db_name = f"defiscope_load_{uuid.uuid4().hex[:8]}"
+    monkeypatch.setattr(database, "MONGODB_URI", MONGODB_TEST_URI)
+    monkeypatch.setattr(database, "DB_NAME", db_name)
+    monkeypatch.setattr(database, "_client", None)
+    monkeypatch.setattr(database, "_db", None)
+    assert await database.init_database()
+    try:
+        yield await database.get_database()
+    finally:
+        await database._client.drop_database(db_name)
+        await database.close_database()
+
+async def _start_and_scan(user_id: int) -> None:
+    """What /start followed by a few token scans does to the database"""
+    await user_management.get_or_create_user(user_id, f"user{user_id}", "Load", "Test")
+    for _ in range(SCANS_PER_USER):
+        limited, _ = await user_management.check_rate_limit_service(user_id, "token_scan", 100)
+        assert not limited
+        await user_management.increment_scan_count(user_id, "token_scan")
+
+async def test_concurrent_start_and_scan_flows(mongo_database, monkeypatch):
+    buffer = WriteBehindBuffer(interval_ms=100, max_ops=500)
+    monkeypatch.setattr(user_management, "write_buffer", buffer)
+    await buffer.start()
+    user_ids = range(10_000_000, 10_000_000 + USERS)
+
+    # A blocked event loop would show up as a ticker that falls far behind
+    ticks = 0
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    started = time.monotonic()
+    await asyncio.gather(*(_start_and_scan(user_id) for user_id in user_ids))
+    elapsed = time.monotonic() - started
+    await buffer.stop()
+    ticking.cancel()
+
+    print(
+        f"\n{USERS} concurrent /start + {SCANS_PER_USER} scan flows in {elapsed:.2f}s "
+        f"({USERS / elapsed:.0f} flows/s), event loop ticked {ticks} times"
+    )
+
+    today = datetime.now().date().isoformat()
+    assert await mongo_database.users.count_documents({"user_id": {"$in": list(user_ids)}}) == USERS
+    counts = [
+        doc["count"] async for doc in mongo_database.user_scans.find({"scan_type": "token_scan", "date": today})
+    ]
+    assert len(counts) == USERS and set(counts) == {SCANS_PER_USER}
+    assert ticks > 0
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from telegram.error import RetryAfter
+
+from services.notification import NotificationDispatcher
+
+class FakeBot:
+    """Records when each message went out; the first `rate_limited` sends raise RetryAfter"""
+
+    def __init__(self, send_time: float = 0.02, rate_limited: int = 0, retry_after: float = 0.0):
+        self.sent = []
+        self.send_time = send_time
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.attempts = []
+
+    async def send_message(self, chat_id, text, parse_mode):
+        self.attempts.append((chat_id, time.monotonic()))
+        await asyncio.sleep(self.send_time)
+        if self.rate_limited:
+            self.rate_limited -= 1
+            raise RetryAfter(self.retry_after)
+        self.sent.append((chat_id, text, time.monotonic()))
+
+async def _drain(dispatcher: NotificationDispatcher, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while dispatcher.pending_count() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    await dispatcher.stop()
+
+async def test_enqueue_during_send_keeps_per_chat_interval():
+    bot = FakeBot(send_time=0.05)
+    dispatcher = NotificationDispatcher(global_rate=1000, per_chat_rate=5)
+    await dispatcher.start(bot)
+
+    await dispatcher.enqueue(1, "first")
+    # Arrives while the first message is still being sent
+    await asyncio.sleep(0.02)
+    await dispatcher.enqueue(1, "second")
+    await _drain(dispatcher)
+
+    assert [text for _, text, _ in bot.sent] == ["first", "second"]
+    first_started = bot.attempts[0][1]
+    second_started = bot.attempts[1][1]
+    assert second_started - first_started >= 0.2
+
+async def test_retry_after_is_respected_for_new_messages():
+    bot = FakeBot(send_time=0.01, rate_limited=1, retry_after=0.3)
+    dispatcher = NotificationDispatcher(global_rate=1000, per_chat_rate=100)
+    await dispatcher.start(bot)
+
+    await dispatcher.enqueue(1, "first")
+    await asyncio.sleep(0.005)
+    await dispatcher.enqueue(1, "second")
+    await _drain(dispatcher)
+
+    assert [text for _, text, _ in bot.sent] == ["first", "second"]
+    assert bot.attempts[1][1] - bot.attempts[0][1] >= 0.3
+
+async def test_alerts_are_sent_before_broadcasts():
+    bot = FakeBot(send_time=0.001)
+    dispatcher = NotificationDispatcher(global_rate=200, per_chat_rate=1000)
+    await dispatcher.start(bot)
+
+    for chat_id in range(100, 150):
+        await dispatcher.enqueue(chat_id, "broadcast", bulk=True)
+    await asyncio.sleep(0.02)
+    sent_before = len(bot.sent)
+    await dispatcher.enqueue(1, "alert")
+    await _drain(dispatcher)
+
+    order = [text for _, text, _ in bot.sent]
+    assert len(order) == 51
+    # Only the broadcast already being sent goes out ahead of the alert
+    assert order.index("alert") <= sent_before + 1
+
+async def test_wait_for_capacity_wakes_when_broadcast_chats_drain():
+    bot = FakeBot(send_time=0.01)
+    dispatcher = NotificationDispatcher(global_rate=1000, per_chat_rate=1000)
+    await dispatcher.start(bot)
+
+    for chat_id in range(3):
+        await dispatcher.enqueue(chat_id, "broadcast", bulk=True)
+    await asyncio.wait_for(dispatcher.wait_for_capacity(2), timeout=1)
+
+    assert len(dispatcher._bulk_pending) < 2
+    await _drain(dispatcher)
@@ -0,0 +1,79 @@
+import time
+
+from eth_abi import encode as abi_encode
+
+import services.blockchain as blockchain
+from services.blockchain import ERC20_METADATA_SELECTORS, get_token_metadata_batch, rpc_batch
+
+TOKENS = [f"0x{i:040x}" for i in range(1, 11)]
+
+def _serve_erc20(node) -> None:
+    """Answer every address as an 18-decimal ERC-20 named after its last byte"""
+    def eth_call(params):
+        call, _ = params
+        selector = call["data"]
+        suffix = call["to"][-2:]
+        if selector == ERC20_METADATA_SELECTORS["name"]:
+            return "0x" + abi_encode(["string"], [f"Token {suffix}"]).hex()
+        if selector == ERC20_METADATA_SELECTORS["symbol"]:
+            return "0x" + abi_encode(["string"], [f"T{suffix}"]).hex()
+        if selector == ERC20_METADATA_SELECTORS["decimals"]:
+            return "0x" + abi_encode(["uint8"], [18]).hex()
+        return "0x" + abi_encode(["uint256"], [1000 * 10 ** 18]).hex()
+
+    node.results["eth_getCode"] = "0x6080604052"
+    node.results["eth_call"] = eth_call
+
+def _p99(latencies):
+    ordered = sorted(latencies)
+    return ordered[max(0, int(len(ordered) * 0.99) - 1)]
+
+async def _metadata_per_call(addresses):
+    """The old access pattern: one round trip per getter, token after token"""
+    for address in addresses:
+        await rpc_batch("test", [("eth_getCode", [address, "latest"])])
+        for selector in ERC20_METADATA_SELECTORS.values():
+            await rpc_batch("test", [("eth_call", [{"to": address, "data": selector}, "latest"])])
+
+async def test_metadata_for_many_tokens_is_one_post(rpc_nodes, monkeypatch):
+    monkeypatch.setattr(blockchain, "_address_class_cache", blockchain.LRUCache(maxsize=100))
+    for node in rpc_nodes:
+        _serve_erc20(node)
+
+    metadata = await get_token_metadata_batch(TOKENS, "test")
+
+    assert sum(node.posts for node in rpc_nodes) == 1
+    assert sum(node.calls for node in rpc_nodes) == len(TOKENS) * (1 + len(ERC20_METADATA_SELECTORS))
+    entry = metadata[TOKENS[0]]
+    assert entry["is_token"] and entry["name"] == "Token 01" and entry["symbol"] == "T01"
+    assert entry["decimals"] == 18 and entry["total_supply"] == 1000
+
+async def test_batches_are_split_at_the_batch_size(rpc_nodes, monkeypatch):
+    monkeypatch.setattr(blockchain, "_address_class_cache", blockchain.LRUCache(maxsize=100))
+    monkeypatch.setattr(blockchain, "RPC_BATCH_SIZE", 20)
+    for node in rpc_nodes:
+        _serve_erc20(node)
+
+    await get_token_metadata_batch(TOKENS, "test")
+
+    # 50 calls in batches of 20
+    assert sum(node.posts for node in rpc_nodes) == 3
+
+async def test_batched_metadata_p99_against_per_call_requests(rpc_nodes, monkeypatch):
+    monkeypatch.setattr(blockchain, "_address_class_cache", blockchain.LRUCache(maxsize=100))
+    for node in rpc_nodes:
+        _serve_erc20(node)
+        node.delay = 0.005
+
+    per_call, batched = [], []
+    for _ in range(20):
+        started = time.monotonic()
+        await _metadata_per_call(TOKENS)
+        per_call.append(time.monotonic() - started)
+
+        started = time.monotonic()
+        await get_token_metadata_batch(TOKENS, "test")
+        batched.append(time.monotonic() - started)
+
+    print(f"\n10-token metadata p99: per call {_p99(per_call) * 1000:.1f}ms, batched {_p99(batched) * 1000:.1f}ms")
+    assert _p99(batched) * 10 < _p99(per_call)
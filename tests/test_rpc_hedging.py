@@ -0,0 +1,81 @@
+import random
+import time
+
+import aiohttp
+import pytest
+
+import services.blockchain as blockchain
+import services.rpc_pool as rpc_pool
+from services.blockchain import RPCPoolExhausted, rpc_batch
+
+def _p99(latencies):
+    ordered = sorted(latencies)
+    return ordered[int(len(ordered) * 0.99) - 1]
+
+async def _measure(hedge: bool, requests: int):
+    latencies = []
+    for _ in range(requests):
+        started = time.monotonic()
+        head, = await rpc_batch("test", [("eth_blockNumber", [])], hedge=hedge)
+        latencies.append(time.monotonic() - started)
+        assert head == "0x10"
+    return latencies
+
+async def test_hedging_cuts_tail_latency(rpc_nodes, monkeypatch, record_property):
+    monkeypatch.setattr(blockchain, "RPC_HEDGE_ENABLED", True)
+    random.seed(7)
+    # One request in 25 stalls on each node, well outside the p95 the hedge waits for
+    for node in rpc_nodes:
+        node.slow_every = 25
+        node.slow_delay = 0.2
+
+    unhedged = _p99(await _measure(hedge=False, requests=100))
+    # Warm up the latency window the hedge delay is taken from
+    await _measure(hedge=True, requests=30)
+    hedged = _p99(await _measure(hedge=True, requests=100))
+
+    record_property("unhedged_p99", round(unhedged, 4))
+    record_property("hedged_p99", round(hedged, 4))
+    print(f"eth_blockNumber p99: unhedged {unhedged * 1000:.1f}ms, hedged {hedged * 1000:.1f}ms")
+    assert unhedged >= 0.2
+    assert hedged < unhedged / 2
+
+async def test_hedges_stay_within_budget(rpc_nodes, monkeypatch):
+    monkeypatch.setattr(blockchain, "RPC_HEDGE_ENABLED", True)
+    # Fewer hedges allowed than there are stalls
+    monkeypatch.setattr(rpc_pool, "RPC_HEDGE_MAX_RATIO", 0.02)
+    for node in rpc_nodes:
+        node.slow_every = 20
+        node.slow_delay = 0.1
+
+    await _measure(hedge=True, requests=200)
+
+    pool = blockchain.get_rpc_pool("test")
+    assert 0 < pool._hedges <= pool._requests * 0.02 + 1
+
+async def test_connection_reset_fails_over(rpc_nodes, monkeypatch):
+    monkeypatch.setattr(blockchain, "RPC_HEDGE_ENABLED", True)
+    post_rpc = blockchain._post_rpc
+
+    async def reset_first_node(pool, endpoint, payload, observe=False):
+        if endpoint.url == rpc_nodes[0].url:
+            raise aiohttp.ClientConnectionResetError("Connection reset by peer")
+        return await post_rpc(pool, endpoint, payload, observe)
+
+    monkeypatch.setattr(blockchain, "_post_rpc", reset_first_node)
+
+    for hedge in (False, True):
+        for _ in range(10):
+            assert await rpc_batch("test", [("eth_blockNumber", [])], hedge=hedge) == ["0x10"]
+
+async def test_exhausted_pool_raises(rpc_nodes, monkeypatch):
+    monkeypatch.setattr(blockchain, "RPC_HEDGE_ENABLED", True)
+
+    async def reset(pool, endpoint, payload, observe=False):
+        raise aiohttp.ClientConnectionResetError("Connection reset by peer")
+
+    monkeypatch.setattr(blockchain, "_post_rpc", reset)
+
+    for hedge in (False, True):
+        with pytest.raises(RPCPoolExhausted):
+            await rpc_batch("test", [("eth_blockNumber", [])], hedge=hedge)
@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+import services.blockchain as blockchain
+from services.blockchain import RPCPoolExhausted, get_web3_provider, rpc_batch
+from services.rpc_pool import RPCPool, rpc_pools
+
+def _budgeted_pool(budget: float) -> RPCPool:
+    pool = RPCPool("budget", ["http://127.0.0.1:1", "http://127.0.0.1:2"])
+    for endpoint in pool.endpoints:
+        endpoint.budget = budget
+    return pool
+
+def test_select_returns_none_once_every_endpoint_is_over_budget():
+    pool = _budgeted_pool(2)
+
+    picked = [pool.select() for _ in range(4)]
+
+    assert all(endpoint is not None for endpoint in picked)
+    assert pool.select() is None
+
+def test_lookup_does_not_use_up_budget():
+    pool = _budgeted_pool(1)
+
+    for _ in range(10):
+        assert pool.select(charge=False) is not None
+    assert pool.select() is not None
+
+def test_get_web3_provider_raises_when_no_endpoint_has_budget(monkeypatch):
+    pool = _budgeted_pool(1)
+    monkeypatch.setitem(rpc_pools, "budget", pool)
+
+    assert get_web3_provider("budget") is not None
+    pool.select()
+    pool.select()
+
+    with pytest.raises(RPCPoolExhausted):
+        get_web3_provider("budget")
+
+async def test_requests_over_budget_wait_for_the_next_window(rpc_nodes, monkeypatch):
+    monkeypatch.setattr(blockchain, "RPC_HEDGE_ENABLED", False)
+    for endpoint in blockchain.get_rpc_pool("test").endpoints:
+        endpoint.budget = 5
+
+    started = time.monotonic()
+    for _ in range(15):
+        assert await rpc_batch("test", [("eth_blockNumber", [])]) == ["0x10"]
+    elapsed = time.monotonic() - started
+
+    # Ten requests per second across both nodes: the last five wait for the second window
+    assert sum(node.posts for node in rpc_nodes) == 15
+    assert elapsed >= 0.9
@@ -0,0 +1,55 @@
+import asyncio
+
+import services.token_cache as token_cache
+
+async def test_info_chunks_respect_per_chain_rpc_limit(monkeypatch):
+    monkeypatch.setattr(token_cache, "_info_semaphores", {})
+    monkeypatch.setattr(token_cache, "ENRICHMENT_INFO_CHUNK_SIZE", 10)
+    monkeypatch.setattr(token_cache, "ENRICHMENT_RPC_CONCURRENCY", {"eth": 2})
+    in_flight = 0
+    peak = 0
+
+    async def fake_info_batch(addresses, chain, hedge=False):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return {address: {"address": address} for address in addresses}
+
+    async def fake_market_cap(chain, address):
+        return {"current_mc": 1}
+
+    monkeypatch.setattr(token_cache, "get_cached_token_info_batch", fake_info_batch)
+    monkeypatch.setattr(token_cache, "get_cached_market_cap", fake_market_cap)
+
+    addresses = [f"0x{i:040x}" for i in range(200)]
+    # Two enrichments at once share the chain's limit
+    (infos, _), (other_infos, _) = await asyncio.gather(
+        token_cache.enrich_tokens(addresses, "eth"),
+        token_cache.enrich_tokens(addresses, "eth")
+    )
+
+    assert peak == 2
+    assert len(infos) == len(other_infos) == 200
+
+async def test_finished_info_chunks_survive_the_deadline(monkeypatch):
+    monkeypatch.setattr(token_cache, "_info_semaphores", {})
+    monkeypatch.setattr(token_cache, "ENRICHMENT_INFO_CHUNK_SIZE", 10)
+    monkeypatch.setattr(token_cache, "ENRICHMENT_RPC_CONCURRENCY", {"eth": 1})
+
+    async def fake_info_batch(addresses, chain, hedge=False):
+        await asyncio.sleep(0.05)
+        return {address: {"address": address} for address in addresses}
+
+    async def fake_market_cap(chain, address):
+        return {}
+
+    monkeypatch.setattr(token_cache, "get_cached_token_info_batch", fake_info_batch)
+    monkeypatch.setattr(token_cache, "get_cached_market_cap", fake_market_cap)
+
+    addresses = [f"0x{i:040x}" for i in range(50)]
+    infos, _ = await token_cache.enrich_tokens(addresses, "eth", deadline=0.12)
+
+    # Two of five serialized chunks finish in time and are kept
+    assert len(infos) == 20